@@ -0,0 +1,83 @@
+"""schema_and_hot_query_indexes
+
+Revision ID: 5b7e1c9a2d4f
+Revises: 974a5c254c93
+Create Date: 2026-10-18 09:12:41.503117
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '5b7e1c9a2d4f'
+down_revision: Union[str, Sequence[str], None] = '974a5c254c93'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+# (nama index, tabel, kolom) sesuai pola query di main.py
+HOT_INDEXES = [
+    ("ix_reports_likes_id", "reports", ["likes", "id"]),
+    ("ix_reports_username_id", "reports", ["username", "id"]),
+    ("ix_reports_status", "reports", ["status"]),
+    ("ix_report_likes_report_id", "report_likes", ["report_id"]),
+]
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    # hybrid_init kosong, jadi DB lama mungkin sudah punya tabel (dibuat manual).
+    # Tabel cuma dibuat kalau belum ada.
+    inspector = sa.inspect(op.get_bind())
+    tables = set(inspector.get_table_names())
+
+    if "users" not in tables:
+        op.create_table(
+            "users",
+            sa.Column("id", sa.Integer(), primary_key=True),
+            sa.Column("username", sa.String(length=50), nullable=True),
+            sa.Column("password_hash", sa.String(length=255), nullable=True),
+            sa.Column("role", sa.String(length=20), nullable=True),
+        )
+        op.create_index("ix_users_id", "users", ["id"])
+        op.create_index("ix_users_username", "users", ["username"], unique=True)
+
+    if "reports" not in tables:
+        op.create_table(
+            "reports",
+            sa.Column("id", sa.Integer(), primary_key=True),
+            sa.Column("title", sa.String(length=100), nullable=True),
+            sa.Column("description", sa.String(length=500), nullable=True),
+            sa.Column("facility", sa.String(length=50), nullable=True),
+            sa.Column("image_url", sa.String(length=500), nullable=True),
+            sa.Column("status", sa.String(length=20), nullable=True),
+            sa.Column("priority", sa.String(length=20), nullable=True),
+            sa.Column("created_at", sa.DateTime(timezone=True), server_default=sa.func.now(), nullable=True),
+            sa.Column("updated_at", sa.DateTime(timezone=True), nullable=True),
+            sa.Column("username", sa.String(length=50), sa.ForeignKey("users.username"), nullable=True),
+            sa.Column("likes", sa.Integer(), nullable=True),
+            sa.Column("admin_note", sa.Text(), nullable=True),
+            sa.Column("proof_image_url", sa.String(length=500), nullable=True),
+        )
+        op.create_index("ix_reports_id", "reports", ["id"])
+
+    if "report_likes" not in tables:
+        op.create_table(
+            "report_likes",
+            sa.Column("user_username", sa.String(length=50), sa.ForeignKey("users.username"), primary_key=True),
+            sa.Column("report_id", sa.Integer(), sa.ForeignKey("reports.id"), primary_key=True),
+        )
+
+    for name, table, columns in HOT_INDEXES:
+        existing = {ix["name"] for ix in sa.inspect(op.get_bind()).get_indexes(table)}
+        if name not in existing:
+            op.create_index(name, table, columns)
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    # Tabel sengaja tidak di-drop: bisa jadi sudah ada sebelum migrasi ini.
+    for name, table, _ in reversed(HOT_INDEXES):
+        op.drop_index(name, table_name=table)
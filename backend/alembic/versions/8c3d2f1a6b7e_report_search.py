@@ -0,0 +1,105 @@
+"""report_search
+
+Revision ID: 8c3d2f1a6b7e
+Revises: 5b7e1c9a2d4f
+Create Date: 2026-10-18 13:40:09.227315
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '8c3d2f1a6b7e'
+down_revision: Union[str, Sequence[str], None] = '5b7e1c9a2d4f'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+# Postgres: kolom GENERATED (selalu sinkron tanpa trigger) + GIN index.
+# Config 'simple' karena tidak ada stemmer bahasa Indonesia bawaan.
+POSTGRES_UPGRADE = [
+    "CREATE EXTENSION IF NOT EXISTS pg_trgm",
+    """ALTER TABLE reports ADD COLUMN IF NOT EXISTS search_vector tsvector GENERATED ALWAYS AS (
+        setweight(to_tsvector('simple', coalesce(title, '')), 'A') ||
+        setweight(to_tsvector('simple', coalesce(facility, '')), 'B') ||
+        setweight(to_tsvector('simple', coalesce(description, '')), 'C')
+    ) STORED""",
+    """ALTER TABLE reports ADD COLUMN IF NOT EXISTS search_text text GENERATED ALWAYS AS (
+        lower(coalesce(title, '') || ' ' || coalesce(facility, ''))
+    ) STORED""",
+    "CREATE INDEX IF NOT EXISTS ix_reports_search_vector ON reports USING gin (search_vector)",
+    "CREATE INDEX IF NOT EXISTS ix_reports_search_trgm ON reports USING gin (search_text gin_trgm_ops)",
+]
+
+POSTGRES_DOWNGRADE = [
+    "DROP INDEX IF EXISTS ix_reports_search_trgm",
+    "DROP INDEX IF EXISTS ix_reports_search_vector",
+    "ALTER TABLE reports DROP COLUMN IF EXISTS search_text",
+    "ALTER TABLE reports DROP COLUMN IF EXISTS search_vector",
+]
+
+# SQLite: tabel FTS5 external-content (isi teks tetap di reports) + trigger sinkronisasi
+SQLITE_UPGRADE = [
+    """CREATE VIRTUAL TABLE IF NOT EXISTS reports_fts USING fts5(
+        title, description, facility,
+        content='reports', content_rowid='id', tokenize='unicode61 remove_diacritics 2'
+    )""",
+    """CREATE VIRTUAL TABLE IF NOT EXISTS reports_fts_tri USING fts5(
+        title, facility,
+        content='reports', content_rowid='id', tokenize='trigram'
+    )""",
+    """CREATE TRIGGER IF NOT EXISTS reports_fts_ai AFTER INSERT ON reports BEGIN
+        INSERT INTO reports_fts(rowid, title, description, facility)
+            VALUES (new.id, new.title, new.description, new.facility);
+        INSERT INTO reports_fts_tri(rowid, title, facility) VALUES (new.id, new.title, new.facility);
+    END""",
+    """CREATE TRIGGER IF NOT EXISTS reports_fts_ad AFTER DELETE ON reports BEGIN
+        INSERT INTO reports_fts(reports_fts, rowid, title, description, facility)
+            VALUES ('delete', old.id, old.title, old.description, old.facility);
+        INSERT INTO reports_fts_tri(reports_fts_tri, rowid, title, facility)
+            VALUES ('delete', old.id, old.title, old.facility);
+    END""",
+    """CREATE TRIGGER IF NOT EXISTS reports_fts_au AFTER UPDATE OF title, description, facility ON reports BEGIN
+        INSERT INTO reports_fts(reports_fts, rowid, title, description, facility)
+            VALUES ('delete', old.id, old.title, old.description, old.facility);
+        INSERT INTO reports_fts_tri(reports_fts_tri, rowid, title, facility)
+            VALUES ('delete', old.id, old.title, old.facility);
+        INSERT INTO reports_fts(rowid, title, description, facility)
+            VALUES (new.id, new.title, new.description, new.facility);
+        INSERT INTO reports_fts_tri(rowid, title, facility) VALUES (new.id, new.title, new.facility);
+    END""",
+    # Isi index dari baris yang sudah ada
+    "INSERT INTO reports_fts(reports_fts) VALUES ('rebuild')",
+    "INSERT INTO reports_fts_tri(reports_fts_tri) VALUES ('rebuild')",
+]
+
+SQLITE_DOWNGRADE = [
+    "DROP TRIGGER IF EXISTS reports_fts_au",
+    "DROP TRIGGER IF EXISTS reports_fts_ad",
+    "DROP TRIGGER IF EXISTS reports_fts_ai",
+    "DROP TABLE IF EXISTS reports_fts_tri",
+    "DROP TABLE IF EXISTS reports_fts",
+]
+
+
+def _statements(upgrade: bool) -> list:
+    dialect = op.get_bind().dialect.name
+    if dialect == "postgresql":
+        return POSTGRES_UPGRADE if upgrade else POSTGRES_DOWNGRADE
+    if dialect == "sqlite":
+        return SQLITE_UPGRADE if upgrade else SQLITE_DOWNGRADE
+    return []
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    for statement in _statements(upgrade=True):
+        op.execute(sa.text(statement))
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    for statement in _statements(upgrade=False):
+        op.execute(sa.text(statement))
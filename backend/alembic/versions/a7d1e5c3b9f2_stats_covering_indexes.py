@@ -0,0 +1,37 @@
+"""stats_covering_indexes
+
+Revision ID: a7d1e5c3b9f2
+Revises: f3c9a7d2b5e8
+Create Date: 2026-10-19 00:21:05.417392
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'a7d1e5c3b9f2'
+down_revision: Union[str, Sequence[str], None] = 'f3c9a7d2b5e8'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+# /stats tanpa Redis dan job reconcile = satu GROUP BY status, priority, facility atas reports +
+# reports_archive (stats.aggregate_stmt). Index berisi ketiga kolom itu bikin query cukup baca
+# index, tidak perlu menyapu baris lengkap (description / URL gambar ikut terbaca).
+INDEXES = [
+    ("ix_reports_status_priority_facility", "reports"),
+    ("ix_reports_archive_status_priority_facility", "reports_archive"),
+]
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    for name, table in INDEXES:
+        op.create_index(name, table, ["status", "priority", "facility"])
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    for name, table in INDEXES:
+        op.drop_index(name, table_name=table)
@@ -0,0 +1,66 @@
+"""report_archive
+
+Revision ID: e2b8d4c6f1a3
+Revises: 8c3d2f1a6b7e
+Create Date: 2026-10-18 21:05:37.618204
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'e2b8d4c6f1a3'
+down_revision: Union[str, Sequence[str], None] = '8c3d2f1a6b7e'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+# Tabel dingin untuk laporan lama yang sudah Selesai / Ditolak (dipindah oleh archive.py).
+# Kolom sama dengan reports + archived_at, id dipertahankan (tanpa autoincrement).
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.create_table(
+        "reports_archive",
+        sa.Column("id", sa.Integer(), primary_key=True, autoincrement=False),
+        sa.Column("archived_at", sa.DateTime(timezone=True), server_default=sa.func.now(), nullable=True),
+        sa.Column("title", sa.String(length=100), nullable=True),
+        sa.Column("description", sa.String(length=500), nullable=True),
+        sa.Column("facility", sa.String(length=50), nullable=True),
+        sa.Column("image_url", sa.String(length=500), nullable=True),
+        sa.Column("status", sa.String(length=20), nullable=True),
+        sa.Column("priority", sa.String(length=20), nullable=True),
+        sa.Column("created_at", sa.DateTime(timezone=True), server_default=sa.func.now(), nullable=True),
+        sa.Column("updated_at", sa.DateTime(timezone=True), nullable=True),
+        sa.Column("username", sa.String(length=50), sa.ForeignKey("users.username"), nullable=True),
+        sa.Column("likes", sa.Integer(), nullable=True),
+        sa.Column("admin_note", sa.Text(), nullable=True),
+        sa.Column("proof_image_url", sa.String(length=500), nullable=True),
+    )
+    op.create_index("ix_reports_archive_username_id", "reports_archive", ["username", "id"])
+
+    op.create_table(
+        "report_likes_archive",
+        sa.Column("user_username", sa.String(length=50), sa.ForeignKey("users.username"), primary_key=True),
+        sa.Column("report_id", sa.Integer(), sa.ForeignKey("reports_archive.id"), primary_key=True),
+    )
+    op.create_index("ix_report_likes_archive_report_id", "report_likes_archive", ["report_id"])
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    # Isi arsip dikembalikan dulu ke tabel panas biar tidak ada laporan yang hilang
+    op.execute(sa.text(
+        "INSERT INTO reports (id, title, description, facility, image_url, status, priority, created_at, "
+        "updated_at, username, likes, admin_note, proof_image_url) "
+        "SELECT id, title, description, facility, image_url, status, priority, created_at, "
+        "updated_at, username, likes, admin_note, proof_image_url FROM reports_archive"
+    ))
+    op.execute(sa.text("INSERT INTO report_likes (user_username, report_id) SELECT user_username, report_id FROM report_likes_archive"))
+    op.drop_index("ix_report_likes_archive_report_id", table_name="report_likes_archive")
+    op.drop_table("report_likes_archive")
+    op.drop_index("ix_reports_archive_username_id", table_name="reports_archive")
+    op.drop_table("reports_archive")
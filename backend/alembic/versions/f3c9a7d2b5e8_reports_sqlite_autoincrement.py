@@ -0,0 +1,54 @@
+"""reports_sqlite_autoincrement
+
+Revision ID: f3c9a7d2b5e8
+Revises: e2b8d4c6f1a3
+Create Date: 2026-10-18 23:12:48.530917
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'f3c9a7d2b5e8'
+down_revision: Union[str, Sequence[str], None] = 'e2b8d4c6f1a3'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+# Tanpa AUTOINCREMENT, SQLite memberi id max(id)+1 dari tabel reports saja. Setelah laporan
+# ber-id terbesar diarsip, id itu dipakai lagi laporan baru dan bentrok dengan reports_archive.
+# Kolom AUTOINCREMENT cuma bisa dipasang lewat bikin ulang tabel. Postgres (SERIAL) tidak perlu.
+
+
+def _rebuild_reports(autoincrement: bool):
+    bind = op.get_bind()
+    # Trigger FTS (migrasi 8c3d2f1a6b7e) ikut terhapus bersama tabel lama, jadi dipasang lagi
+    triggers = bind.execute(sa.text(
+        "SELECT sql FROM sqlite_master WHERE type = 'trigger' AND tbl_name = 'reports'"
+    )).scalars().all()
+    with op.batch_alter_table("reports", recreate="always", table_kwargs={"sqlite_autoincrement": autoincrement}):
+        pass
+    for trigger in triggers:
+        op.execute(sa.text(trigger))
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    if op.get_bind().dialect.name != "sqlite":
+        return
+    _rebuild_reports(autoincrement=True)
+    # Id berikutnya harus lewat id terbesar yang pernah ada, termasuk yang sudah diarsip
+    op.execute(sa.text("DELETE FROM sqlite_sequence WHERE name = 'reports'"))
+    op.execute(sa.text(
+        "INSERT INTO sqlite_sequence (name, seq) SELECT 'reports', coalesce(max(id), 0) "
+        "FROM (SELECT id FROM reports UNION ALL SELECT id FROM reports_archive)"
+    ))
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    if op.get_bind().dialect.name != "sqlite":
+        return
+    _rebuild_reports(autoincrement=False)
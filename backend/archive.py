@@ -0,0 +1,127 @@
+import threading
+from datetime import datetime, timedelta, timezone
+from sqlalchemy import select, insert, delete, func, union_all
+from sqlalchemy.orm import Session
+from redis.exceptions import LockError
+
+from models import ReportModel, ReportLike, ReportArchive, ReportLikeArchive
+from projections import DETAIL_COLUMNS, ARCHIVE_LIST_COLUMNS, ARCHIVE_DETAIL_COLUMNS
+from metrics import REPORTS_ARCHIVED
+
+# --- HOT / COLD ---
+# reports + report_likes        -> laporan yang masih hidup (feed, search, index Redis, dedup)
+# reports_archive + likes arsip -> Selesai / Ditolak yang tidak disentuh ARCHIVE_AFTER_DAYS hari
+# Laporan dipindah per batch dalam satu transaksi (id tetap), jadi tiap laporan selalu ada di tepat
+# satu tabel. /stats menghitung keduanya, detail /reports/{id} fallback ke arsip.
+ARCHIVE_STATUSES = ("Selesai", "Ditolak")
+ARCHIVE_LOCK = "lock:reports:archive"
+BATCH_PAUSE = 0.1 # Detik jeda antar batch, biar write lain kebagian giliran
+REPORT_FIELDS = [column.name for column in ReportModel.__table__.columns]
+LIKE_FIELDS = ["user_username", "report_id"]
+
+def detail_stmt(report_id: int):
+    """Detail satu laporan dari tabel utama, atau dari arsip kalau sudah dipindah (satu query)."""
+    return union_all(
+        select(*DETAIL_COLUMNS).where(ReportModel.id == report_id),
+        select(*ARCHIVE_DETAIL_COLUMNS).where(ReportArchive.id == report_id),
+    )
+
+def archive_list_stmt(facility: str = None, username: str = None):
+    stmt = select(*ARCHIVE_LIST_COLUMNS)
+    if facility:
+        stmt = stmt.where(ReportArchive.facility == facility)
+    if username:
+        stmt = stmt.where(ReportArchive.username == username)
+    return stmt
+
+def candidates_stmt(status: str, cutoff: datetime, after_id: int, limit: int):
+    """Batch berikutnya (urut id) yang boleh diarsip. Baris yang sedang di-lock request lain dilewati."""
+    last_activity = func.coalesce(ReportModel.updated_at, ReportModel.created_at)
+    return (
+        select(ReportModel.id, ReportModel.username)
+        .where(ReportModel.status == status, ReportModel.id > after_id, last_activity < cutoff)
+        .order_by(ReportModel.id)
+        .limit(limit)
+        .with_for_update(skip_locked=True)
+    )
+
+def move_to_archive(db: Session, ids: list):
+    """Salin laporan + like-nya ke arsip lalu hapus dari tabel utama (caller yang commit)."""
+    source = ReportModel.__table__.c
+    db.execute(insert(ReportArchive).from_select(
+        REPORT_FIELDS, select(*[source[name] for name in REPORT_FIELDS]).where(source.id.in_(ids)),
+    ))
+    db.execute(insert(ReportLikeArchive).from_select(
+        LIKE_FIELDS, select(ReportLike.user_username, ReportLike.report_id).where(ReportLike.report_id.in_(ids)),
+    ))
+    db.execute(delete(ReportLike).where(ReportLike.report_id.in_(ids)))
+    db.execute(delete(ReportModel).where(ReportModel.id.in_(ids)).execution_options(synchronize_session=False))
+
+class ReportArchiver:
+    """Job berkala pemindah laporan ke arsip. on_archived(rows) dipanggil tiap batch selesai
+    (rows = (id, username)) buat membuang cache laporan itu."""
+
+    def __init__(self, client, session_factory, after_days: float = 90, batch_size: int = 500,
+                 interval: float = 3600.0, on_archived=None):
+        self.client = client
+        self.session_factory = session_factory
+        self.after_days = after_days
+        self.batch_size = batch_size
+        self.interval = interval
+        self.on_archived = on_archived
+        self._stop = threading.Event()
+        self._thread = None
+
+    def run_once(self) -> int:
+        """Arsipkan semua yang sudah lewat umur, batch demi batch. Balikin jumlah laporan yang dipindah."""
+        cutoff = datetime.now(timezone.utc) - timedelta(days=self.after_days)
+        moved = 0
+        for status in ARCHIVE_STATUSES:
+            after_id = 0
+            while not self._stop.is_set():
+                with self.session_factory() as db:
+                    rows = db.execute(candidates_stmt(status, cutoff, after_id, self.batch_size)).all()
+                    if not rows:
+                        break
+                    move_to_archive(db, [row.id for row in rows])
+                    db.commit()
+                moved += len(rows)
+                REPORTS_ARCHIVED.inc(len(rows))
+                if self.on_archived is not None:
+                    try:
+                        self.on_archived(rows)
+                    except Exception as e:
+                        print(f"⚠️ Gagal buang cache laporan yang diarsip: {e}")
+                if len(rows) < self.batch_size:
+                    break
+                after_id = rows[-1].id
+                self._stop.wait(BATCH_PAUSE)
+        return moved
+
+    # --- JOB BERKALA (sama seperti reconcile stats) ---
+    def start(self):
+        if self._thread is None and self.interval > 0:
+            self._thread = threading.Thread(target=self._run, name="report-archiver", daemon=True)
+            self._thread.start()
+
+    def stop(self):
+        self._stop.set()
+
+    def _run(self):
+        while not self._stop.wait(self.interval):
+            # Tanpa Redis (lokal, satu instance) langsung jalan; dengan Redis cuma satu instance per putaran
+            lock = self.client.lock(ARCHIVE_LOCK, timeout=self.interval, blocking=False) if self.client else None
+            try:
+                if lock is not None and not lock.acquire():
+                    continue # Instance lain sedang mengarsip
+                moved = self.run_once()
+                if moved:
+                    print(f"🗄️ {moved} laporan dipindah ke arsip")
+            except Exception as e:
+                print(f"⚠️ Gagal arsip laporan: {e}")
+            finally:
+                try:
+                    if lock is not None:
+                        lock.release()
+                except LockError:
+                    pass
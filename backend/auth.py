@@ -1,15 +1,32 @@
 from passlib.context import CryptContext
+from concurrent.futures import ThreadPoolExecutor
 from datetime import datetime, timedelta
 from jose import jwt
+import asyncio
+import hashlib
+import threading
+import time
 import os
 
+from l1_cache import LocalCache
+from metrics import CACHE_LOOKUPS, BCRYPT_QUEUE_DEPTH, BCRYPT_WAIT, BCRYPT_DURATION, BCRYPT_REJECTED
+
 # CONFIG
 SECRET_KEY = os.getenv("SECRET_KEY", "defaultsecretkey")
 ALGORITHM = "HS256"
 ACCESS_TOKEN_EXPIRE_MINUTES = 30
 
-# Hashing Tool
-pwd_context = CryptContext(schemes=["bcrypt"], deprecated="auto")
+# Cost bcrypt. Kalau diubah, hash lama otomatis di-hash ulang saat user login berikutnya.
+BCRYPT_ROUNDS = int(os.getenv("BCRYPT_ROUNDS", 12))
+# Thread khusus bcrypt (terpisah dari threadpool Starlette yang melayani feed) + batas antrean
+BCRYPT_WORKERS = int(os.getenv("BCRYPT_WORKERS", max(1, (os.cpu_count() or 1) // 2)))
+BCRYPT_MAX_QUEUE = int(os.getenv("BCRYPT_MAX_QUEUE", 32))
+
+# Hashing Tool (min = max = default: hash dengan cost lain dianggap perlu di-update)
+pwd_context = CryptContext(
+    schemes=["bcrypt"], deprecated="auto",
+    bcrypt__default_rounds=BCRYPT_ROUNDS, bcrypt__min_rounds=BCRYPT_ROUNDS, bcrypt__max_rounds=BCRYPT_ROUNDS,
+)
 
 def get_password_hash(password):
     return pwd_context.hash(password)
@@ -17,9 +34,91 @@ def get_password_hash(password):
 def verify_password(plain_password, hashed_password):
     return pwd_context.verify(plain_password, hashed_password)
 
+def verify_and_update(plain_password, hashed_password):
+    """(cocok?, hash baru atau None). Hash baru diisi kalau cost hash lama beda dengan BCRYPT_ROUNDS."""
+    return pwd_context.verify_and_update(plain_password, hashed_password)
+
 def create_access_token(data: dict):
     to_encode = data.copy()
     expire = datetime.utcnow() + timedelta(minutes=ACCESS_TOKEN_EXPIRE_MINUTES)
     to_encode.update({"exp": expire})
     encoded_jwt = jwt.encode(to_encode, SECRET_KEY, algorithm=ALGORITHM)
-    return encoded_jwt
\ No newline at end of file
+    return encoded_jwt
+
+# --- CACHE TOKEN ---
+# Claim JWT yang sudah lolos verifikasi, key = sha256 token (token asli tidak disimpan).
+# Entry tidak pernah hidup melewati exp token, jadi hasilnya sama persis dengan jwt.decode.
+token_cache = LocalCache(
+    max_entries=int(os.getenv("TOKEN_CACHE_SIZE", 10000)),
+    ttl=float(os.getenv("TOKEN_CACHE_SECONDS", 300)),
+)
+
+def decode_token(token: str) -> dict:
+    """Claim token yang valid. Raise JWTError kalau tanda tangan salah / kadaluarsa."""
+    key = hashlib.sha256(token.encode()).hexdigest()
+    claims = token_cache.get(key)
+    if claims is not None:
+        CACHE_LOOKUPS.labels("token", "hit").inc()
+        return claims
+    CACHE_LOOKUPS.labels("token", "miss").inc()
+    claims = jwt.decode(token, SECRET_KEY, algorithms=[ALGORITHM])
+    ttl = min(token_cache.ttl, claims.get("exp", 0) - time.time())
+    if ttl > 0:
+        token_cache.set(key, claims, ttl)
+    return claims
+
+# --- POOL BCRYPT ---
+class AuthBusy(Exception):
+    """Antrean bcrypt penuh, lebih baik 503 cepat daripada timeout di klien."""
+
+class BcryptPool:
+    """Executor kecil khusus bcrypt. Login storm cuma mengantre di sini, threadpool feed tetap lega."""
+
+    def __init__(self, workers: int, max_queue: int):
+        self.workers = workers
+        self.max_queue = max_queue
+        self._executor = ThreadPoolExecutor(max_workers=workers, thread_name_prefix="bcrypt")
+        self._lock = threading.Lock()
+        self._pending = 0 # Antre + sedang jalan
+
+    async def run(self, op: str, fn, *args):
+        with self._lock:
+            if self._pending >= self.workers + self.max_queue:
+                BCRYPT_REJECTED.inc()
+                raise AuthBusy()
+            self._pending += 1
+            BCRYPT_QUEUE_DEPTH.inc()
+        queued_at = time.perf_counter()
+
+        # Slot dilepas tepat sekali: oleh job itu sendiri kalau sempat jalan, atau oleh run()
+        # kalau job berhasil dibatalkan sebelum jalan. Job yang sudah jalan tetap pegang slot
+        # sampai bcrypt-nya selesai, walaupun request-nya sudah batal.
+        def job():
+            start = time.perf_counter()
+            with self._lock:
+                BCRYPT_QUEUE_DEPTH.dec()
+            BCRYPT_WAIT.observe(start - queued_at)
+            try:
+                return fn(*args)
+            finally:
+                BCRYPT_DURATION.labels(op).observe(time.perf_counter() - start)
+                with self._lock:
+                    self._pending -= 1
+
+        future = self._executor.submit(job)
+        try:
+            return await asyncio.wrap_future(future)
+        except asyncio.CancelledError:
+            if future.cancel(): # Masih antre (klien putus): job tidak akan pernah jalan
+                with self._lock:
+                    self._pending -= 1
+                    BCRYPT_QUEUE_DEPTH.dec()
+            raise
+
+bcrypt_pool = BcryptPool(BCRYPT_WORKERS, BCRYPT_MAX_QUEUE)
+
+async def hash_password_async(password: str) -> str:
+    return await bcrypt_pool.run("hash", get_password_hash, password)
+
+async def verify_and_update_async(plain_password: str, hashed_password: str):
+    return await bcrypt_pool.run("verify", verify_and_update, plain_password, hashed_password)
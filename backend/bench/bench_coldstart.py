@@ -0,0 +1,123 @@
+"""Benchmark cold start: lama `import main` dan waktu sampai respons pertama dari proses uvicorn baru
+(mirip scale-from-zero di Cloud Run). Tiap run pakai proses baru, hasil median disimpan ke JSON.
+
+    cd backend && python bench/bench_coldstart.py --runs 5
+    cd backend && python bench/bench_coldstart.py --importtime      # + 10 modul termahal saat import
+    python bench/compare.py bench/results/coldstart-<lama>.json bench/results/coldstart-<baru>.json
+
+Default tanpa Redis (REDIS_HOST kosong) biar tidak tergantung server lokal; --redis env memakai env apa adanya.
+DB: SQLite di bench/.work (isi dulu pakai loadtest.py seed) atau DB_* env.
+"""
+import argparse
+import os
+import re
+import socket
+import statistics
+import subprocess
+import sys
+import time
+
+import httpx
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), ".."))
+from bench.benchlib import BACKEND_DIR, enter_work_dir, save_results  # noqa: E402
+
+IMPORT_SNIPPET = "import time; t = time.perf_counter(); import main; print(time.perf_counter() - t)"
+
+def child_env(redis_mode: str) -> dict:
+    env = dict(os.environ, PYTHONPATH=BACKEND_DIR)
+    if redis_mode == "none":
+        env["REDIS_HOST"] = ""
+    return env
+
+def free_port() -> int:
+    with socket.socket() as s:
+        s.bind(("127.0.0.1", 0))
+        return s.getsockname()[1]
+
+def measure_import(env: dict) -> float:
+    out = subprocess.run([sys.executable, "-c", IMPORT_SNIPPET], env=env, capture_output=True, text=True, check=True)
+    return float(out.stdout.strip().splitlines()[-1]) * 1000
+
+def measure_server(env: dict) -> dict:
+    """Proses uvicorn baru: waktu sampai GET / pertama 200, lalu /reports pertama (dingin) dan kedua (hangat)."""
+    port = free_port()
+    start = time.perf_counter()
+    server = subprocess.Popen(
+        [sys.executable, "-m", "uvicorn", "main:app", "--app-dir", BACKEND_DIR, "--port", str(port), "--log-level", "warning"],
+        env=env, stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL,
+    )
+    base_url = f"http://127.0.0.1:{port}"
+    try:
+        with httpx.Client(base_url=base_url, timeout=30) as client:
+            while True:
+                if server.poll() is not None:
+                    sys.exit("❌ Server mati saat start, coba jalankan uvicorn manual untuk lihat error-nya")
+                try:
+                    if client.get("/").status_code == 200:
+                        break
+                except httpx.TransportError:
+                    time.sleep(0.005)
+            result = {"first_response": (time.perf_counter() - start) * 1000}
+            for name in ("first_feed", "warm_feed"):
+                t = time.perf_counter()
+                client.get("/reports", params={"limit": 20}).raise_for_status()
+                result[name] = (time.perf_counter() - t) * 1000
+            return result
+    finally:
+        server.terminate()
+        server.wait(10)
+
+def top_imports(env: dict, n: int = 10) -> list:
+    """Modul dengan waktu import kumulatif terbesar (python -X importtime), anak langsung dari main."""
+    out = subprocess.run([sys.executable, "-X", "importtime", "-c", "import main"], env=env, capture_output=True, text=True)
+    rows = []
+    for line in out.stderr.splitlines():
+        match = re.match(r"import time:\s+\d+ \|\s+(\d+) \|( +)(\S+)", line)
+        if match and len(match.group(2)) == 3: # Indentasi 2 spasi = diimport langsung oleh main
+            rows.append((int(match.group(1)) / 1000, match.group(3)))
+    return [{"module": name, "ms": round(ms, 1)} for ms, name in sorted(rows, reverse=True)[:n]]
+
+def stats(samples: list) -> dict:
+    return {
+        "median_ms": round(statistics.median(samples), 2),
+        "min_ms": round(min(samples), 2),
+        "max_ms": round(max(samples), 2),
+    }
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--runs", type=int, default=5)
+    parser.add_argument("--redis", choices=("none", "env"), default="none")
+    parser.add_argument("--importtime", action="store_true")
+    parser.add_argument("--out", help="Path JSON hasil (default bench/results/)")
+    args = parser.parse_args()
+    enter_work_dir()
+    env = child_env(args.redis)
+
+    samples = {"import_main": [], "first_response": [], "first_feed": [], "warm_feed": []}
+    measure_import(env) # Pemanasan cache bytecode (.pyc), bukan bagian cold start Cloud Run
+    for run in range(args.runs):
+        samples["import_main"].append(measure_import(env))
+        for name, ms in measure_server(env).items():
+            samples[name].append(ms)
+        print(f"\r⏱️  run {run + 1}/{args.runs}", end="", flush=True)
+    print()
+
+    results = {name: stats(values) for name, values in samples.items()}
+    for name, r in results.items():
+        print(f"{name:16} median {r['median_ms']:>8.1f} ms  (min {r['min_ms']:.1f}, max {r['max_ms']:.1f})")
+    extra = {}
+    if args.importtime:
+        extra["top_imports"] = top_imports(env)
+        for row in extra["top_imports"]:
+            print(f"   📦 {row['module']:24} {row['ms']:>7.1f} ms")
+
+    path = save_results("coldstart", {
+        "config": {"runs": args.runs, "redis": args.redis},
+        "results": results, **extra,
+    }, args.out)
+    print(f"💾 Hasil: {os.path.relpath(path)}")
+
+if __name__ == "__main__":
+    main()
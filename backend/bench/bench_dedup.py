@@ -0,0 +1,125 @@
+"""Benchmark deteksi duplikat (dedup.py): recall near-duplicate, false positive, dan latensi
+signature + lookup LSH. Korpus sintetis, tanpa Redis / DB.
+
+    cd backend && python bench/bench_dedup.py --reports 5000 --queries 2000
+"""
+import argparse
+import os
+import random
+import sys
+import time
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), ".."))
+from dedup import LSHIndex, facility_key, signature, shingles  # noqa: E402
+
+FACILITIES = ["Gedung A", "Gedung B", "Gedung C", "Gedung E", "Perpustakaan", "Lab Komputer",
+              "Masjid", "Kantin", "Parkiran", "GOR", "Auditorium", "Asrama"]
+PROBLEMS = [
+    ("AC rusak", "AC tidak dingin sama sekali dan mengeluarkan suara berisik"),
+    ("AC bocor", "air menetes dari unit AC ke lantai, licin dan basah"),
+    ("Proyektor mati", "proyektor tidak menyala waktu kuliah, lampu indikator merah berkedip"),
+    ("Wifi lemot", "koneksi wifi putus-putus dan sangat lambat, tidak bisa buka elearning"),
+    ("Toilet mampet", "kloset mampet dan air meluap, bau tidak sedap sampai ke lorong"),
+    ("Lampu padam", "beberapa lampu mati sehingga ruangan gelap saat sore"),
+    ("Kursi patah", "kaki kursi patah dan sandarannya lepas, bahaya kalau diduduki"),
+    ("Kran air bocor", "kran wastafel tidak bisa ditutup rapat, air terus mengalir"),
+    ("Stopkontak rusak", "stopkontak longgar dan kadang memercikkan api"),
+    ("Atap bocor", "plafon basah dan air hujan menetes ke meja"),
+    ("Pintu macet", "pintu susah dibuka dan engselnya berbunyi keras"),
+    ("Sampah menumpuk", "tempat sampah penuh dan tidak diangkut beberapa hari"),
+]
+FILLERS = ["tolong segera diperbaiki", "sudah dari minggu lalu", "mohon ditindaklanjuti",
+           "mengganggu perkuliahan", "sudah dilaporkan ke satpam", "terima kasih"]
+
+def make_report(rng: random.Random):
+    title, description = rng.choice(PROBLEMS)
+    facility = rng.choice(FACILITIES)
+    room = f"ruang {rng.choice('ABCDE')}{rng.randint(1, 4)}{rng.randint(1, 20):02d}"
+    extra = " ".join(rng.sample(FILLERS, rng.randint(0, 2)))
+    return f"{title} di {room}", f"{description} di {room}. {extra}".strip(), facility
+
+def typo(word: str, rng: random.Random) -> str:
+    if len(word) < 4:
+        return word
+    i = rng.randrange(1, len(word) - 1)
+    return word[:i] + word[i + 1:] if rng.random() < 0.5 else word[:i] + word[i + 1] + word[i] + word[i + 2:]
+
+def perturb(report, rng: random.Random):
+    """Laporan orang lain untuk masalah yang sama: urutan, typo, kata tambahan / hilang."""
+    title, description, facility = report
+    words = description.split()
+    for _ in range(rng.randint(1, 3)):
+        action = rng.random()
+        i = rng.randrange(len(words))
+        if action < 0.4:
+            words[i] = typo(words[i], rng)
+        elif action < 0.7 and len(words) > 4:
+            del words[i]
+        else:
+            words.insert(i, rng.choice(["banget", "lagi", "parah", "juga", "nih"]))
+    title_words = title.split()
+    if rng.random() < 0.5:
+        title_words[0] = typo(title_words[0], rng)
+    return " ".join(title_words).lower(), " ".join(words), facility
+
+def problem(title: str) -> str:
+    return title.split(" di ")[0].lower()
+
+def jaccard(a, b) -> float:
+    sa, sb = shingles(*a[:2]), shingles(*b[:2])
+    return len(sa & sb) / len(sa | sb)
+
+def percentile(samples: list, p: float) -> float:
+    return samples[min(len(samples) - 1, int(len(samples) * p))]
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--reports", type=int, default=5000)
+    parser.add_argument("--queries", type=int, default=2000)
+    parser.add_argument("--seed", type=int, default=7)
+    args = parser.parse_args()
+    rng = random.Random(args.seed)
+
+    corpus = [make_report(rng) for _ in range(args.reports)]
+    start = time.perf_counter()
+    index = LSHIndex()
+    for report_id, report in enumerate(corpus):
+        index.add(report_id, facility_key(report[2]), signature(*report[:2]))
+    build = time.perf_counter() - start
+    print(f"🧩 Index {len(index)} laporan dibangun dalam {build:.2f}s "
+          f"({build / len(index) * 1e6:.0f} µs/laporan, ~{len(index) * 256 / 1024:.0f} KB signature di Redis)")
+
+    # 1. Near-duplicate: sumbernya harus ikut keluar di hasil
+    found, sims, latencies, lookups = 0, [], [], []
+    for _ in range(args.queries):
+        source_id = rng.randrange(len(corpus))
+        query = perturb(corpus[source_id], rng)
+        sims.append(jaccard(query, corpus[source_id]))
+        t = time.perf_counter()
+        sig = signature(*query[:2])
+        t_sig = time.perf_counter()
+        matches = index.query(facility_key(query[2]), sig)
+        done = time.perf_counter()
+        latencies.append((done - t) * 1000)
+        lookups.append((done - t_sig) * 1000)
+        # Korpus punya laporan kembar (masalah + ruang + fasilitas sama), itu juga benar
+        found += any(corpus[rid][0] == corpus[source_id][0] and corpus[rid][2] == corpus[source_id][2]
+                     for rid, _ in matches)
+    sims.sort()
+    print(f"✅ Recall near-duplicate : {found / args.queries:.1%} "
+          f"(Jaccard asli p10={percentile(sims, 0.1):.2f} median={percentile(sims, 0.5):.2f})")
+
+    # 2. Laporan baru dengan masalah lain: idealnya tidak ada hasil (fasilitas sudah jadi partisi)
+    false_hits = 0
+    for _ in range(args.queries):
+        title, description, facility = make_report(rng)
+        matches = index.query(facility_key(facility), signature(title, description))
+        false_hits += any(problem(corpus[rid][0]) != problem(title) for rid, _ in matches)
+    print(f"🚫 False positive      : {false_hits / args.queries:.1%} (masalah lain tapi dianggap mirip)")
+
+    for label, samples in (("Lookup LSH saja", lookups), ("Signature + lookup", latencies)):
+        samples.sort()
+        print(f"⏱️  {label:20}: p50 {percentile(samples, 0.5):.3f} ms, p99 {percentile(samples, 0.99):.3f} ms")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,138 @@
+"""Export laporan: throughput, memori server, dan latensi feed selama export jalan.
+Dibandingkan dengan cara lama admin.js (jalan halaman demi halaman lewat /reports?limit=50).
+
+    cd backend && python bench/loadtest.py seed --reports 100000 --wipe
+    cd backend && python bench/bench_export.py                 # csv, ndjson, csv+gzip, paging lama
+    python bench/compare.py bench/results/export-<lama>.json bench/results/export-<baru>.json
+
+Memori = RSS proses uvicorn (Linux, /proc), diambil tiap 50ms selama satu skenario; yang dilaporkan
+kenaikan puncaknya dibanding sebelum skenario mulai. Satu export pemanasan dibuang dulu (import lazy,
+cache SQLite, arena allocator). Tiap skenario ditemani --readers klien feed.
+"""
+import argparse
+import asyncio
+import multiprocessing
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), ".."))
+from bench.benchlib import WORK_DIR, enter_work_dir, save_results, summarize  # noqa: E402
+
+enter_work_dir()
+from bench.loadtest import ADMIN, free_port, serve, wait_ready  # noqa: E402
+
+SCENARIOS = {
+    "export_csv": {"format": "csv"},
+    "export_ndjson": {"format": "ndjson"},
+    "export_csv_gzip": {"format": "csv", "gzip": "true"},
+    "paged_feed": None, # Cara lama: semua halaman /reports
+}
+
+def rss_mb(pid: int) -> float:
+    with open(f"/proc/{pid}/status") as f:
+        for line in f:
+            if line.startswith("VmRSS:"):
+                return int(line.split()[1]) / 1024
+    return 0.0
+
+async def download(client, headers: dict, params) -> tuple:
+    """(byte diterima, jumlah request)."""
+    if params is not None:
+        size = 0
+        async with client.stream("GET", "/reports/export", params=params, headers=headers) as response:
+            response.raise_for_status()
+            async for chunk in response.aiter_raw():
+                size += len(chunk)
+        return size, 1
+    size, requests, cursor = 0, 0, None
+    while True:
+        query = {"limit": 50, **({"cursor": cursor} if cursor else {})}
+        response = await client.get("/reports", params=query, headers=headers)
+        response.raise_for_status()
+        size, requests = size + len(response.content), requests + 1
+        cursor = response.json()["next_cursor"]
+        if not cursor:
+            return size, requests
+
+async def scenario(base_url: str, pid: int, params, readers: int) -> dict:
+    import httpx
+    from auth import create_access_token
+
+    headers = {"Authorization": f"Bearer {create_access_token({'sub': ADMIN, 'role': 'admin'})}"}
+    feed = []
+    done = asyncio.Event()
+    baseline_rss = rss_mb(pid)
+    peak_rss = [baseline_rss]
+
+    async def reader(client):
+        while not done.is_set():
+            start = time.perf_counter()
+            (await client.get("/reports", params={"limit": 20})).raise_for_status()
+            feed.append((time.perf_counter() - start) * 1000)
+
+    async def sampler():
+        while not done.is_set():
+            peak_rss[0] = max(peak_rss[0], rss_mb(pid))
+            await asyncio.sleep(0.05)
+
+    async with httpx.AsyncClient(base_url=base_url, timeout=600) as client:
+        tasks = [asyncio.create_task(reader(client)) for _ in range(readers)] + [asyncio.create_task(sampler())]
+        start = time.perf_counter()
+        size, requests = await download(client, headers, params)
+        seconds = time.perf_counter() - start
+        done.set()
+        await asyncio.gather(*tasks)
+
+    return {
+        "seconds": round(seconds, 3),
+        "mb": round(size / 2 ** 20, 2),
+        "requests": requests,
+        "rss_growth_mb": round(peak_rss[0] - baseline_rss, 1),
+        "feed": summarize(feed, seconds),
+    }
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--readers", type=int, default=4, help="Klien feed yang jalan bersamaan dengan export")
+    parser.add_argument("--redis", choices=("fake", "none", "real"), default="fake")
+    parser.add_argument("--only", help="Nama skenario dipisah koma (default semua)")
+    parser.add_argument("--out", help="Path JSON hasil (default bench/results/)")
+    args = parser.parse_args()
+
+    from sqlalchemy import func, select
+    import database
+    from models import ReportModel
+
+    with database.SessionLocal() as db:
+        reports = db.execute(select(func.count()).select_from(ReportModel)).scalar()
+    if not reports:
+        sys.exit("❌ DB kosong, jalankan `python bench/loadtest.py seed` dulu")
+    names = args.only.split(",") if args.only else list(SCENARIOS)
+
+    port = free_port()
+    log_path = os.path.join(WORK_DIR, "server.log")
+    server = multiprocessing.get_context("spawn").Process(target=serve, args=(port, args.redis, 0.0, log_path), daemon=True)
+    server.start()
+    results = {}
+    try:
+        wait_ready(f"http://127.0.0.1:{port}", server)
+        print(f"📦 {reports} laporan, {args.readers} klien feed paralel")
+        asyncio.run(scenario(f"http://127.0.0.1:{port}", server.pid, SCENARIOS["export_ndjson"], 1)) # Pemanasan
+        for name in names:
+            r = results[name] = asyncio.run(scenario(f"http://127.0.0.1:{port}", server.pid, SCENARIOS[name], args.readers))
+            print(f"⏱️  {name:16} {r['seconds']:>7.2f}s {r['mb']:>8.1f} MB {r['requests']:>6} req  "
+                  f"RSS +{r['rss_growth_mb']:>6.1f} MB  feed p50 {r['feed']['p50_ms']:.1f} / p95 {r['feed']['p95_ms']:.1f} ms")
+    finally:
+        server.terminate()
+        server.join(10)
+
+    path = save_results("export", {
+        "config": {"db": database.engine.dialect.name, "reports": reports, "readers": args.readers, "redis": args.redis},
+        # compare.py membandingkan metrik datar, jadi p95 feed diangkat ke atas
+        "results": {name: {**r, "feed_p95_ms": r["feed"]["p95_ms"]} for name, r in results.items()},
+    }, args.out)
+    print(f"💾 Hasil: {os.path.relpath(path)}")
+
+if __name__ == "__main__":
+    main()
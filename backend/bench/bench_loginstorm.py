@@ -0,0 +1,126 @@
+"""Feed saat login storm (awal kuliah: ratusan mahasiswa login bareng). Dua fase di server yang sama:
+1) baseline: cuma pembaca feed, 2) storm: pembaca feed yang sama + banyak klien yang terus login.
+Yang diharapkan: p50/p95 feed di fase storm tidak jauh dari baseline (bcrypt tidak makan threadpool feed).
+
+    cd backend && python bench/loadtest.py seed --reports 5000   # sekali, user bench_u* + password bench
+    cd backend && python bench/bench_loginstorm.py --duration 10 --readers 8 --logins 32
+    python bench/compare.py bench/results/loginstorm-<lama>.json bench/results/loginstorm-<baru>.json
+
+Server-nya sama dengan loadtest.py (uvicorn di proses terpisah, Redis palsu kecuali --redis none/real).
+Sebagian user yang login punya token valid di header GET /my-reports, jadi cache token ikut teruji.
+"""
+import argparse
+import asyncio
+import multiprocessing
+import os
+import random
+import sys
+import time
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), ".."))
+from bench.benchlib import WORK_DIR, enter_work_dir, save_results, summarize  # noqa: E402
+
+enter_work_dir()
+from bench.loadtest import PASSWORD, free_port, print_table, serve, username, wait_ready  # noqa: E402
+
+async def phase(base_url: str, seconds: float, readers: int, logins: int, users: int, rng: random.Random, tokens: list) -> dict:
+    """Jalankan pembaca feed (+ klien login) selama `seconds`, kembalikan ringkasan per jenis request.
+    Token hasil login ditampung di `tokens` (dipakai lagi di fase berikutnya)."""
+    import httpx
+
+    samples = {"feed": [], "my_reports": [], "login": []}
+    errors = {name: 0 for name in samples}
+    loop = asyncio.get_running_loop()
+    deadline = loop.time() + seconds
+
+    async def timed(name, coro):
+        start = time.perf_counter()
+        try:
+            response = await coro
+            ok = response.status_code == 200
+        except httpx.HTTPError:
+            response, ok = None, False
+        samples[name].append((time.perf_counter() - start) * 1000)
+        errors[name] += not ok
+        return response if ok else None
+
+    async def reader(client):
+        while loop.time() < deadline:
+            if tokens and rng.random() < 0.3:
+                headers = {"Authorization": f"Bearer {rng.choice(tokens)}"}
+                await timed("my_reports", client.get("/my-reports", params={"limit": 20}, headers=headers))
+            else:
+                await timed("feed", client.get("/reports", params={"limit": 20}))
+
+    async def login(client):
+        while loop.time() < deadline:
+            body = {"username": username(rng.randrange(users)), "password": PASSWORD}
+            response = await timed("login", client.post("/login", json=body))
+            if response is not None and len(tokens) < 500:
+                tokens.append(response.json()["access_token"])
+
+    limits = httpx.Limits(max_connections=readers + logins)
+    async with httpx.AsyncClient(base_url=base_url, limits=limits, timeout=120) as client:
+        await asyncio.gather(*(reader(client) for _ in range(readers)), *(login(client) for _ in range(logins)))
+    return {name: summarize(values, seconds, errors[name]) for name, values in samples.items() if values}
+
+async def storm(base_url: str, args, users: int) -> dict:
+    rng = random.Random(args.seed)
+    tokens = []
+    await phase(base_url, args.warmup, args.readers, 2, users, rng, tokens) # Pemanasan cache + koleksi token
+    baseline = await phase(base_url, args.duration, args.readers, 0, users, rng, tokens)
+    loaded = await phase(base_url, args.duration, args.readers, args.logins, users, rng, tokens)
+    results = {f"{name}_baseline": r for name, r in baseline.items()}
+    results.update({f"{name}_storm": r for name, r in loaded.items()})
+    return results
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--duration", type=float, default=10, help="Detik per fase")
+    parser.add_argument("--warmup", type=float, default=3)
+    parser.add_argument("--readers", type=int, default=8, help="Klien yang terus baca feed")
+    parser.add_argument("--logins", type=int, default=32, help="Klien yang terus login saat storm")
+    parser.add_argument("--redis", choices=("fake", "none", "real"), default="fake")
+    parser.add_argument("--seed", type=int, default=11)
+    parser.add_argument("--out", help="Path JSON hasil (default bench/results/)")
+    args = parser.parse_args()
+
+    from sqlalchemy import func, select
+    import database
+    from models import UserModel
+
+    with database.SessionLocal() as db:
+        users = db.execute(select(func.count()).select_from(UserModel).where(UserModel.username.like("bench_u%"))).scalar()
+    if not users:
+        sys.exit("❌ Belum ada user bench, jalankan `python bench/loadtest.py seed` dulu")
+
+    port = free_port()
+    log_path = os.path.join(WORK_DIR, "server.log")
+    server = multiprocessing.get_context("spawn").Process(target=serve, args=(port, args.redis, 0.0, log_path), daemon=True)
+    server.start()
+    try:
+        wait_ready(f"http://127.0.0.1:{port}", server)
+        print(f"🔥 {args.readers} pembaca feed, storm {args.logins} klien login, {args.duration}s per fase")
+        results = asyncio.run(storm(f"http://127.0.0.1:{port}", args, users))
+    finally:
+        server.terminate()
+        server.join(10)
+
+    print_table(results)
+    for name in ("feed", "my_reports"):
+        if f"{name}_baseline" in results and f"{name}_storm" in results:
+            before, after = results[f"{name}_baseline"]["p95_ms"], results[f"{name}_storm"]["p95_ms"]
+            if before:
+                print(f"📈 p95 {name} saat storm: {after / before:.1f}x baseline")
+    path = save_results("loginstorm", {
+        "config": {
+            "db": database.engine.dialect.name, "users": users, "redis": args.redis,
+            "duration": args.duration, "readers": args.readers, "logins": args.logins, "seed": args.seed,
+            "async_mode": os.getenv("ASYNC_MODE", "0") == "1",
+        },
+        "results": results,
+    }, args.out)
+    print(f"💾 Hasil: {os.path.relpath(path)}")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,111 @@
+"""Benchmark pipeline resize_image: versi lama (tempfile, decode penuh, 1 thumbnail)
+vs versi baru (di memori, draft(), semua varian sekali jalan). Pakai bucket palsu di memori.
+
+    cd backend && python bench/bench_resize.py --runs 5 --size 4000x3000
+"""
+import argparse
+import io
+import os
+import sys
+import tempfile
+import time
+
+from PIL import Image
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), "..", "functions"))
+import main as resize_function  # noqa: E402
+
+class FakeBlob:
+    def __init__(self, bucket, name):
+        self.bucket = bucket
+        self.name = name
+        self.content_type = None
+        self.cache_control = None
+
+    def download_as_bytes(self):
+        return self.bucket.objects[self.name][0]
+
+    def download_to_filename(self, path):
+        with open(path, "wb") as f:
+            f.write(self.download_as_bytes())
+
+    def upload_from_string(self, data, content_type=None):
+        self.bucket.objects[self.name] = (data, content_type, self.cache_control)
+
+    def upload_from_filename(self, path):
+        with open(path, "rb") as f:
+            self.upload_from_string(f.read(), self.content_type)
+
+class FakeBucket:
+    def __init__(self):
+        self.objects = {}
+
+    def blob(self, name):
+        return FakeBlob(self, name)
+
+def make_photo(width: int, height: int) -> bytes:
+    """Foto JPEG sintetis dengan tag EXIF orientation=6 (seperti foto HP portrait)."""
+    image = Image.radial_gradient("L").resize((width, height)).convert("RGB")
+    exif = Image.Exif()
+    exif[0x0112] = 6
+    out = io.BytesIO()
+    image.save(out, format="JPEG", quality=92, exif=exif)
+    return out.getvalue()
+
+def legacy_process(bucket, file_name: str):
+    """Salinan alur lama: download ke tempfile, decode penuh, simpan 1 thumbnail 300px."""
+    _, source = tempfile.mkstemp()
+    target = source + "_thumb"
+    try:
+        bucket.blob(file_name).download_to_filename(source)
+        with Image.open(source) as image:
+            if image.mode in ("RGBA", "P"):
+                image = image.convert("RGB")
+            image.thumbnail((300, 300))
+            image.save(target, format="JPEG", quality=80)
+        new_blob = bucket.blob(f"{os.path.splitext(file_name)[0]}_thumb.jpg")
+        new_blob.upload_from_filename(target)
+    finally:
+        for path in (source, target):
+            if os.path.exists(path):
+                os.remove(path)
+
+def timed(fn, runs: int) -> list:
+    samples = []
+    for _ in range(runs):
+        start = time.perf_counter()
+        fn()
+        samples.append((time.perf_counter() - start) * 1000)
+    return samples
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--runs", type=int, default=5)
+    parser.add_argument("--size", default="4000x3000")
+    args = parser.parse_args()
+    width, height = (int(v) for v in args.size.split("x"))
+
+    bucket = FakeBucket()
+    bucket.objects["photo.jpg"] = (make_photo(width, height), "image/jpeg", None)
+    print(f"📷 Sumber: {width}x{height} JPEG, {len(bucket.objects['photo.jpg'][0]) / 1024:.0f} KB")
+
+    source = bucket.objects["photo.jpg"][0]
+    n_variants = len(resize_function.VARIANT_WIDTHS) * len(resize_function.VARIANT_FORMATS)
+    cases = [
+        ("lama, 1 thumbnail 300px JPEG", lambda: legacy_process(bucket, "photo.jpg")),
+        ("baru, output sama (300px JPEG)", lambda: resize_function.build_variants(source, [300], ["jpeg"])),
+        (f"baru, {n_variants} varian + upload", lambda: resize_function.process_object(bucket, "photo.jpg")),
+    ]
+    for label, fn in cases:
+        samples = sorted(timed(fn, args.runs))
+        print(f"{label:34}: median {samples[len(samples) // 2]:8.1f} ms")
+
+    for name, (data, content_type, cache_control) in sorted(bucket.objects.items()):
+        if name == "photo.jpg":
+            continue
+        with Image.open(io.BytesIO(data)) as image:
+            size = f"{image.width}x{image.height}"
+        print(f"  {name:22} {size:>10} {len(data) / 1024:7.1f} KB  {content_type}  {cache_control}")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,58 @@
+"""Helper bersama loadtest.py / microbench.py / compare.py: persentil, info commit, simpan hasil JSON."""
+import datetime
+import json
+import os
+import platform
+import subprocess
+
+BENCH_DIR = os.path.dirname(os.path.abspath(__file__))
+BACKEND_DIR = os.path.dirname(BENCH_DIR)
+RESULTS_DIR = os.path.join(BENCH_DIR, "results")
+WORK_DIR = os.path.join(BENCH_DIR, ".work")
+
+def enter_work_dir():
+    """SQLite lokal (./local_test.db) ditaruh di folder kerja bench, bukan DB dev. Path relatif itu
+    di-resolve saat engine dibuat, jadi panggil ini sebelum import apa pun yang menyentuh database.py."""
+    os.makedirs(WORK_DIR, exist_ok=True)
+    os.chdir(WORK_DIR)
+
+def percentile(samples: list, p: float) -> float:
+    """Nearest-rank, samples harus sudah urut."""
+    return samples[min(len(samples) - 1, int(len(samples) * p))] if samples else 0.0
+
+def summarize(latencies_ms: list, seconds: float, errors: int = 0) -> dict:
+    samples = sorted(latencies_ms)
+    return {
+        "count": len(samples),
+        "errors": errors,
+        "rps": round(len(samples) / seconds, 2) if seconds else 0.0,
+        "mean_ms": round(sum(samples) / len(samples), 3) if samples else 0.0,
+        "p50_ms": round(percentile(samples, 0.50), 3),
+        "p95_ms": round(percentile(samples, 0.95), 3),
+        "p99_ms": round(percentile(samples, 0.99), 3),
+        "max_ms": round(samples[-1], 3) if samples else 0.0,
+    }
+
+def git_info() -> dict:
+    def run(*args):
+        try:
+            return subprocess.run(["git", *args], cwd=BACKEND_DIR, capture_output=True, text=True, timeout=10).stdout.strip()
+        except (OSError, subprocess.SubprocessError):
+            return ""
+    return {"commit": run("rev-parse", "--short", "HEAD") or "unknown", "dirty": bool(run("status", "--porcelain", "--", "."))}
+
+def environment() -> dict:
+    return {"python": platform.python_version(), "machine": platform.machine(), "cpus": os.cpu_count()}
+
+def save_results(kind: str, results: dict, path: str = None) -> str:
+    """Tulis hasil + metadata commit ke bench/results/<kind>-<commit>-<waktu>.json (atau path)."""
+    git = git_info()
+    now = datetime.datetime.now()
+    results = {"kind": kind, "git": git, "timestamp": now.isoformat(timespec="seconds"), "env": environment(), **results}
+    if path is None:
+        os.makedirs(RESULTS_DIR, exist_ok=True)
+        suffix = "-dirty" if git["dirty"] else ""
+        path = os.path.join(RESULTS_DIR, f"{kind}-{git['commit']}{suffix}-{now:%Y%m%d-%H%M%S}.json")
+    with open(path, "w") as f:
+        json.dump(results, f, indent=2)
+    return path
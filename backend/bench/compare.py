@@ -0,0 +1,69 @@
+"""Bandingkan dua hasil JSON loadtest.py / microbench.py / bench_coldstart.py / bench_loginstorm.py /
+bench_export.py (mis. sebelum vs sesudah satu commit).
+
+    cd backend && python bench/compare.py bench/results/loadtest-abc123-*.json bench/results/loadtest-def456-*.json
+
+Exit code 1 kalau ada metrik yang lebih buruk dari --threshold (default 10%), bisa dipakai di CI.
+Angka dari mesin / config berbeda tidak bisa dibandingkan, jadi config-nya dicek dulu.
+"""
+import argparse
+import json
+import sys
+
+# Metrik yang dibandingkan: (nama, True kalau makin besar makin baik)
+METRICS = {
+    "loadtest": [("rps", True), ("p50_ms", False), ("p95_ms", False), ("p99_ms", False)],
+    "microbench": [("us_per_op", False)],
+    "coldstart": [("median_ms", False)],
+    "loginstorm": [("p50_ms", False), ("p95_ms", False), ("p99_ms", False)],
+    "export": [("seconds", False), ("rss_growth_mb", False), ("feed_p95_ms", False)],
+}
+
+def load(path: str) -> dict:
+    with open(path) as f:
+        return json.load(f)
+
+def delta(old: float, new: float) -> float:
+    return (new - old) / old if old else 0.0
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("old")
+    parser.add_argument("new")
+    parser.add_argument("--threshold", type=float, default=0.10, help="Batas regresi relatif (0.10 = 10%%)")
+    args = parser.parse_args()
+    old, new = load(args.old), load(args.new)
+
+    if old["kind"] != new["kind"]:
+        sys.exit(f"❌ Jenis hasil beda: {old['kind']} vs {new['kind']}")
+    for key in sorted(set(old.get("config", {})) | set(new.get("config", {}))):
+        if key != "seed" and old.get("config", {}).get(key) != new.get("config", {}).get(key):
+            print(f"⚠️  Config beda ({key}): {old['config'].get(key)} -> {new['config'].get(key)}")
+    if old["env"] != new["env"]:
+        print(f"⚠️  Mesin beda: {old['env']} -> {new['env']}")
+
+    metrics = METRICS[old["kind"]]
+    print(f"{old['git']['commit']} -> {new['git']['commit']}\n")
+    print(f"{'':22}" + "".join(f"{name:>26}" for name, _ in metrics))
+    regressions = []
+    for name in new["results"]:
+        if name not in old["results"]:
+            continue
+        cells = []
+        for metric, higher_is_better in metrics:
+            a, b = old["results"][name][metric], new["results"][name][metric]
+            change = delta(a, b)
+            worse = -change if higher_is_better else change
+            flag = " ❌" if worse > args.threshold else (" ✅" if -worse > args.threshold else "  ")
+            if worse > args.threshold:
+                regressions.append(f"{name} {metric}")
+            cells.append(f"{a:>9.2f} -> {b:>9.2f} {change:>+5.0%}{flag}")
+        print(f"{name:22}" + "".join(f"{cell:>26}" for cell in cells))
+
+    if regressions:
+        print(f"\n❌ Regresi > {args.threshold:.0%}: {', '.join(regressions)}")
+        sys.exit(1)
+    print(f"\n✅ Tidak ada regresi > {args.threshold:.0%}")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,453 @@
+"""Load test end-to-end: app asli di uvicorn, Redis palsu di memori (fakeredis), bucket GCS palsu.
+Workload campuran (feed, detail, search, upvote, create, update admin, login), hasilnya throughput +
+p50/p95/p99 per endpoint, disimpan ke JSON biar bisa dibandingkan antar commit (lihat compare.py).
+
+    pip install fakeredis httpx   # cuma buat bench, tidak masuk requirements.txt
+    cd backend
+    python bench/loadtest.py seed --reports 100000          # SQLite di bench/.work/
+    python bench/loadtest.py run --duration 30 --concurrency 32
+    python bench/compare.py bench/results/loadtest-<lama>.json bench/results/loadtest-<baru>.json
+
+Postgres lokal: set DB_USER / DB_PASS / DB_NAME / DB_HOST seperti di Cloud Run (pakai DB khusus bench,
+seed menghapus isi tabel kalau diberi --wipe). ASYNC_MODE, LIKES_WRITE_BEHIND, DB_POOL_* dll ikut env.
+Workload ikut menulis (create, upvote, update), jadi buat perbandingan ketat seed ulang pakai --wipe
+sebelum tiap run.
+"""
+import argparse
+import asyncio
+import datetime
+import multiprocessing
+import os
+import random
+import re
+import socket
+import sys
+import time
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), ".."))
+from bench.benchlib import BACKEND_DIR, WORK_DIR, enter_work_dir, save_results, summarize  # noqa: E402
+
+enter_work_dir()
+from bench.bench_dedup import FACILITIES, PROBLEMS, make_report, typo  # noqa: E402
+
+PASSWORD = "benchpass"
+ADMIN = "bench_admin"
+STATUSES = (("Pending", 60), ("Proses", 25), ("Selesai", 10), ("Ditolak", 5))
+PRIORITIES = ("Low", "Medium", "High", "Critical")
+
+# Bobot default workload (kira-kira pola trafik: kebanyakan baca feed)
+DEFAULT_MIX = {
+    "feed_newest": 25, "feed_likes": 15, "feed_next": 10, "detail": 15, "search": 5, "my_reports": 5,
+    "stats": 2, "upvote": 10, "create": 5, "admin_update": 5, "login": 3,
+}
+# Status yang dianggap normal (upvote dua kali -> 400, bukan error)
+EXPECTED = {"upvote": (200, 400)}
+
+def username(i: int) -> str:
+    return f"bench_u{i}"
+
+# --- SEED ---
+def weighted(rng: random.Random, choices):
+    return rng.choices([c for c, _ in choices], weights=[w for _, w in choices])[0]
+
+def seed(args):
+    from alembic import command
+    from alembic.config import Config
+    from sqlalchemy import func, insert, select, text
+    import database
+    from auth import get_password_hash
+    from models import ReportArchive, ReportLike, ReportLikeArchive, ReportModel, UserModel
+
+    command.upgrade(Config(os.path.join(BACKEND_DIR, "alembic.ini")), "head")
+    engine = database.engine
+    with engine.connect() as conn:
+        existing = conn.execute(select(func.count()).select_from(ReportModel)).scalar()
+    if existing and not args.wipe:
+        sys.exit(f"❌ DB sudah berisi {existing} laporan. Pakai --wipe untuk mengosongkan (DB khusus bench!)")
+
+    rng = random.Random(args.seed)
+    users = args.users or min(max(100, args.reports // 20), 20000)
+    password_hash = get_password_hash(PASSWORD) # Sekali saja, bcrypt mahal
+    start = time.perf_counter()
+    with engine.begin() as conn:
+        for table in (ReportLikeArchive, ReportArchive, ReportLike, ReportModel, UserModel):
+            conn.execute(table.__table__.delete())
+        if engine.dialect.name == "sqlite": # reports AUTOINCREMENT: tanpa ini id baru lanjut dari seed lama
+            conn.execute(text("DELETE FROM sqlite_sequence WHERE name = 'reports'"))
+        conn.execute(insert(UserModel.__table__), [
+            {"username": username(i), "password_hash": password_hash, "role": "user"} for i in range(users)
+        ] + [{"username": ADMIN, "password_hash": password_hash, "role": "admin"}])
+
+    # Like miring (Pareto): sebagian kecil laporan dapat hampir semua like
+    now = datetime.datetime.now(datetime.timezone.utc)
+    total_likes = 0
+    for batch_start in range(1, args.reports + 1, args.batch):
+        reports, likes = [], []
+        for report_id in range(batch_start, min(batch_start + args.batch, args.reports + 1)):
+            title, description, facility = make_report(rng)
+            n_likes = min(users, int(rng.paretovariate(args.likes_alpha)) - 1)
+            reports.append({
+                "id": report_id, "title": title, "description": description, "facility": facility,
+                "image_url": f"https://storage.googleapis.com/bench/{report_id}.jpg" if rng.random() < 0.3 else None,
+                "status": weighted(rng, STATUSES), "priority": rng.choice(PRIORITIES),
+                "created_at": now - datetime.timedelta(minutes=(args.reports - report_id) * 5),
+                "username": username(int(rng.paretovariate(1.2)) % users), "likes": n_likes,
+            })
+            likes.extend({"report_id": report_id, "user_username": username(u)} for u in rng.sample(range(users), n_likes))
+        with engine.begin() as conn:
+            conn.execute(insert(ReportModel.__table__), reports)
+            if likes:
+                conn.execute(insert(ReportLike.__table__), likes)
+        total_likes += len(likes)
+        print(f"\r🌱 {reports[-1]['id']}/{args.reports} laporan, {total_likes} like", end="", flush=True)
+
+    with engine.begin() as conn:
+        if engine.dialect.name == "postgresql": # id diisi manual, sequence harus disusulkan
+            conn.execute(text("SELECT setval(pg_get_serial_sequence('reports', 'id'), (SELECT max(id) FROM reports))"))
+        conn.execute(text("ANALYZE"))
+    print(f"\n✅ Seed selesai dalam {time.perf_counter() - start:.1f}s: {args.reports} laporan, {users} user, {total_likes} like")
+
+# --- SERVER (proses terpisah biar driver tidak rebutan GIL dengan app) ---
+class FakeBlob:
+    def __init__(self, bucket, name):
+        self.bucket = bucket
+        self.name = name
+        self.content_type = None
+        self.size = None
+
+    @property
+    def public_url(self):
+        return f"https://storage.googleapis.com/bench/{self.name}"
+
+    def upload_from_file(self, file, content_type=None, size=None):
+        time.sleep(self.bucket.latency)
+        data = file.read()
+        self.content_type, self.size = content_type, len(data)
+        self.bucket.objects[self.name] = self
+
+    def generate_signed_url(self, **kwargs):
+        return f"https://storage.googleapis.com/bench/{self.name}?X-Goog-Signature=fake"
+
+    def delete(self):
+        self.bucket.objects.pop(self.name, None)
+
+class FakeBucket:
+    def __init__(self, latency: float):
+        self.latency = latency
+        self.objects = {}
+
+    def blob(self, name):
+        return FakeBlob(self, name)
+
+    def get_blob(self, name):
+        time.sleep(self.latency)
+        return self.objects.get(name)
+
+def use_fake_redis():
+    """Semua client Redis app (sync + async) diarahkan ke satu FakeServer, instrumentasi metrics tetap jalan."""
+    import fakeredis
+    import metrics
+
+    server = fakeredis.FakeServer()
+
+    class BenchRedis(metrics.InstrumentedRedis):
+        def __init__(self, *args, **kwargs):
+            super().__init__(connection_pool=fakeredis.FakeRedis(server=server).connection_pool)
+
+    class BenchAsyncRedis(metrics.InstrumentedAsyncRedis):
+        def __init__(self, *args, **kwargs):
+            super().__init__(connection_pool=fakeredis.FakeAsyncRedis(server=server).connection_pool)
+
+    metrics.InstrumentedRedis = BenchRedis
+    metrics.InstrumentedAsyncRedis = BenchAsyncRedis
+
+def serve(port: int, redis_mode: str, gcs_latency: float, log_path: str):
+    sys.stdout = sys.stderr = open(log_path, "w", buffering=1)
+    if redis_mode == "fake":
+        os.environ["REDIS_HOST"] = "fakeredis"
+        use_fake_redis()
+    elif redis_mode == "none":
+        os.environ["REDIS_HOST"] = ""
+
+    import uvicorn
+    import uploads
+    bucket = FakeBucket(gcs_latency)
+    uploads.get_bucket = lambda: bucket
+    import main
+    uvicorn.run(main.app, host="127.0.0.1", port=port, log_level="warning", access_log=False)
+
+def free_port() -> int:
+    with socket.socket() as s:
+        s.bind(("127.0.0.1", 0))
+        return s.getsockname()[1]
+
+# --- DRIVER ---
+class Workload:
+    """State bersama worker: token per user, id laporan yang ada, cursor halaman berikut."""
+
+    def __init__(self, rng: random.Random, max_id: int, users: int, mix: dict, image_ratio: float):
+        from auth import create_access_token
+
+        self.rng = rng
+        self.max_id = max_id
+        self.users = users
+        self.ops = [op for op, w in mix.items() if w > 0]
+        self.weights = [mix[op] for op in self.ops]
+        self.image_ratio = image_ratio
+        self.cursors = []
+        self._create_token = create_access_token
+        self._tokens = {}
+        self.image = bytes(rng.getrandbits(8) for _ in range(64 * 1024))
+
+    def auth(self, name: str, role: str = "user") -> dict:
+        token = self._tokens.get(name)
+        if token is None:
+            token = self._tokens[name] = self._create_token({"sub": name, "role": role})
+        return {"Authorization": f"Bearer {token}"}
+
+    def user(self) -> str:
+        return username(int(self.rng.paretovariate(1.2)) % self.users)
+
+    def report_id(self) -> int:
+        # 80% laporan baru (halaman depan), sisanya acak
+        if self.rng.random() < 0.8:
+            return max(1, self.max_id - self.rng.randrange(min(1000, self.max_id)))
+        return self.rng.randint(1, self.max_id)
+
+    def search_query(self) -> str:
+        words = self.rng.choice(PROBLEMS)[0].lower().split()
+        if self.rng.random() < 0.2:
+            words = [typo(w, self.rng) for w in words]
+        return " ".join(words)
+
+    def request(self, op: str):
+        """(method, url, kwargs) untuk satu operasi."""
+        rng = self.rng
+        if op in ("feed_newest", "feed_likes"):
+            return "GET", "/reports", {"params": {"sort_by": op[5:], "limit": 20}}
+        if op == "feed_next":
+            if not self.cursors:
+                return self.request("feed_newest")
+            sort_by, cursor = self.cursors.pop(rng.randrange(len(self.cursors)))
+            return "GET", "/reports", {"params": {"sort_by": sort_by, "limit": 20, "cursor": cursor}}
+        if op == "detail":
+            return "GET", f"/reports/{self.report_id()}", {}
+        if op == "search":
+            return "GET", "/reports/search", {"params": {"q": self.search_query(), "limit": 20}}
+        if op == "my_reports":
+            return "GET", "/my-reports", {"params": {"limit": 20}, "headers": self.auth(self.user())}
+        if op == "stats":
+            return "GET", "/stats", {"headers": self.auth(ADMIN, "admin")}
+        if op == "upvote":
+            return "POST", f"/reports/{self.report_id()}/upvote", {"headers": self.auth(self.user())}
+        if op == "create":
+            title, description, _ = make_report(rng)
+            kwargs = {
+                "data": {"title": title, "description": description, "facility": rng.choice(FACILITIES), "force": "true"},
+                "headers": self.auth(self.user()),
+            }
+            if rng.random() < self.image_ratio:
+                kwargs["files"] = {"file": ("bukti.jpg", self.image, "image/jpeg")}
+            return "POST", "/reports", kwargs
+        if op == "admin_update":
+            body = {"status": weighted(rng, STATUSES), "priority": rng.choice(PRIORITIES), "admin_note": "bench"}
+            return "PUT", f"/reports/{self.report_id()}", {"json": body, "headers": self.auth(ADMIN, "admin")}
+        if op == "login":
+            return "POST", "/login", {"json": {"username": self.user(), "password": PASSWORD}}
+        raise ValueError(f"Operasi tidak dikenal: {op}")
+
+    def observe(self, op: str, kwargs: dict, response):
+        """Simpan cursor halaman berikut, catat id laporan baru."""
+        if op.startswith("feed") and response.status_code == 200:
+            cursor = response.json().get("next_cursor")
+            if cursor and len(self.cursors) < 1000:
+                self.cursors.append((kwargs["params"]["sort_by"], cursor))
+        elif op == "create" and response.status_code == 200:
+            self.max_id = max(self.max_id, response.json()["data"]["id"])
+
+async def drive(base_url: str, workload: Workload, args) -> dict:
+    import httpx
+
+    samples = {op: [] for op in workload.ops}
+    errors = {op: 0 for op in workload.ops}
+    error_examples = {}
+    loop = asyncio.get_running_loop()
+    measure_from = loop.time() + args.warmup
+    deadline = measure_from + args.duration
+
+    async def worker(client):
+        while loop.time() < deadline:
+            op = workload.rng.choices(workload.ops, weights=workload.weights)[0]
+            method, url, kwargs = workload.request(op)
+            start = time.perf_counter()
+            try:
+                response = await client.request(method, url, **kwargs)
+                ok = response.status_code in EXPECTED.get(op, (200,))
+                if not ok:
+                    error_examples.setdefault(op, f"{response.status_code} {response.text[:200]}")
+            except httpx.HTTPError as e:
+                response, ok = None, False
+                error_examples.setdefault(op, repr(e))
+            elapsed = (time.perf_counter() - start) * 1000
+            if response is not None and ok:
+                workload.observe(op, kwargs, response)
+            if loop.time() >= measure_from:
+                samples[op].append(elapsed)
+                errors[op] += not ok
+
+    limits = httpx.Limits(max_connections=args.concurrency, max_keepalive_connections=args.concurrency)
+    async with httpx.AsyncClient(base_url=base_url, limits=limits, timeout=60) as client:
+        await asyncio.gather(*(worker(client) for _ in range(args.concurrency)))
+        metrics_text = (await client.get("/metrics")).text
+
+    results = {op: summarize(samples[op], args.duration, errors[op]) for op in workload.ops}
+    results["ALL"] = summarize([s for op in workload.ops for s in samples[op]], args.duration, sum(errors.values()))
+    return {"results": results, "server": parse_server_metrics(metrics_text), "error_examples": error_examples}
+
+_SAMPLE = re.compile(r'^(\w+)\{(.*)\} (\S+)$')
+
+def parse_server_metrics(text: str) -> dict:
+    """Ringkasan dari /metrics app: rata-rata query SQL per request per route + hit ratio cache + fallback index."""
+    series = {}
+    for line in text.splitlines():
+        match = _SAMPLE.match(line)
+        if match:
+            name, labels, value = match.groups()
+            series[(name, labels)] = float(value)
+
+    def by(name: str, label: str, **where):
+        out = {}
+        for (n, labels), value in series.items():
+            if n == name:
+                parsed = dict(re.findall(r'(\w+)="([^"]*)"', labels))
+                if all(parsed.get(k) == v for k, v in where.items()):
+                    out[parsed.get(label)] = out.get(parsed.get(label), 0.0) + value
+        return out
+
+    counts = by("db_queries_per_request_count", "route")
+    queries = by("db_queries_per_request_sum", "route")
+    sql_time = by("db_time_per_request_seconds_sum", "route")
+    per_route = {
+        route: {
+            "requests": int(n),
+            "sql_queries_avg": round(queries.get(route, 0) / n, 2),
+            "sql_ms_avg": round(sql_time.get(route, 0) / n * 1000, 3),
+        }
+        for route, n in sorted(counts.items()) if n
+    }
+    lookups = by("cache_lookups_total", "result", cache="page")
+    total = sum(lookups.values())
+    return {
+        "routes": per_route,
+        "page_cache_hit_ratio": round(lookups.get("hit", 0) / total, 3) if total else None,
+        # Halaman feed yang jatuh ke DB per alasan (redis_off / warming / redis_error)
+        "index_fallback": {reason: int(n) for reason, n in by("index_fallback_total", "reason").items()},
+    }
+
+def parse_mix(spec: str) -> dict:
+    mix = dict(DEFAULT_MIX)
+    for part in filter(None, (spec or "").split(",")):
+        op, _, weight = part.partition("=")
+        if op not in mix:
+            sys.exit(f"❌ Operasi tidak dikenal di --mix: {op} (pilihan: {', '.join(mix)})")
+        mix[op] = float(weight)
+    return mix
+
+def run(args):
+    from sqlalchemy import func, select
+    import database
+    from models import ReportModel, UserModel
+
+    with database.SessionLocal() as db:
+        max_id = db.execute(select(func.max(ReportModel.id))).scalar() or 0
+        users = db.execute(select(func.count()).select_from(UserModel)).scalar() - 1
+    if not max_id:
+        sys.exit("❌ DB kosong, jalankan `python bench/loadtest.py seed` dulu")
+
+    port = args.port or free_port()
+    log_path = os.path.join(WORK_DIR, "server.log")
+    server = multiprocessing.get_context("spawn").Process(
+        target=serve, args=(port, args.redis, args.gcs_latency_ms / 1000, log_path), daemon=True,
+    )
+    server.start()
+    base_url = f"http://127.0.0.1:{port}"
+    try:
+        wait_ready(base_url, server)
+        mix = parse_mix(args.mix)
+        workload = Workload(random.Random(args.seed), max_id, users, mix, args.image_ratio)
+        print(f"🔥 {args.concurrency} koneksi, warmup {args.warmup}s + {args.duration}s, {max_id} laporan, redis={args.redis}")
+        report = asyncio.run(drive(base_url, workload, args))
+    finally:
+        server.terminate()
+        server.join(10)
+
+    print_table(report["results"])
+    for op, example in report["error_examples"].items():
+        print(f"⚠️  Contoh error {op}: {example}")
+    path = save_results("loadtest", {
+        "config": {
+            "db": database.engine.dialect.name, "reports": max_id, "users": users, "redis": args.redis,
+            "async_mode": os.getenv("ASYNC_MODE", "0") == "1",
+            "likes_write_behind": os.getenv("LIKES_WRITE_BEHIND", "0") == "1",
+            "duration": args.duration, "warmup": args.warmup, "concurrency": args.concurrency,
+            "gcs_latency_ms": args.gcs_latency_ms, "image_ratio": args.image_ratio, "mix": mix, "seed": args.seed,
+        },
+        **report,
+    }, args.out)
+    print(f"💾 Hasil: {os.path.relpath(path)} (log server: {os.path.relpath(log_path)})")
+
+def wait_ready(base_url: str, server, timeout: float = 60.0):
+    import httpx
+
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        if not server.is_alive():
+            sys.exit("❌ Server mati saat start, cek bench/.work/server.log")
+        try:
+            if httpx.get(base_url + "/", timeout=1).status_code == 200:
+                return
+        except httpx.HTTPError:
+            pass
+        time.sleep(0.2)
+    sys.exit("❌ Server tidak siap dalam 60s")
+
+def print_table(results: dict):
+    print(f"\n{'endpoint':14} {'req':>7} {'err':>5} {'rps':>8} {'p50':>8} {'p95':>8} {'p99':>8}  (ms)")
+    for op, r in results.items():
+        print(f"{op:14} {r['count']:>7} {r['errors']:>5} {r['rps']:>8.1f} "
+              f"{r['p50_ms']:>8.2f} {r['p95_ms']:>8.2f} {r['p99_ms']:>8.2f}")
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    sub = parser.add_subparsers(dest="command", required=True)
+
+    p_seed = sub.add_parser("seed", help="Isi DB dengan data sintetis")
+    p_seed.add_argument("--reports", type=int, default=10000)
+    p_seed.add_argument("--users", type=int, default=0, help="Default reports/20 (100..20000)")
+    p_seed.add_argument("--likes-alpha", type=float, default=1.5, help="Pareto alpha, makin kecil makin miring")
+    p_seed.add_argument("--batch", type=int, default=5000)
+    p_seed.add_argument("--seed", type=int, default=7)
+    p_seed.add_argument("--wipe", action="store_true", help="Kosongkan tabel yang sudah berisi")
+
+    p_run = sub.add_parser("run", help="Jalankan workload campuran")
+    p_run.add_argument("--duration", type=float, default=30)
+    p_run.add_argument("--warmup", type=float, default=5)
+    p_run.add_argument("--concurrency", type=int, default=16)
+    p_run.add_argument("--mix", help="Ubah bobot, mis. login=0,upvote=20 (default: %s)" %
+                       ",".join(f"{k}={v}" for k, v in DEFAULT_MIX.items()))
+    p_run.add_argument("--redis", choices=("fake", "none", "real"), default="fake",
+                       help="fake = fakeredis in-process, none = tanpa Redis, real = REDIS_HOST dari env")
+    p_run.add_argument("--gcs-latency-ms", type=float, default=0, help="Simulasi latensi bucket palsu")
+    p_run.add_argument("--image-ratio", type=float, default=0.2, help="Porsi create yang bawa gambar")
+    p_run.add_argument("--port", type=int, default=0)
+    p_run.add_argument("--seed", type=int, default=11)
+    p_run.add_argument("--out", help="Path JSON hasil (default bench/results/)")
+    args = parser.parse_args()
+
+    if args.command == "seed":
+        seed(args)
+    else:
+        run(args)
+
+if __name__ == "__main__":
+    main()
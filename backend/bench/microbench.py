@@ -0,0 +1,160 @@
+"""Micro-benchmark fungsi di jalur panas (serialisasi, cursor, signature dedup, metrics, Redis, query DB).
+Tiap kasus diulang sampai >= 50ms per batch, diambil batch tercepat dari --repeat (gaya timeit).
+
+    cd backend && python bench/microbench.py                  # kasus DB dilewati kalau belum seed
+    cd backend && python bench/microbench.py --filter cursor
+    python bench/compare.py bench/results/microbench-<lama>.json bench/results/microbench-<baru>.json
+"""
+import argparse
+import asyncio
+import datetime
+import os
+import sys
+import time
+from types import SimpleNamespace
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), ".."))
+from bench.benchlib import enter_work_dir, save_results  # noqa: E402
+
+enter_work_dir()
+import fakeredis  # noqa: E402
+from sqlalchemy import func, select  # noqa: E402
+
+import database  # noqa: E402
+from dedup import signature  # noqa: E402
+from metrics import MetricsMiddleware, key_family  # noqa: E402
+from models import ReportModel  # noqa: E402
+from pagination import decode_cursor, encode_cursor  # noqa: E402
+from projections import encode, item_id, with_liked  # noqa: E402
+from reads import feed_stmt, keyset_select, page_body  # noqa: E402
+from report_cache import ReportCache  # noqa: E402
+from stats import aggregate_stmt, format_stats  # noqa: E402
+
+def fake_report(report_id: int):
+    return SimpleNamespace(
+        id=report_id, title=f"AC rusak di ruang A{report_id % 400}", facility="Gedung A",
+        description="AC tidak dingin sama sekali dan mengeluarkan suara berisik", status="Pending",
+        priority="Medium", likes=report_id % 17, username=f"bench_u{report_id % 50}",
+        image_url=f"https://storage.googleapis.com/bench/{report_id}.jpg", admin_note=None, proof_image_url=None,
+        created_at=datetime.datetime(2026, 10, 1, tzinfo=datetime.timezone.utc), updated_at=None,
+    )
+
+def middleware_case():
+    """Overhead MetricsMiddleware per request (app ASGI kosong), 100 request per panggilan."""
+    scope = {"type": "http", "method": "GET", "path": "/reports", "headers": []}
+
+    async def app(scope, receive, send):
+        await send({"type": "http.response.start", "status": 200, "headers": []})
+        await send({"type": "http.response.body", "body": b"{}"})
+
+    async def noop(message):
+        pass
+
+    middleware = MetricsMiddleware(app)
+    loop = asyncio.new_event_loop()
+
+    async def hundred():
+        for _ in range(100):
+            await middleware(dict(scope), None, noop)
+    return lambda: loop.run_until_complete(hundred()), 100
+
+def redis_cases() -> dict:
+    """Jalur hit feed di ReportCache (ZSET + MGET 20 entry), lewat fakeredis in-process."""
+    client = fakeredis.FakeRedis()
+    cache = ReportCache(client, database.SessionLocal)
+    pipe = client.pipeline(transaction=False)
+    for report_id in range(1, 1001):
+        cache._store(pipe, fake_report(report_id))
+    pipe.execute()
+    client.zadd("reports:idx:newest", {str(i): i for i in range(1, 1001)})
+
+    def page():
+        rows = cache.page_ids("newest", 20)
+        cache.get_many([report_id for report_id, _ in rows[:20]], None)
+    return {"redis_feed_page_hit": page}
+
+def db_cases() -> dict:
+    """Query panas ke DB bench (hasil loadtest.py seed). Kosong -> dilewati."""
+    with database.SessionLocal() as db:
+        try:
+            count = db.execute(select(func.count()).select_from(ReportModel)).scalar()
+        except Exception:
+            count = 0
+    if not count:
+        return {}, 0
+    session = database.SessionLocal()
+    cursor = encode_cursor("likes", {"likes": 1, "id": count // 2})
+
+    return {
+        "db_feed_newest": lambda: session.execute(keyset_select(feed_stmt(), "newest", 20)).all(),
+        "db_feed_likes": lambda: session.execute(keyset_select(feed_stmt(), "likes", 20)).all(),
+        "db_feed_likes_deep": lambda: session.execute(keyset_select(feed_stmt(), "likes", 20, cursor)).all(),
+        "db_stats_aggregate": lambda: session.execute(aggregate_stmt()).all(),
+    }, count
+
+def build_cases() -> tuple:
+    reports = [fake_report(i) for i in range(1, 21)]
+    items = [encode(report) for report in reports]
+    cursor = encode_cursor("likes", {"likes": 12, "id": 345})
+    counts = {"status:Pending": 40, "status:Selesai": 7, "priority:High": 3, "facility:Gedung A": 47}
+
+    cases = {
+        "encode_list_item": (lambda: encode(reports[0]), 1),
+        "page_body_20": (lambda: page_body(items, cursor), 1),
+        "liked_flags_20": (lambda: [with_liked(item, item_id(item) % 3 == 0) for item in items], 1),
+        "cursor_roundtrip": (lambda: decode_cursor("likes", encode_cursor("likes", {"likes": 12, "id": 345})), 1),
+        "dedup_signature": (lambda: signature(reports[0].title, reports[0].description), 1),
+        "metrics_key_family": (lambda: key_family(b"report:full:12345"), 1),
+        "format_stats": (lambda: format_stats(counts), 1),
+        "metrics_middleware": middleware_case(),
+    }
+    cases.update({name: (fn, 1) for name, fn in redis_cases().items()})
+    db, reports_in_db = db_cases()
+    cases.update({name: (fn, 1) for name, fn in db.items()})
+    return cases, reports_in_db
+
+def measure(fn, ops_per_call: int, repeat: int) -> float:
+    """Mikrodetik per operasi, batch tercepat."""
+    fn()
+    loops = 1
+    while True: # Cari jumlah loop biar satu batch >= 50ms
+        start = time.perf_counter()
+        for _ in range(loops):
+            fn()
+        if time.perf_counter() - start >= 0.05:
+            break
+        loops *= 2
+    best = float("inf")
+    for _ in range(repeat):
+        start = time.perf_counter()
+        for _ in range(loops):
+            fn()
+        best = min(best, time.perf_counter() - start)
+    return best / (loops * ops_per_call) * 1e6
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--repeat", type=int, default=5)
+    parser.add_argument("--filter", default="", help="Cuma kasus yang namanya mengandung teks ini")
+    parser.add_argument("--out", help="Path JSON hasil (default bench/results/)")
+    args = parser.parse_args()
+
+    cases, reports_in_db = build_cases()
+    results = {}
+    for name, (fn, ops_per_call) in cases.items():
+        if args.filter not in name:
+            continue
+        us = measure(fn, ops_per_call, args.repeat)
+        results[name] = {"us_per_op": round(us, 3), "ops_per_s": round(1e6 / us)}
+        print(f"⏱️  {name:22} {us:>10.2f} µs/op {1e6 / us:>12,.0f} op/s")
+    if not reports_in_db:
+        print("ℹ️  Kasus DB dilewati, jalankan `python bench/loadtest.py seed` dulu")
+
+    path = save_results("microbench", {
+        "config": {"db": database.engine.dialect.name, "reports": reports_in_db, "repeat": args.repeat},
+        "results": results,
+    }, args.out)
+    print(f"💾 Hasil: {os.path.relpath(path)}")
+
+if __name__ == "__main__":
+    main()
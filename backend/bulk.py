@@ -0,0 +1,42 @@
+from sqlalchemy import select, update, delete
+from sqlalchemy.orm import Session
+
+from models import ReportModel, ReportLike
+from projections import LIST_COLUMNS
+
+SNAPSHOT_COLUMNS = (ReportModel.id, ReportModel.status, ReportModel.priority, ReportModel.facility)
+
+def _lock_snapshots(db: Session, ids: list) -> dict:
+    """id -> (status, priority, facility) sebelum diubah. Baris di-lock (FOR UPDATE di Postgres)."""
+    rows = db.execute(select(*SNAPSHOT_COLUMNS).where(ReportModel.id.in_(ids)).with_for_update())
+    return {row.id: (row.status, row.priority, row.facility) for row in rows}
+
+def bulk_update(db: Session, ids: list, values: dict):
+    """Satu UPDATE ... WHERE id IN (...) untuk semua laporan. Balikin (snapshot lama, baris baru).
+
+    Baris baru berisi LIST_COLUMNS (via RETURNING), langsung dipakai isi cache.
+    """
+    old = _lock_snapshots(db, ids)
+    if not old:
+        return {}, []
+    stmt = (
+        update(ReportModel)
+        .where(ReportModel.id.in_(list(old)))
+        .values(**values)
+        .returning(*LIST_COLUMNS)
+        .execution_options(synchronize_session=False)
+    )
+    rows = db.execute(stmt).all()
+    db.commit()
+    return old, rows
+
+def bulk_delete(db: Session, ids: list) -> dict:
+    """Hapus like + laporannya dalam satu transaksi. Balikin snapshot laporan yang terhapus."""
+    old = _lock_snapshots(db, ids)
+    if not old:
+        return {}
+    found = list(old)
+    db.execute(delete(ReportLike).where(ReportLike.report_id.in_(found)))
+    db.execute(delete(ReportModel).where(ReportModel.id.in_(found)).execution_options(synchronize_session=False))
+    db.commit()
+    return old
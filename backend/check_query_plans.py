@@ -0,0 +1,85 @@
+"""Cek query plan untuk pola query panas. Gagal (exit 1) kalau ada yang sequential scan.
+
+Jalankan setelah `alembic upgrade head`, pakai DB yang sama dengan aplikasi:
+    python check_query_plans.py
+"""
+import re
+import sys
+from sqlalchemy import text
+
+from database import engine
+from stats import aggregate_stmt
+
+# (nama, SQL atau statement SQLAlchemy) persis seperti pola yang dipakai main.py
+HOT_QUERIES = [
+    ("feed terpopuler",
+     "SELECT id FROM reports ORDER BY likes DESC, id DESC LIMIT 20"),
+    ("feed terpopuler (halaman berikutnya)",
+     "SELECT id FROM reports WHERE likes < 5 OR (likes = 5 AND id < 100) "
+     "ORDER BY likes DESC, id DESC LIMIT 20"),
+    ("my-reports",
+     "SELECT id FROM reports WHERE username = 'x' ORDER BY id DESC LIMIT 20"),
+    ("stats (GROUP BY status, priority, facility, hot + arsip)", aggregate_stmt()),
+    ("like per laporan",
+     "SELECT 1 FROM report_likes WHERE report_id = 1"),
+    ("kandidat arsip (archive.py)",
+     "SELECT id FROM reports WHERE status = 'Selesai' AND id > 0 ORDER BY id LIMIT 500"),
+    ("arsip per user",
+     "SELECT id FROM reports_archive WHERE username = 'x' ORDER BY id DESC LIMIT 20"),
+    ("like arsip per laporan",
+     "SELECT 1 FROM report_likes_archive WHERE report_id = 1"),
+]
+
+# Query yang cuma ada di satu dialect (pencarian, lihat search.py)
+DIALECT_QUERIES = {
+    "postgresql": [
+        ("search (tsvector + trigram)",
+         "SELECT id FROM reports WHERE search_vector @@ websearch_to_tsquery('simple', 'ac rusak') "
+         "OR 'ac rusak' <% search_text"),
+    ],
+    "sqlite": [
+        ("search (FTS5)", "SELECT rowid FROM reports_fts WHERE reports_fts MATCH '\"rusak\"*'"),
+        ("search (FTS5 trigram)", "SELECT rowid FROM reports_fts_tri WHERE reports_fts_tri MATCH '\"rus\"'"),
+    ],
+}
+
+# SQLite: "SCAN reports" tanpa index = full table scan. "SCAN anon_1" (subquery / CTE yang sudah
+# dihitung di CO-ROUTINE atau MATERIALIZE) bukan baca tabel, jadi tidak dihitung.
+SQLITE_SEQ_SCAN = re.compile(r"^SCAN (\w+)$")
+SQLITE_SUBQUERY = re.compile(r"^(?:CO-ROUTINE|MATERIALIZE) (\w+)$")
+
+def explain_sqlite(conn, sql: str) -> list:
+    rows = conn.execute(text(f"EXPLAIN QUERY PLAN {sql}")).fetchall()
+    plan = [row[-1] for row in rows]
+    subqueries = {m[1] for m in map(SQLITE_SUBQUERY.match, plan) if m}
+    bad = [line for line in plan if (m := SQLITE_SEQ_SCAN.match(line.strip())) and m[1] not in subqueries]
+    return plan, bad
+
+def explain_postgres(conn, sql: str) -> list:
+    # Tabel kecil di dev selalu di-seq-scan; matikan biar yang dicek "apakah index bisa dipakai"
+    conn.execute(text("SET enable_seqscan = off"))
+    plan = [row[0] for row in conn.execute(text(f"EXPLAIN {sql}")).fetchall()]
+    bad = [line for line in plan if "Seq Scan" in line]
+    return plan, bad
+
+def main() -> int:
+    explain = explain_postgres if engine.dialect.name == "postgresql" else explain_sqlite
+    failed = 0
+
+    with engine.connect() as conn:
+        for name, sql in HOT_QUERIES + DIALECT_QUERIES.get(engine.dialect.name, []):
+            if not isinstance(sql, str):
+                sql = str(sql.compile(engine, compile_kwargs={"literal_binds": True}))
+            plan, bad = explain(conn, sql)
+            if bad:
+                failed += 1
+                print(f"❌ {name}: sequential scan")
+                for line in plan:
+                    print(f"     {line}")
+            else:
+                print(f"✅ {name}")
+
+    return 1 if failed else 0
+
+if __name__ == "__main__":
+    sys.exit(main())
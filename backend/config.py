@@ -1,3 +1,5 @@
+import os
+
 CUSTOM_DOMAIN_URL = "https://www.facilitywatch-174.my.id"
 CUSTOM_DOMAIN_ROOT = "https://facilitywatch-174.my.id"
 
@@ -8,4 +10,6 @@ ALLOWED_ORIGINS = [
     "http://localhost:8000",      # Swagger UI Local
     CUSTOM_DOMAIN_URL,
     CUSTOM_DOMAIN_ROOT            # Production Cloud Run
-]
\ No newline at end of file
+]
+# ASYNC_MODE=1: jalur baca panas pakai AsyncSession + redis.asyncio (lihat reads.py)
+ASYNC_MODE = os.getenv("ASYNC_MODE", "0") == "1"
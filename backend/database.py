@@ -3,6 +3,9 @@ from sqlalchemy.ext.declarative import declarative_base
 from sqlalchemy.orm import sessionmaker
 import os
 
+from config import ASYNC_MODE
+from db_pool import pool_kwargs, enable_sqlite_pragmas, CONNECT_TIMEOUT
+
 # LOGIKA HYBRID
 if os.getenv("DB_USER"):
     print("🌍 Running on Cloud Run - Using PostgreSQL")
@@ -11,11 +14,19 @@ if os.getenv("DB_USER"):
     db_name = os.environ["DB_NAME"]
     db_host = os.environ["DB_HOST"]
     SQLALCHEMY_DATABASE_URL = f"postgresql://{db_user}:{db_pass}@{db_host}/{db_name}"
-    engine = create_engine(SQLALCHEMY_DATABASE_URL)
+    ASYNC_DATABASE_URL = f"postgresql+asyncpg://{db_user}:{db_pass}@{db_host}/{db_name}"
+    # Pool + pre-ping + recycle diatur lewat env (lihat db_pool.py)
+    engine = create_engine(
+        SQLALCHEMY_DATABASE_URL,
+        connect_args={"connect_timeout": CONNECT_TIMEOUT},
+        **pool_kwargs(),
+    )
 else:
     print("💻 Running Locally - Using SQLite")
     SQLALCHEMY_DATABASE_URL = "sqlite:///./local_test.db"
-    engine = create_engine(SQLALCHEMY_DATABASE_URL, connect_args={"check_same_thread": False})
+    ASYNC_DATABASE_URL = "sqlite+aiosqlite:///./local_test.db"
+    engine = create_engine(SQLALCHEMY_DATABASE_URL, connect_args={"check_same_thread": False}, **pool_kwargs())
+    enable_sqlite_pragmas(engine)
 
 SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
 Base = declarative_base()
@@ -26,4 +37,18 @@ def get_db():
     try:
         yield db
     finally:
-        db.close()
\ No newline at end of file
+        db.close()
+
+# Engine async cuma dibuat di ASYNC_MODE (butuh driver asyncpg / aiosqlite).
+# Write tetap lewat engine sync di atas, yang async cuma jalur baca (reads.py).
+async_engine = None
+AsyncSessionLocal = None
+
+if ASYNC_MODE:
+    from sqlalchemy.ext.asyncio import create_async_engine, async_sessionmaker
+
+    async_engine = create_async_engine(ASYNC_DATABASE_URL, **pool_kwargs(is_async=True))
+    if ASYNC_DATABASE_URL.startswith("sqlite"):
+        enable_sqlite_pragmas(async_engine)
+    AsyncSessionLocal = async_sessionmaker(async_engine, expire_on_commit=False)
+    print("⚡ ASYNC_MODE aktif (AsyncSession + redis.asyncio)")
\ No newline at end of file
@@ -0,0 +1,82 @@
+import os
+import time
+from sqlalchemy import event
+from sqlalchemy.exc import TimeoutError as PoolTimeout
+from sqlalchemy.pool import QueuePool, AsyncAdaptedQueuePool, NullPool
+
+from metrics import POOL_WAIT, POOL_TIMEOUTS
+
+# --- KONFIGURASI POOL (env) ---
+# Budget koneksi Cloud SQL = instance maks x (DB_POOL_SIZE + DB_MAX_OVERFLOW) x worker per instance.
+# DB_NULLPOOL=1 kalau di depan ada PgBouncer: pooling diserahkan ke sana, app buka-tutup per request.
+POOL_SIZE = int(os.getenv("DB_POOL_SIZE", 5))
+MAX_OVERFLOW = int(os.getenv("DB_MAX_OVERFLOW", 5))
+POOL_TIMEOUT = float(os.getenv("DB_POOL_TIMEOUT", 10))     # Detik nunggu koneksi kosong sebelum error
+POOL_RECYCLE = int(os.getenv("DB_POOL_RECYCLE", 1800))     # Detik, buang koneksi tua sebelum diputus server
+POOL_PRE_PING = os.getenv("DB_POOL_PRE_PING", "1") == "1"  # Cek socket basi (habis idle / scale-in) sebelum dipakai
+NULLPOOL = os.getenv("DB_NULLPOOL", "0") == "1"
+CONNECT_TIMEOUT = int(os.getenv("DB_CONNECT_TIMEOUT", 5))
+
+def _timed_get(get, engine_label: str):
+    """Checkout koneksi sambil catat waktu tunggunya (termasuk buka koneksi baru) ke Prometheus."""
+    start = time.perf_counter()
+    try:
+        conn = get()
+    except PoolTimeout:
+        POOL_TIMEOUTS.labels(engine_label).inc()
+        raise
+    POOL_WAIT.labels(engine_label).observe(time.perf_counter() - start)
+    return conn
+
+class MeteredQueuePool(QueuePool):
+    def _do_get(self):
+        return _timed_get(super()._do_get, "sync")
+
+class MeteredAsyncQueuePool(AsyncAdaptedQueuePool):
+    def _do_get(self):
+        return _timed_get(super()._do_get, "async")
+
+def pool_kwargs(is_async: bool = False) -> dict:
+    """Argumen create_engine / create_async_engine sesuai env di atas."""
+    if NULLPOOL:
+        return {"poolclass": NullPool}
+    return {
+        "poolclass": MeteredAsyncQueuePool if is_async else MeteredQueuePool,
+        "pool_size": POOL_SIZE,
+        "max_overflow": MAX_OVERFLOW,
+        "pool_timeout": POOL_TIMEOUT,
+        "pool_recycle": POOL_RECYCLE,
+        "pool_pre_ping": POOL_PRE_PING,
+    }
+
+def enable_sqlite_pragmas(engine):
+    """WAL biar reader tidak ke-block writer, plus pragma aman untuk run lokal."""
+    @event.listens_for(engine.sync_engine if hasattr(engine, "sync_engine") else engine, "connect")
+    def _set_pragmas(dbapi_conn, _record):
+        cursor = dbapi_conn.cursor()
+        cursor.execute("PRAGMA journal_mode=WAL")
+        cursor.execute("PRAGMA synchronous=NORMAL")  # Aman di WAL, fsync jauh lebih jarang
+        cursor.execute("PRAGMA busy_timeout=5000")   # Tunggu lock writer, jangan langsung "database is locked"
+        cursor.execute("PRAGMA cache_size=-16000")   # ~16MB page cache per koneksi
+        cursor.execute("PRAGMA temp_store=MEMORY")
+        cursor.close()
+
+def pool_status(engine) -> dict:
+    """Isi pool saat ini + saturasi (checked out / kapasitas maksimum).
+    Waktu tunggu checkout ada di /metrics (db_pool_checkout_wait_seconds)."""
+    if engine is None:
+        return None
+    pool = engine.pool
+    if isinstance(pool, NullPool):
+        return {"pool": "NullPool"}
+    capacity = pool.size() + max(pool._max_overflow, 0)
+    checked_out = pool.checkedout()
+    return {
+        "pool": type(pool).__name__,
+        "size": pool.size(),
+        "max_overflow": pool._max_overflow,
+        "checked_out": checked_out,
+        "checked_in": pool.checkedin(),
+        "overflow": pool.overflow(),
+        "saturation": round(checked_out / capacity, 3) if capacity else None,
+    }
@@ -0,0 +1,312 @@
+import os
+import re
+import hashlib
+import operator
+import threading
+from array import array
+from sqlalchemy import select
+from redis.exceptions import LockError
+
+from models import ReportModel
+
+# --- KEY LAYOUT ---
+# dedup:sigs:v1  -> HASH report_id -> fasilitas + signature MinHash (NUM_PERM x uint32) + penanda "seeded"
+# dedup:version  -> counter, naik tiap index berubah. Instance lain reload kalau beda.
+# Ganti "v1" kalau cara hitung signature berubah (signature lama jadi tidak sebanding).
+SIGS_KEY = "dedup:sigs:v1"
+VERSION_KEY = "dedup:version"
+SEEDED_FIELD = "seeded"
+REBUILD_LOCK = "lock:dedup:rebuild"
+
+# Cuma laporan yang masih terbuka yang jadi kandidat duplikat
+OPEN_STATUSES = ("Pending", "Proses")
+
+# 16 band x 4 baris: pasangan dengan Jaccard ~0.5 ke atas hampir pasti ketemu di salah satu band
+NUM_PERM = 64
+BANDS = 16
+ROWS = NUM_PERM // BANDS
+SHINGLE = 4                               # n-gram karakter, tahan typo & urutan kata
+SIG_BYTES = NUM_PERM * 4
+THRESHOLD = float(os.getenv("DEDUP_THRESHOLD", 0.5))
+MAX_RESULTS = int(os.getenv("DEDUP_MAX_RESULTS", 5))
+
+MASK = 0xFFFFFFFF
+EMPTY = 1 << 32
+GOLDEN = 0x9E3779B1
+WORD = re.compile(r"\w+", re.UNICODE)
+
+# Fasilitas dipilih dari dropdown, jadi dipakai sebagai partisi (harus sama persis),
+# bukan ikut di-shingle: AC rusak di Gedung A bukan duplikat AC rusak di Kantin.
+def facility_key(facility: str) -> str:
+    return (facility or "").strip().lower()
+
+def shingles(title: str, description: str) -> set:
+    text = " ".join(w.lower() for w in WORD.findall(f"{title} {description}"))
+    return {text[i:i + SHINGLE] for i in range(len(text) - SHINGLE + 1)} or {text}
+
+def signature(title: str, description: str) -> array:
+    """MinHash satu-permutasi: tiap shingle di-hash sekali, masuk ke salah satu dari NUM_PERM bin.
+
+    Jauh lebih murah dari NUM_PERM hash per shingle. Bin kosong (teks pendek) diisi dari
+    bin terdekat di kanannya + offset jarak (densifikasi rotasi), biar tetap sebanding.
+    """
+    bins = [EMPTY] * NUM_PERM
+    for shingle in shingles(title, description):
+        h = int.from_bytes(hashlib.blake2b(shingle.encode(), digest_size=8).digest(), "little")
+        i, value = h % NUM_PERM, (h >> 6) & MASK
+        if value < bins[i]:
+            bins[i] = value
+
+    sig = array("I", bytes(4 * NUM_PERM))
+    for i in range(NUM_PERM):
+        j, distance = i, 0
+        while bins[j] == EMPTY:
+            j, distance = (j + 1) % NUM_PERM, distance + 1
+        sig[i] = (bins[j] + distance * GOLDEN) & MASK
+    return sig
+
+def similarity(a: array, b: array) -> float:
+    """Perkiraan Jaccard dari dua signature."""
+    return sum(map(operator.eq, a, b)) / NUM_PERM
+
+def _band_keys(facility: str, sig: array) -> list:
+    raw = sig.tobytes()
+    width = ROWS * sig.itemsize
+    return [(facility, raw[b * width:(b + 1) * width]) for b in range(BANDS)]
+
+def pack(facility: str, sig: array) -> bytes:
+    """Nilai di hash Redis: fasilitas (utf-8) lalu SIG_BYTES byte signature."""
+    return facility.encode() + sig.tobytes()
+
+def unpack(value: bytes) -> tuple:
+    return value[:-SIG_BYTES].decode(), array("I", value[-SIG_BYTES:])
+
+class LSHIndex:
+    """Index LSH di memori: BANDS dict (fasilitas, potongan-signature) -> set id laporan."""
+
+    def __init__(self):
+        self.sigs = {}
+        self.bands = [{} for _ in range(BANDS)]
+
+    def add(self, report_id: int, facility: str, sig: array):
+        self.remove(report_id)
+        self.sigs[report_id] = (facility, sig)
+        for band, key in zip(self.bands, _band_keys(facility, sig)):
+            band.setdefault(key, set()).add(report_id)
+
+    def remove(self, report_id: int):
+        entry = self.sigs.pop(report_id, None)
+        if entry is None:
+            return
+        for band, key in zip(self.bands, _band_keys(*entry)):
+            bucket = band.get(key)
+            if bucket is not None:
+                bucket.discard(report_id)
+                if not bucket:
+                    del band[key]
+
+    def query(self, facility: str, sig: array, threshold: float = THRESHOLD, limit: int = MAX_RESULTS) -> list:
+        """[(id, kemiripan)] urut paling mirip, cuma kandidat yang lolos threshold."""
+        candidates = set()
+        for band, key in zip(self.bands, _band_keys(facility, sig)):
+            candidates.update(band.get(key, ()))
+        scored = [(rid, similarity(sig, self.sigs[rid][1])) for rid in candidates]
+        scored = [(rid, score) for rid, score in scored if score >= threshold]
+        scored.sort(key=lambda item: (-item[1], -item[0]))
+        return scored[:limit]
+
+    def __len__(self):
+        return len(self.sigs)
+
+def open_reports_stmt():
+    columns = (ReportModel.id, ReportModel.title, ReportModel.description, ReportModel.facility)
+    return select(*columns).where(ReportModel.status.in_(OPEN_STATUSES))
+
+def build_index(rows) -> LSHIndex:
+    """rows: (id, title, description, facility)."""
+    index = LSHIndex()
+    for report_id, title, description, facility in rows:
+        index.add(report_id, facility_key(facility), signature(title or "", description or ""))
+    return index
+
+def _parse_sigs(raw: dict):
+    """Isi HGETALL dedup:sigs -> LSHIndex, None kalau hash belum pernah di-seed."""
+    if not raw.get(SEEDED_FIELD.encode()):
+        return None
+    index = LSHIndex()
+    for field, value in raw.items():
+        if field.decode() != SEEDED_FIELD:
+            index.add(int(field), *unpack(value))
+    return index
+
+class DuplicateIndex:
+    """Deteksi laporan mirip saat submit. Lookup murni di memori, signature disimpan di Redis.
+
+    Tiap instance memegang index sendiri; perubahan ditulis ke Redis + versi dinaikkan,
+    thread sync memuat ulang kalau versi di Redis beda (berarti instance lain menulis).
+    Tanpa Redis, index dibangun dari DB dan cuma berlaku di proses ini.
+    """
+
+    def __init__(self, client, session_factory, sync_interval: float = 2.0):
+        self.client = client
+        self.session_factory = session_factory
+        self.sync_interval = sync_interval
+        self._index = None
+        self._version = None
+        self._lock = threading.Lock()
+        self._stop = threading.Event()
+        self._thread = None
+
+    # --- LOOKUP ---
+    def find(self, title: str, description: str, facility: str):
+        """(signature, [(id, kemiripan)]). Signature-nya dipakai ulang di on_create."""
+        index = self._ensure_loaded()
+        sig = signature(title, description)
+        return sig, index.query(facility_key(facility), sig)
+
+    def _ensure_loaded(self) -> LSHIndex:
+        if self._index is None:
+            with self._lock:
+                if self._index is None:
+                    self._load()
+        return self._index
+
+    # --- LOAD / REBUILD ---
+    def _load(self):
+        if self.client is None:
+            self._index = self._from_db()
+            return
+        version = self.client.get(VERSION_KEY)
+        index = _parse_sigs(self.client.hgetall(SIGS_KEY))
+        if index is None:
+            index = self.rebuild()
+            version = self.client.get(VERSION_KEY)
+        self._index, self._version = index, version
+
+    def _from_db(self) -> LSHIndex:
+        db = self.session_factory()
+        try:
+            return build_index(db.execute(open_reports_stmt()))
+        finally:
+            db.close()
+
+    def rebuild(self) -> LSHIndex:
+        """Hitung ulang semua signature dari DB lalu timpa hash di Redis."""
+        index = self._from_db()
+        if self.client is None:
+            return index
+        lock = self.client.lock(REBUILD_LOCK, timeout=60, blocking=False)
+        try:
+            if not lock.acquire():
+                return index # Instance lain sedang menulis hasil yang sama
+            mapping = {str(rid): pack(*entry) for rid, entry in index.sigs.items()}
+            pipe = self.client.pipeline(transaction=True)
+            pipe.delete(SIGS_KEY)
+            pipe.hset(SIGS_KEY, mapping={**mapping, SEEDED_FIELD: 1})
+            pipe.incr(VERSION_KEY)
+            pipe.execute()
+            print(f"🧩 Index duplikat dibangun ulang: {len(index)} laporan terbuka")
+        finally:
+            try:
+                lock.release()
+            except LockError:
+                pass
+        return index
+
+    def reset(self) -> int:
+        """Rebuild dari DB dan langsung dipakai di instance ini (instance lain ikut lewat versi)."""
+        with self._lock:
+            self._index = self.rebuild()
+            self._version = self.client.get(VERSION_KEY) if self.client is not None else None
+        return len(self._index)
+
+    # --- WRITE HOOKS ---
+    def _persist(self, add: dict = None, remove: list = ()):
+        if self.client is None:
+            return
+        pipe = self.client.pipeline(transaction=True)
+        if add:
+            pipe.hset(SIGS_KEY, mapping={str(rid): pack(*entry) for rid, entry in add.items()})
+        if remove:
+            pipe.hdel(SIGS_KEY, *[str(rid) for rid in remove])
+        pipe.incr(VERSION_KEY)
+        version = pipe.execute()[-1]
+        with self._lock:
+            # Kalau tidak ada yang menulis di antaranya, index lokal sudah sama dengan Redis
+            if self._version is not None and int(self._version) + 1 == version:
+                self._version = str(version).encode()
+
+    def on_create(self, report: ReportModel, sig: array = None):
+        if report.status not in OPEN_STATUSES:
+            return
+        facility = facility_key(report.facility)
+        sig = sig or signature(report.title or "", report.description or "")
+        with self._lock:
+            if self._index is not None:
+                self._index.add(report.id, facility, sig)
+        self._persist(add={report.id: (facility, sig)})
+
+    def on_update(self, report: ReportModel):
+        # Yang diubah admin cuma status/prioritas: yang ditutup keluar, yang dibuka lagi masuk ulang
+        if report.status not in OPEN_STATUSES:
+            self.on_delete(report.id)
+        elif not self._indexed(report.id):
+            self.on_create(report)
+
+    def reopen(self, report_ids: list):
+        """Masukkan lagi laporan yang dibuka ulang lewat bulk update (signature dihitung dari DB)."""
+        if not report_ids:
+            return
+        db = self.session_factory()
+        try:
+            rows = db.execute(open_reports_stmt().where(ReportModel.id.in_(report_ids))).all()
+        finally:
+            db.close()
+        add = {rid: (facility_key(facility), signature(title or "", description or ""))
+               for rid, title, description, facility in rows}
+        with self._lock:
+            if self._index is not None:
+                for rid, (facility, sig) in add.items():
+                    self._index.add(rid, facility, sig)
+        self._persist(add=add)
+
+    def _indexed(self, report_id: int) -> bool:
+        with self._lock:
+            return self._index is not None and report_id in self._index.sigs
+
+    def on_delete(self, report_id: int):
+        self.forget([report_id])
+
+    def forget(self, report_ids: list):
+        """Keluarkan banyak laporan sekaligus (bulk delete / bulk tutup), satu tulis ke Redis."""
+        if not report_ids:
+            return
+        with self._lock:
+            if self._index is not None:
+                for report_id in report_ids:
+                    self._index.remove(report_id)
+        self._persist(remove=report_ids)
+
+    # --- SYNC ANTAR INSTANCE ---
+    def start(self):
+        if self.client is not None and self._thread is None:
+            self._thread = threading.Thread(target=self._run, name="dedup-sync", daemon=True)
+            self._thread.start()
+
+    def stop(self):
+        self._stop.set()
+
+    def _run(self):
+        failing = False
+        while not self._stop.wait(self.sync_interval):
+            try:
+                if self._index is not None and self.client.get(VERSION_KEY) == self._version:
+                    failing = False
+                    continue
+                with self._lock:
+                    self._load()
+                failing = False
+            except Exception as e:
+                if not failing: # Cukup sekali per gangguan, jangan tiap interval
+                    print(f"⚠️ Gagal sync index duplikat: {e}")
+                failing = True
@@ -10,6 +10,23 @@ echo "🚀 Starting Deployment Process..."
 echo "🛠️ Running Database Migrations..."
 alembic upgrade head
 
+# Admin default dibuat di sini (sekali per deploy), bukan saat import aplikasi
+echo "👤 Ensuring Default Admin..."
+python manage.py create-admin
+
+# Opsional: pastikan query panas tidak jatuh ke sequential scan
+if [ "$CHECK_QUERY_PLANS" = "1" ]; then
+    echo "🔍 Checking Query Plans..."
+    python check_query_plans.py
+fi
+
+# Multi worker (WEB_CONCURRENCY > 1): metrik Prometheus per worker ditulis ke folder ini,
+# sisa file dari run sebelumnya harus dibuang biar counter tidak dobel
+if [ -n "$PROMETHEUS_MULTIPROC_DIR" ]; then
+    rm -rf "$PROMETHEUS_MULTIPROC_DIR"
+    mkdir -p "$PROMETHEUS_MULTIPROC_DIR"
+fi
+
 # --- STEP 2: START APLIKASI ---
 # Ambil PORT dari Env Var Cloud Run, atau default ke 8080 kalau lokal
 PORT=${PORT:-8080}
@@ -0,0 +1,197 @@
+import os
+import re
+import asyncio
+import threading
+import time
+from collections import deque
+import orjson
+from redis.exceptions import ResponseError
+
+# --- KEY LAYOUT ---
+# reports:events       -> STREAM riwayat event (dipotong ke ~EVENT_HISTORY), sumber ID + replay Last-Event-ID
+# reports:events:live  -> channel pub/sub, fan-out event baru ke semua instance
+EVENTS_KEY = "reports:events"
+EVENTS_CHANNEL = "reports:events:live"
+EVENT_HISTORY = int(os.getenv("SSE_HISTORY", 1000))
+
+# Event yang antre per koneksi. Penuh = klien terlalu lambat: koneksinya diputus,
+# browser reconnect sendiri dengan Last-Event-ID dan sisanya di-replay.
+QUEUE_SIZE = 256
+
+# Jenis event (payload ringkas, bukan halaman penuh):
+#   created -> {"report": <item list>}
+#   updated -> {"reports": [{"id", "status", "priority"}]}
+#   likes   -> {"id", "likes"}
+#   deleted -> {"ids": [...]}
+#   reset   -> riwayat sudah terpotong, client harus load ulang list-nya
+
+# Persis format ID stream Redis. int() sendiri masih menerima "+5", " 5", "5_0" yang ditolak Redis.
+STREAM_ID = re.compile(r"(\d{1,20})(?:-(\d{1,20}))?", re.ASCII)
+MAX_ID_PART = 2 ** 64 - 1
+
+def parse_id(event_id):
+    """ID stream "ms-seq" -> (ms, seq) biar bisa dibandingkan. Tidak valid -> None."""
+    if isinstance(event_id, bytes):
+        event_id = event_id.decode(errors="replace")
+    match = STREAM_ID.fullmatch(event_id or "")
+    if match is None:
+        return None
+    ms, seq = int(match[1]), int(match[2] or 0)
+    return (ms, seq) if ms <= MAX_ID_PART and seq <= MAX_ID_PART else None
+
+def format_frame(event_id: str, event_type: str, data: bytes) -> bytes:
+    return b"id: %s\nevent: %s\ndata: %s\n\n" % (event_id.encode(), event_type.encode(), data)
+
+class Subscriber:
+    """Satu koneksi SSE: antrian di event loop-nya sendiri + penanda kalau ada event yang terbuang."""
+
+    def __init__(self, loop):
+        self.loop = loop
+        self.queue = asyncio.Queue(QUEUE_SIZE)
+        self.dropped = False
+
+    def offer(self, item):
+        try:
+            self.queue.put_nowait(item)
+        except asyncio.QueueFull:
+            self.dropped = True
+
+class EventHub:
+    """Publish event laporan ke Redis, dengarkan dari semua instance, bagikan ke koneksi SSE lokal.
+
+    Tanpa Redis (atau selama breaker terbuka) event cuma sampai ke koneksi di instance ini,
+    dengan ID lokal format yang sama dan riwayat di memori.
+    """
+
+    def __init__(self, client, breaker):
+        self.client = client
+        self.breaker = breaker
+        self._subscribers = set()
+        self._lock = threading.Lock()
+        self._history = deque(maxlen=EVENT_HISTORY) # (id, frame), replay tanpa Redis
+        self._last_local = (0, 0)
+        self._last_seen = None                      # ID terakhir dari Redis, buat susul habis putus
+        self._stop = threading.Event()
+        self._thread = None
+
+    def _redis_ok(self) -> bool:
+        return self.client is not None and self.breaker.allow()
+
+    # --- PUBLISH (endpoint sync, di threadpool) ---
+    def publish(self, event_type: str, payload):
+        data = payload if isinstance(payload, bytes) else orjson.dumps(payload)
+        if self._redis_ok():
+            try:
+                event_id = self.client.xadd(
+                    EVENTS_KEY, {"type": event_type, "data": data},
+                    maxlen=EVENT_HISTORY, approximate=True,
+                )
+                # Semua instance (termasuk ini) terima lewat listener
+                self.client.publish(EVENTS_CHANNEL, b" ".join([event_id, event_type.encode(), data]))
+                return
+            except Exception as e:
+                self.breaker.record_failure(e)
+        self._dispatch(self._local_id(), event_type, data)
+
+    def _local_id(self) -> str:
+        with self._lock:
+            ms, seq = int(time.time() * 1000), 0
+            if ms <= self._last_local[0]:
+                ms, seq = self._last_local[0], self._last_local[1] + 1
+            self._last_local = (ms, seq)
+        return f"{ms}-{seq}"
+
+    def _dispatch(self, event_id: str, event_type: str, data: bytes):
+        frame = format_frame(event_id, event_type, data)
+        with self._lock:
+            self._history.append((event_id, frame))
+            subscribers = list(self._subscribers)
+        for subscriber in subscribers:
+            try:
+                subscriber.loop.call_soon_threadsafe(subscriber.offer, (event_id, frame))
+            except RuntimeError:
+                self.unsubscribe(subscriber) # Event loop-nya sudah tutup
+
+    # --- SUBSCRIBE (endpoint async) ---
+    def subscribe(self) -> Subscriber:
+        subscriber = Subscriber(asyncio.get_running_loop())
+        with self._lock:
+            self._subscribers.add(subscriber)
+        return subscriber
+
+    def unsubscribe(self, subscriber: Subscriber):
+        with self._lock:
+            self._subscribers.discard(subscriber)
+
+    def replay(self, last: tuple):
+        """Event setelah ID `last` (hasil parse_id): ([(id, frame)], reset). Sync, panggil lewat threadpool.
+
+        reset=True kalau event tertua yang masih disimpan lebih baru dari `last`
+        (riwayat sudah terpotong, ada yang hilang).
+        """
+        if self._redis_ok():
+            try:
+                oldest = self.client.xrange(EVENTS_KEY, count=1)
+                entries = self.client.xrange(EVENTS_KEY, min=f"({last[0]}-{last[1]}", count=EVENT_HISTORY)
+                frames = [
+                    (event_id.decode(), format_frame(event_id.decode(), fields[b"type"].decode(), fields[b"data"]))
+                    for event_id, fields in entries
+                ]
+                return frames, bool(oldest) and parse_id(oldest[0][0]) > last
+            except ResponseError as e:
+                # Perintahnya yang ditolak, Redis-nya sehat: jangan buka breaker. Riwayat lokal
+                # bukan pengganti stream, jadi client disuruh load ulang saja.
+                print(f"⚠️ Replay SSE ditolak Redis: {e}")
+                return [], True
+            except Exception as e:
+                self.breaker.record_failure(e)
+        with self._lock:
+            history = list(self._history)
+        frames = [(event_id, frame) for event_id, frame in history if parse_id(event_id) > last]
+        return frames, bool(history) and parse_id(history[0][0]) > last
+
+    # --- LISTENER PUB/SUB ---
+    def start(self):
+        if self.client is not None and self._thread is None:
+            self._thread = threading.Thread(target=self._listen, name="sse-events", daemon=True)
+            self._thread.start()
+
+    def stop(self):
+        self._stop.set()
+
+    def _on_message(self, raw: bytes):
+        event_id, event_type, data = raw.split(b" ", 2)
+        self._last_seen = event_id
+        self._dispatch(event_id.decode(), event_type.decode(), data)
+
+    def _catch_up(self):
+        """Habis reconnect: event yang terlewat selama putus diambil dari stream."""
+        if self._last_seen is None:
+            return
+        for event_id, fields in self.client.xrange(EVENTS_KEY, min=b"(" + self._last_seen):
+            self._last_seen = event_id
+            self._dispatch(event_id.decode(), fields[b"type"].decode(), fields[b"data"])
+
+    def _listen(self):
+        backoff = 1.0
+        while not self._stop.is_set():
+            pubsub = None
+            try:
+                pubsub = self.client.pubsub(ignore_subscribe_messages=True)
+                pubsub.subscribe(EVENTS_CHANNEL)
+                self._catch_up()
+                backoff = 1.0
+                while not self._stop.is_set():
+                    message = pubsub.get_message(timeout=1.0)
+                    if message and message["type"] == "message":
+                        self._on_message(message["data"])
+            except Exception as e:
+                print(f"⚠️ Listener SSE putus ({e}), coba lagi {backoff:.0f}s")
+                self._stop.wait(backoff)
+                backoff = min(backoff * 2, 30.0)
+            finally:
+                if pubsub is not None:
+                    try:
+                        pubsub.close()
+                    except Exception:
+                        pass
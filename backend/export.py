@@ -0,0 +1,85 @@
+import csv
+import datetime
+import io
+import zlib
+import orjson
+from sqlalchemy import select, union_all
+
+from models import ReportModel, ReportArchive
+
+# --- EXPORT LAPORAN (CSV / NDJSON) ---
+# Baris dibaca per batch dari cursor server-side (stream_results + yield_per), di-encode, lalu langsung
+# dikirim. Memori konstan berapa pun jumlah laporannya, dan cache Redis / L1 tidak disentuh sama sekali.
+EXPORT_COLUMNS = (
+    ReportModel.id, ReportModel.created_at, ReportModel.updated_at, ReportModel.facility, ReportModel.title,
+    ReportModel.description, ReportModel.status, ReportModel.priority, ReportModel.likes, ReportModel.username,
+    ReportModel.admin_note, ReportModel.image_url, ReportModel.proof_image_url,
+)
+EXPORT_FIELDS = [column.key for column in EXPORT_COLUMNS]
+ARCHIVE_EXPORT_COLUMNS = tuple(getattr(ReportArchive, name) for name in EXPORT_FIELDS)
+BATCH_ROWS = 1000 # Baris per fetch dari cursor = satu chunk response
+
+MEDIA_TYPES = {"csv": "text/csv; charset=utf-8", "ndjson": "application/x-ndjson"}
+
+# Sel yang diawali karakter ini dibaca sebagai rumus oleh Excel / Sheets (CSV injection)
+FORMULA_PREFIXES = ("=", "+", "-", "@", "\t", "\r")
+
+def _filtered(model, columns, status, facility, date_from, date_to):
+    stmt = select(*columns)
+    if status:
+        stmt = stmt.where(model.status == status)
+    if facility:
+        stmt = stmt.where(model.facility == facility)
+    if date_from:
+        stmt = stmt.where(model.created_at >= datetime.datetime.combine(date_from, datetime.time.min))
+    if date_to:
+        stmt = stmt.where(model.created_at < datetime.datetime.combine(date_to + datetime.timedelta(days=1), datetime.time.min))
+    return stmt
+
+def export_stmt(status: str = None, facility: str = None, date_from: datetime.date = None, date_to: datetime.date = None,
+                include_archived: bool = False):
+    """Filter opsional, date_to inklusif (sampai akhir hari itu). Urut id biar hasil stabil.
+    include_archived=True: laporan di tabel arsip ikut (lihat archive.py)."""
+    filters = (status, facility, date_from, date_to)
+    stmt = _filtered(ReportModel, EXPORT_COLUMNS, *filters)
+    if include_archived:
+        rows = union_all(stmt, _filtered(ReportArchive, ARCHIVE_EXPORT_COLUMNS, *filters)).subquery()
+        stmt = select(rows).order_by(rows.c.id)
+    else:
+        stmt = stmt.order_by(ReportModel.id)
+    return stmt.execution_options(stream_results=True, yield_per=BATCH_ROWS)
+
+def _csv_value(value):
+    if value is None:
+        return ""
+    if isinstance(value, datetime.datetime):
+        return value.isoformat()
+    if isinstance(value, str) and value.startswith(FORMULA_PREFIXES):
+        return "'" + value
+    return value
+
+def csv_chunk(rows: list) -> bytes:
+    buffer = io.StringIO()
+    csv.writer(buffer).writerows([_csv_value(value) for value in row] for row in rows)
+    return buffer.getvalue().encode()
+
+def ndjson_chunk(rows: list) -> bytes:
+    return b"".join(orjson.dumps(dict(row._mapping)) + b"\n" for row in rows)
+
+def export_chunks(session_factory, fmt: str, stmt):
+    """Generator bytes: header (CSV) lalu satu chunk per batch. Session ditutup saat generator selesai / di-close."""
+    encode = csv_chunk if fmt == "csv" else ndjson_chunk
+    if fmt == "csv":
+        yield "\ufeff".encode() + csv_chunk([EXPORT_FIELDS]) # BOM biar Excel baca UTF-8 dengan benar
+    with session_factory() as db:
+        for rows in db.execute(stmt).partitions():
+            yield encode(rows)
+
+def gzip_chunks(chunks):
+    """Kompres stream chunk demi chunk (format gzip), tanpa menampung seluruh file."""
+    compressor = zlib.compressobj(6, zlib.DEFLATED, 31) # wbits 31 = header gzip
+    for chunk in chunks:
+        data = compressor.compress(chunk)
+        if data:
+            yield data
+    yield compressor.flush()
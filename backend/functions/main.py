@@ -1,21 +1,114 @@
 import functions_framework
+import io
+import math
 import os
-import tempfile
+import re
 from google.cloud import storage
 from PIL import Image
 
-# Init Client
-storage_client = storage.Client()
+# --- KONFIGURASI VARIAN ---
+# Nama hasil: <nama asli tanpa ekstensi>_w<lebar>.<ext>, contoh abc_w300.webp
+# Aturan nama ini HARUS sama dengan backend/images.py (API yang ngasih URL-nya ke client).
+VARIANT_WIDTHS = sorted({int(w) for w in os.getenv("VARIANT_WIDTHS", "300,800,1600").split(",")}, reverse=True)
+VARIANT_FORMATS = [f.strip().lower() for f in os.getenv("VARIANT_FORMATS", "webp,jpeg").split(",")]
+VARIANT_QUALITY = int(os.getenv("VARIANT_QUALITY", 80))
+WEBP_METHOD = int(os.getenv("VARIANT_WEBP_METHOD", 2)) # 0 = cepat ... 6 = paling kecil
+CACHE_CONTROL = os.getenv("VARIANT_CACHE_CONTROL", "public, max-age=31536000, immutable")
+
+# format -> (ekstensi, content-type, opsi save Pillow)
+FORMATS = {
+    "webp": ("webp", "image/webp", {"quality": VARIANT_QUALITY, "method": WEBP_METHOD}),
+    "jpeg": ("jpg", "image/jpeg", {"quality": VARIANT_QUALITY, "optimize": True, "progressive": True}),
+}
+
+# EXIF Orientation -> transpose (sama dengan ImageOps.exif_transpose), 5-8 = lebar/tinggi tertukar
+ORIENTATION_TAG = 0x0112
+TRANSPOSE = {
+    2: Image.Transpose.FLIP_LEFT_RIGHT,
+    3: Image.Transpose.ROTATE_180,
+    4: Image.Transpose.FLIP_TOP_BOTTOM,
+    5: Image.Transpose.TRANSPOSE,
+    6: Image.Transpose.ROTATE_270,
+    7: Image.Transpose.TRANSVERSE,
+    8: Image.Transpose.ROTATE_90,
+}
+
+# Hasil kita sendiri (dan thumbnail versi lama) jangan diproses ulang -> cegah infinite loop
+DERIVED_NAME = re.compile(r"(_thumb|_w\d+)\.[^.]+$")
+
+# Client dibuat saat event pertama, bukan saat import (cold start lebih cepat)
+_storage_client = None
+
+def get_client():
+    global _storage_client
+    if _storage_client is None:
+        _storage_client = storage.Client()
+    return _storage_client
+
+def variant_name(file_name: str, width: int, fmt: str) -> str:
+    return f"{os.path.splitext(file_name)[0]}_w{width}.{FORMATS[fmt][0]}"
+
+def build_variants(data: bytes, widths=None, formats=None) -> dict:
+    """Decode sekali di memori, balikin {(lebar, format): bytes}.
+
+    JPEG di-decode langsung di skala kecil lewat draft(), jadi foto 12MP tidak
+    pernah di-decode penuh kalau varian terbesar cukup kecil. Resize dikerjakan di
+    orientasi asli, rotasi EXIF baru diterapkan ke hasil kecilnya (jauh lebih murah).
+    """
+    widths = sorted(widths or VARIANT_WIDTHS, reverse=True)
+    formats = formats or VARIANT_FORMATS
+
+    with Image.open(io.BytesIO(data)) as image:
+        orientation = image.getexif().get(ORIENTATION_TAG, 1)
+        transpose = TRANSPOSE.get(orientation)
+        swapped = orientation in (5, 6, 7, 8)
+
+        def final_width(img):
+            return img.height if swapped else img.width
+
+        if image.format == "JPEG":
+            # draft() memilih skala DCT (1/2, 1/4, 1/8) yang masih >= ukuran diminta
+            ratio = min(1.0, widths[0] / final_width(image))
+            image.draft("RGB", (math.ceil(image.width * ratio), math.ceil(image.height * ratio)))
+        if image.mode not in ("RGB", "RGBA"):
+            image = image.convert("RGBA" if image.mode in ("LA", "PA") or "transparency" in image.info else "RGB")
+
+        results = {}
+        current = image
+        for width in widths:
+            # Dari varian besar ke kecil: tiap resize mulai dari hasil sebelumnya (lebih murah)
+            if final_width(current) > width:
+                scale = width / final_width(current)
+                size = (max(1, round(current.width * scale)), max(1, round(current.height * scale)))
+                current = current.resize(size, Image.Resampling.BICUBIC, reducing_gap=2.0)
+            frame = current.transpose(transpose) if transpose is not None else current
+            for fmt in formats:
+                encoded = frame.convert("RGB") if fmt == "jpeg" and frame.mode != "RGB" else frame
+                out = io.BytesIO()
+                encoded.save(out, format=fmt.upper(), **FORMATS[fmt][2])
+                results[(width, fmt)] = out.getvalue()
+        return results
+
+def process_object(bucket, file_name: str) -> list:
+    """Download sekali, bikin semua varian, upload dengan content-type + cache header."""
+    data = bucket.blob(file_name).download_as_bytes()
+    uploaded = []
+    for (width, fmt), payload in build_variants(data).items():
+        new_blob = bucket.blob(variant_name(file_name, width, fmt))
+        new_blob.cache_control = CACHE_CONTROL
+        new_blob.upload_from_string(payload, content_type=FORMATS[fmt][1])
+        uploaded.append(new_blob.name)
+    return uploaded
 
 # INI PENYELAMATMU. Decorator ini memberitahu Google:
 # "Hei, aku siap menerima data format baru (Gen 2)"
 @functions_framework.cloud_event
 def resize_image(cloud_event):
     """Fungsi hybrid yang tahan banting."""
-    
+
     # Ambil data dari event tunggal itu
     data = cloud_event.data
-    
+
     # Debug print biar kelihatan di log
     print(f"📦 Menerima Event Data: {data}")
 
@@ -29,48 +122,22 @@ def resize_image(cloud_event):
         return
 
     # 1. CEGAH INFINITE LOOP
-    if "_thumb" in file_name:
-        print(f"Skipping thumbnail: {file_name}")
+    if DERIVED_NAME.search(file_name):
+        print(f"Skipping variant: {file_name}")
         return
 
-    bucket = storage_client.bucket(bucket_name)
-    blob = bucket.blob(file_name)
-
     # Cek apakah ini gambar (by extension juga, buat jaga-jaga)
+    content_type = data.get('contentType')
     is_image = file_name.lower().endswith(('.png', '.jpg', '.jpeg', '.webp'))
-    if not is_image and (blob.content_type and 'image' not in blob.content_type):
+    if not is_image and (content_type and 'image' not in content_type):
         print(f"File {file_name} bukan gambar. Skip.")
         return
 
     print(f"🔨 Memproses: {file_name}...")
 
-    # 2. Download
-    _, temp_local_filename = tempfile.mkstemp()
-    blob.download_to_filename(temp_local_filename)
-
-    # 3. Resize
-    temp_thumb_filename = temp_local_filename + "_thumb"
     try:
-        with Image.open(temp_local_filename) as image:
-            # Convert mode ke RGB kalau ketemu PNG transparan biar bisa di-save jadi JPEG
-            if image.mode in ("RGBA", "P"):
-                image = image.convert("RGB")
-                
-            image.thumbnail((300, 300))
-            
-            new_filename = f"{os.path.splitext(file_name)[0]}_thumb.jpg"
-            image.save(temp_thumb_filename, format="JPEG", quality=80)
-
-        # 4. Upload Balik
-        new_blob = bucket.blob(new_filename)
-        new_blob.upload_from_filename(temp_thumb_filename)
-        new_blob.content_type = "image/jpeg"
-        
-        print(f"✅ SUKSES! Thumbnail: {new_filename}")
-
+        bucket = get_client().bucket(bucket_name)
+        uploaded = process_object(bucket, file_name)
+        print(f"✅ SUKSES! {len(uploaded)} varian: {', '.join(uploaded)}")
     except Exception as e:
         print(f"❌ Error saat processing: {e}")
-
-    finally:
-        if os.path.exists(temp_local_filename): os.remove(temp_local_filename)
-        if os.path.exists(temp_thumb_filename): os.remove(temp_thumb_filename)
\ No newline at end of file
@@ -0,0 +1,21 @@
+import os
+
+# Varian gambar yang dibuat Cloud Function resize_image (backend/functions/main.py).
+# Env + aturan nama di sini HARUS sama dengan di sana: <nama tanpa ekstensi>_w<lebar>.<ext>
+VARIANT_WIDTHS = sorted({int(w) for w in os.getenv("VARIANT_WIDTHS", "300,800,1600").split(",")})
+VARIANT_FORMATS = [f.strip().lower() for f in os.getenv("VARIANT_FORMATS", "webp,jpeg").split(",")]
+EXTENSIONS = {"webp": "webp", "jpeg": "jpg"}
+
+def variant_urls(image_url: str):
+    """{"webp": {"300": url, ...}, "jpeg": {...}} dari URL gambar asli, None kalau tanpa gambar.
+
+    Cuma dihitung dari nama, tidak cek bucket: gambar yang baru di-upload bisa saja
+    variannya belum jadi, client tetap harus fallback ke image_url.
+    """
+    if not image_url:
+        return None
+    base = os.path.splitext(image_url)[0]
+    return {
+        fmt: {str(width): f"{base}_w{width}.{EXTENSIONS[fmt]}" for width in VARIANT_WIDTHS}
+        for fmt in VARIANT_FORMATS
+    }
@@ -0,0 +1,119 @@
+import json
+import threading
+import time
+from collections import OrderedDict
+
+# Channel pub/sub buat broadcast invalidasi L1 ke semua instance
+INVALIDATE_CHANNEL = "cache:invalidate"
+
+class LocalCache:
+    """LRU + TTL di memori proses, nyimpen response yang sudah siap dikirim."""
+
+    def __init__(self, max_entries: int = 1024, ttl: float = 5.0):
+        self.max_entries = max_entries
+        self.ttl = ttl
+        self._data = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, key: str):
+        with self._lock:
+            entry = self._data.get(key)
+            if entry is None:
+                return None
+            expires_at, value = entry
+            if time.monotonic() >= expires_at:
+                del self._data[key]
+                return None
+            self._data.move_to_end(key)
+            return value
+
+    def set(self, key: str, value, ttl: float = None):
+        """ttl per entry (mis. token yang exp-nya lebih dekat), default self.ttl."""
+        with self._lock:
+            self._data[key] = (time.monotonic() + (self.ttl if ttl is None else ttl), value)
+            self._data.move_to_end(key)
+            while len(self._data) > self.max_entries:
+                self._data.popitem(last=False)
+
+    def invalidate(self, keys: list):
+        """Hapus key persis, atau semua key berawalan X kalau ditulis 'X*'."""
+        with self._lock:
+            for key in keys:
+                if key.endswith("*"):
+                    prefix = key[:-1]
+                    for k in [k for k in self._data if k.startswith(prefix)]:
+                        del self._data[k]
+                else:
+                    self._data.pop(key, None)
+
+    def clear(self):
+        with self._lock:
+            self._data.clear()
+
+class RedisBreaker:
+    """Circuit breaker sederhana: habis error, Redis di-skip selama cooldown."""
+
+    def __init__(self, cooldown: float = 5.0):
+        self.cooldown = cooldown
+        self._down_until = 0.0
+
+    def allow(self) -> bool:
+        return time.monotonic() >= self._down_until
+
+    def record_failure(self, error: Exception):
+        if self.allow():
+            print(f"⚠️ Redis bermasalah ({error}), fallback ke L1 + DB selama {self.cooldown:.0f}s")
+        self._down_until = time.monotonic() + self.cooldown
+
+class InvalidationBus:
+    """Publish invalidasi ke Redis, dan dengarkan invalidasi dari instance lain."""
+
+    def __init__(self, client, local: LocalCache, breaker: RedisBreaker):
+        self.client = client
+        self.local = local
+        self.breaker = breaker
+        self._stop = threading.Event()
+        self._thread = None
+
+    def invalidate(self, keys: list):
+        # Lokal selalu dihapus langsung, Redis cuma buat instance lain
+        self.local.invalidate(keys)
+        if not self.client or not self.breaker.allow():
+            return
+        try:
+            self.client.publish(INVALIDATE_CHANNEL, json.dumps(keys))
+        except Exception as e:
+            self.breaker.record_failure(e)
+
+    def start(self):
+        if not self.client or self._thread:
+            return
+        self._thread = threading.Thread(target=self._listen, name="l1-invalidation", daemon=True)
+        self._thread.start()
+
+    def stop(self):
+        self._stop.set()
+
+    def _listen(self):
+        backoff = 1.0
+        while not self._stop.is_set():
+            pubsub = None
+            try:
+                pubsub = self.client.pubsub(ignore_subscribe_messages=True)
+                pubsub.subscribe(INVALIDATE_CHANNEL)
+                backoff = 1.0
+                while not self._stop.is_set():
+                    message = pubsub.get_message(timeout=1.0)
+                    if message and message["type"] == "message":
+                        self.local.invalidate(json.loads(message["data"]))
+            except Exception:
+                # Selama putus, pesan invalidasi bisa hilang. Kosongkan L1 biar aman.
+                self.local.clear()
+                self._stop.wait(backoff)
+                backoff = min(backoff * 2, 30.0)
+            finally:
+                if pubsub is not None:
+                    try:
+                        pubsub.close()
+                    except Exception:
+                        pass
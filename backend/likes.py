@@ -0,0 +1,188 @@
+import threading
+from sqlalchemy import select, update, literal, func, bindparam
+from sqlalchemy.dialects.postgresql import insert as pg_insert
+from sqlalchemy.dialects.sqlite import insert as sqlite_insert
+from sqlalchemy.exc import IntegrityError
+from sqlalchemy.orm import Session
+from redis.exceptions import LockError
+
+from models import ReportModel, ReportLike, ReportArchive
+
+# --- KEY LAYOUT (mode write-behind) ---
+# likes:pending   -> HASH report_id -> jumlah like yang belum masuk DB
+# likes:flushing  -> HASH batch yang sedang di-flush (sisa crash diproses duluan)
+PENDING_KEY = "likes:pending"
+FLUSHING_KEY = "likes:flushing"
+FLUSH_LOCK = "lock:likes:flush"
+
+# --- LIKED-BY-ME (flag "liked" di list) ---
+# likes:user:{username} -> SET id laporan yang sudah di-like user itu. Anggota 0 = penanda set sudah
+#                          dimuat lengkap dari DB; tanpa penanda isinya cuma like baru (belum lengkap).
+# Like baru selalu SADD dan loader cuma menambah (tidak menimpa), jadi balapan keduanya tetap benar.
+USER_LIKES_KEY = "likes:user:{}"
+USER_LIKES_LOADED = 0
+USER_LIKES_TTL = 3600
+
+class ReportNotFound(Exception):
+    pass
+
+class AlreadyLiked(Exception):
+    pass
+
+def user_likes_stmt(username: str):
+    """Semua id laporan yang di-like user (PK report_likes diawali user_username, cukup index)."""
+    return select(ReportLike.report_id).where(ReportLike.user_username == username)
+
+def liked_stmt(username: str, report_ids: list):
+    """Versi batch buat satu halaman: id mana saja dari `report_ids` yang sudah di-like, satu query."""
+    return user_likes_stmt(username).where(ReportLike.report_id.in_(report_ids))
+
+def remember_likes(pipe, username: str, report_ids: list, loaded: bool = False):
+    """Tambah ke set like user di Redis (pipeline). loaded=True: report_ids = isi lengkap dari DB."""
+    key = USER_LIKES_KEY.format(username)
+    members = [USER_LIKES_LOADED, *report_ids] if loaded else report_ids
+    if members:
+        pipe.sadd(key, *members)
+        pipe.expire(key, USER_LIKES_TTL)
+
+def _insert_like_stmt(dialect: str, report_id: int, username: str):
+    """INSERT ... SELECT yang diam saja kalau like sudah ada (dan kosong kalau laporan tidak ada)."""
+    source = select(literal(username), ReportModel.id).where(ReportModel.id == report_id)
+    columns = ["user_username", "report_id"]
+    if dialect == "postgresql":
+        return pg_insert(ReportLike).from_select(columns, source).on_conflict_do_nothing()
+    if dialect == "sqlite":
+        return sqlite_insert(ReportLike).from_select(columns, source).on_conflict_do_nothing()
+    return ReportLike.__table__.insert().from_select(columns, source)
+
+def _increment_stmt():
+    return update(ReportModel).values(likes=func.coalesce(ReportModel.likes, 0) + 1)
+
+def _raise_reason(db: Session, report_id: int):
+    db.rollback()
+    if db.query(ReportModel.id).filter(ReportModel.id == report_id).first() is None:
+        raise ReportNotFound()
+    raise AlreadyLiked()
+
+def record_like(db: Session, report_id: int, username: str, increment: bool = True) -> int:
+    """Catat like tanpa read-modify-write. Balikin jumlah likes di DB setelahnya.
+
+    increment=False dipakai mode write-behind: cuma baris report_likes yang ditulis,
+    counter-nya nanti di-flush dari Redis.
+    """
+    dialect = db.get_bind().dialect.name
+
+    if dialect == "postgresql" and increment:
+        # Satu statement: insert-if-absent + likes = likes + 1 cuma kalau insert berhasil
+        inserted = _insert_like_stmt(dialect, report_id, username).returning(ReportLike.report_id).cte("inserted")
+        stmt = _increment_stmt().where(ReportModel.id == inserted.c.report_id).returning(ReportModel.likes)
+        likes = db.execute(stmt).scalar()
+        if likes is None:
+            _raise_reason(db, report_id)
+        db.commit()
+        return likes
+
+    try:
+        result = db.execute(_insert_like_stmt(dialect, report_id, username))
+    except IntegrityError:
+        result = None
+    if result is None or result.rowcount != 1:
+        _raise_reason(db, report_id)
+
+    if increment:
+        stmt = _increment_stmt().where(ReportModel.id == report_id).returning(ReportModel.likes)
+        likes = db.execute(stmt).scalar()
+    else:
+        likes = db.query(ReportModel.likes).filter(ReportModel.id == report_id).scalar()
+    db.commit()
+    return likes or 0
+
+def apply_like_deltas(db: Session, deltas: dict):
+    """Batch UPDATE likes = likes + delta (executemany, satu transaksi).
+
+    Tabel arsip ikut di-update: laporan bisa saja diarsip sebelum like pending-nya sempat di-flush.
+    """
+    if not deltas:
+        return
+    params = [{"report_id": k, "delta": v} for k, v in deltas.items()]
+    for table in (ReportModel.__table__, ReportArchive.__table__):
+        stmt = (
+            update(table)
+            .where(table.c.id == bindparam("report_id"))
+            .values(likes=func.coalesce(table.c.likes, 0) + bindparam("delta"))
+        )
+        db.execute(stmt, params)
+    db.commit()
+
+class LikeFlusher:
+    """Write-behind: like dihitung di Redis, lalu di-flush ke DB per batch berkala."""
+
+    def __init__(self, client, session_factory, interval: float = 5.0, on_flushed=None):
+        self.client = client
+        self.session_factory = session_factory
+        self.interval = interval
+        self.on_flushed = on_flushed
+        self._stop = threading.Event()
+        self._thread = None
+        self._start_lock = threading.Lock()
+
+    def add(self, report_id: int, delta: int = 1) -> int:
+        """Tambah like pending, balikin jumlah yang belum di-flush untuk laporan ini."""
+        self.ensure_started()
+        return self.client.hincrby(PENDING_KEY, report_id, delta)
+
+    def pending(self, report_id: int) -> int:
+        value = self.client.hget(PENDING_KEY, report_id)
+        return int(value) if value else 0
+
+    def ensure_started(self):
+        with self._start_lock:
+            if self._thread is None:
+                self._thread = threading.Thread(target=self._run, name="likes-flusher", daemon=True)
+                self._thread.start()
+
+    def stop(self, timeout: float = 10.0):
+        """Hentikan loop. Flush terakhir jalan di thread-nya, ditunggu biar like pending tidak tertahan di Redis."""
+        self._stop.set()
+        if self._thread is not None:
+            self._thread.join(timeout)
+
+    def _run(self):
+        while not self._stop.wait(self.interval):
+            self._flush_logged()
+        self._flush_logged() # Flush terakhir saat shutdown
+
+    def _flush_logged(self):
+        try:
+            self.flush()
+        except Exception as e:
+            print(f"⚠️ Gagal flush likes: {e}")
+
+    def flush(self) -> int:
+        """Pindahkan semua counter pending ke DB. Satu instance saja per putaran."""
+        lock = self.client.lock(FLUSH_LOCK, timeout=60, blocking=False)
+        if not lock.acquire():
+            return 0
+        try:
+            # Batch sisa crash sebelumnya diproses dulu, baru ambil yang baru
+            if not self.client.exists(FLUSHING_KEY):
+                if not self.client.exists(PENDING_KEY):
+                    return 0
+                self.client.rename(PENDING_KEY, FLUSHING_KEY)
+
+            deltas = {int(k): int(v) for k, v in self.client.hgetall(FLUSHING_KEY).items() if int(v)}
+            db = self.session_factory()
+            try:
+                apply_like_deltas(db, deltas)
+            finally:
+                db.close()
+            self.client.delete(FLUSHING_KEY)
+
+            if self.on_flushed and deltas:
+                self.on_flushed(list(deltas))
+            return len(deltas)
+        finally:
+            try:
+                lock.release()
+            except LockError:
+                pass
@@ -1,86 +1,87 @@
-from fastapi import FastAPI, Depends, HTTPException, status, Header, File, UploadFile, Form, Request
+from fastapi import FastAPI, Depends, HTTPException, status, Header, File, UploadFile, Form, Request, Query
 from fastapi.middleware.cors import CORSMiddleware
-from fastapi.encoders import jsonable_encoder 
+from fastapi.responses import Response, StreamingResponse
+from starlette.concurrency import run_in_threadpool
+from starlette.datastructures import Headers
 from sqlalchemy.orm import Session
-from sqlalchemy import text 
-from jose import jwt, JWTError
-from google.cloud import storage 
+from sqlalchemy.exc import IntegrityError
+from jose import JWTError
 import redis
-import json  
+import orjson
+import asyncio
+import datetime
+from contextlib import asynccontextmanager
 import os
-import uuid
-import glob
-import time
+import hashlib
 
 # Import modules 
-from config import ALLOWED_ORIGINS
-from database import get_db, SessionLocal 
+from config import ALLOWED_ORIGINS, ASYNC_MODE
+from database import get_db, SessionLocal, AsyncSessionLocal, engine, async_engine
+from db_pool import pool_status
 from models import UserModel, ReportModel, ReportLike 
-from schemas import LoginRequest, RegisterRequest, ReportUpdate
+from schemas import LoginRequest, RegisterRequest, ReportUpdate, ReportPage, ReportDetail, UploadSignRequest, BulkUpdate, BulkDelete
+from pagination import DEFAULT_PAGE_SIZE, MAX_PAGE_SIZE, CURSOR_FIELDS
+from report_cache import ReportCache
+from l1_cache import LocalCache, RedisBreaker, InvalidationBus
+from stats import StatsCounters, format_stats, snapshot
+from reads import ThreadedReads, AsyncReads
+from search import words, query_digest
+from dedup import DuplicateIndex, OPEN_STATUSES
+from bulk import bulk_update, bulk_delete
+from export import MEDIA_TYPES, export_stmt, export_chunks, gzip_chunks
+from archive import ReportArchiver
+from events import EventHub, parse_id
+from projections import encode, item_id, with_liked
+from metrics import MetricsMiddleware, InstrumentedRedis, InstrumentedAsyncRedis, instrument_engine, render_metrics
+from likes import record_like, apply_like_deltas, LikeFlusher, ReportNotFound, AlreadyLiked
+from uploads import upload_to_gcs, sign_upload, resolve_uploaded_object, UploadRejected, MAX_UPLOAD_BYTES
 from auth import (
-    get_password_hash, 
-    verify_password,     
-    create_access_token, 
-    SECRET_KEY, 
-    ALGORITHM
+    hash_password_async,
+    verify_and_update_async,
+    create_access_token,
+    decode_token,
+    AuthBusy,
 )
 
+# --- LIFESPAN ---
+# Import main.py sengaja murah (tanpa query, koneksi, atau thread), jadi scale-from-zero di Cloud Run
+# tidak bayar apa-apa sebelum request pertama. Client Redis / DB / GCS baru konek saat dipakai.
+# Job latar belakang jalan saat server start (per worker) dan dihentikan rapi saat shutdown.
+# Admin default dibuat terpisah: `python manage.py create-admin` (lihat entrypoint.sh).
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    workers = [w for w in (l1_bus, stats_counters, duplicate_index, event_hub, archiver) if w is not None]
+    for worker in workers:
+        worker.start()
+    yield
+    for worker in workers:
+        worker.stop()
+    if like_flusher is not None: # Flush terakhir like write-behind, ditunggu di thread
+        await run_in_threadpool(like_flusher.stop)
+
 # Init App
-app = FastAPI()
+app = FastAPI(lifespan=lifespan)
 
 
-# MIDDLEWARE PENGHITUNG WAKTU REQUEST
-@app.middleware("http")
-async def add_process_time_header(request: Request, call_next):
-    start_time = time.time()
-    
-    response = await call_next(request)
-    
-    process_time = (time.time() - start_time) * 1000 # Convert ke ms
-    formatted_process_time = f"{process_time:.2f}"
-    
-    # Menambahkan header custom supaya bisa dilihat di Postman/Browser Network Tab
-    response.headers["X-Process-Time"] = formatted_process_time
-    
-    # Print ke terminal supaya matamu bisa melihat kebenarannya
-    print(f"⏱️  [{request.method} {request.url.path}] selesai dalam {formatted_process_time}ms")
-    
-    return response
+# Tolak upload kebesaran dari header Content-Length, sebelum body multipart dibaca.
+# Sisa ruang 64KB buat field teks + boundary. ASGI murni (bukan @app.middleware):
+# BaseHTTPMiddleware mengoper tiap chunk response lewat memory stream, mahal buat halaman streaming.
+class UploadSizeLimit:
+    def __init__(self, app):
+        self.app = app
 
-# --- ADMIN CREATION LOGIC ---
-def create_default_admin():
-    db = SessionLocal()
-    target_username = os.getenv("ADMIN_USER", "admin")
-    target_password = os.getenv("ADMIN_PASS", "admin123") 
-    
-    try:
-        try:
-            db.execute(text("SELECT 1 FROM users LIMIT 1")) 
-        except Exception:
-            print("⏳ Tabel 'users' belum ada. Skip bikin admin. Jalankan 'alembic upgrade head' dulu!")
-            return
-
-        user = db.query(UserModel).filter(UserModel.username == target_username).first()
-        if not user:
-            print(f"👤 Creating super admin: {target_username}...")
-            hashed_pw = get_password_hash(target_password)
-            admin_user = UserModel(
-                username=target_username,
-                password_hash=hashed_pw,
-                role="admin"
-            )
-            db.add(admin_user)
-            db.commit()
-            print("✅ Admin created!")
-        else:
-            print("✅ Admin exists.")
-            
-    except Exception as e:
-        print(f"⚠️ Error creating admin: {e}")
-    finally:
-        db.close()
+    async def __call__(self, scope, receive, send):
+        if scope["type"] == "http" and scope["method"] == "POST" and scope["path"] == "/reports":
+            length = Headers(scope=scope).get("content-length")
+            if length and length.isdigit() and int(length) > MAX_UPLOAD_BYTES + 64 * 1024:
+                response = Response(
+                    content=orjson.dumps({"detail": "File terlalu besar"}),
+                    status_code=413, media_type="application/json",
+                )
+                return await response(scope, receive, send)
+        await self.app(scope, receive, send)
 
-create_default_admin()
+app.add_middleware(UploadSizeLimit)
 
 # CORS Setup
 app.add_middleware(
@@ -89,53 +90,234 @@ app.add_middleware(
     allow_credentials=True,
     allow_methods=["*"],
     allow_headers=["*"],
+    expose_headers=["ETag", "X-Process-Time", "Content-Disposition"],
 )
 
+# Metrik Prometheus (ganti print waktu per request): paling luar biar CORS + middleware lain ikut terukur.
+# X-Process-Time tetap dikirim dari sini.
+app.add_middleware(MetricsMiddleware)
+instrument_engine(engine, "sync")
+instrument_engine(async_engine, "async")
+
 # --- REDIS CONFIGURATION ---
 redis_host = os.getenv("REDIS_HOST", "localhost")
 redis_port = int(os.getenv("REDIS_PORT", 6379))
 
-try:
-    cache = redis.Redis(host=redis_host, port=redis_port, db=0, socket_connect_timeout=1)
-    cache.ping()
-    print(f"✅ Redis Connected: {redis_host}")
-except Exception as e:
-    print(f"⚠️ Redis Gagal: {e}")
+# Client dibuat tanpa ping: koneksi dibuka saat dipakai, dan kalau Redis mati
+# breaker bikin request langsung jatuh ke L1 + DB tanpa nunggu timeout tiap kali.
+# REDIS_HOST="" mematikan Redis sepenuhnya.
+if redis_host:
+    cache = InstrumentedRedis(
+        host=redis_host, port=redis_port, db=0,
+        socket_connect_timeout=1, socket_timeout=1, health_check_interval=30
+    )
+    print(f"✅ Redis Configured: {redis_host}")
+else:
+    print("⚠️ Redis dimatikan (REDIS_HOST kosong)")
     cache = None
 
-# --- GCS CONFIGURATION (Untuk Upload User) ---
-BUCKET_NAME = os.getenv("GCS_BUCKET_NAME", "freports-evidence-001") 
-cred_files = glob.glob("cred/*.json") # Local testing only!
+redis_breaker = RedisBreaker(cooldown=float(os.getenv("REDIS_COOLDOWN_SECONDS", 5)))
 
-if cred_files:
-    os.environ["GOOGLE_APPLICATION_CREDENTIALS"] = cred_files[0]
-    print(f"🔑 Local Credentials Loaded: {cred_files[0]}")
-else:
-    print("⚠️ No local credentials found. Assuming Cloud Run mode.")
+# Cache per laporan + index ZSET (lihat report_cache.py)
+reports_cache = ReportCache(cache, SessionLocal) if cache else None
+
+# L1 di memori tiap worker, diinvalidasi lewat pub/sub (lihat l1_cache.py)
+l1 = LocalCache(
+    max_entries=int(os.getenv("L1_MAX_ENTRIES", 1024)),
+    ttl=float(os.getenv("L1_TTL_SECONDS", 5)),
+)
+l1_bus = InvalidationBus(cache, l1, redis_breaker)
+
+def redis_ready() -> bool:
+    return reports_cache is not None and redis_breaker.allow()
+
+# Helper: Stream halaman JSON per item (item sudah berupa bytes JSON, tidak di-decode ulang)
+def stream_page(items: list, next_cursor: str, headers: dict = None):
+    async def generate(): # Async: generator sync diiterasi Starlette lewat threadpool, satu hop per item
+        yield b'{"items":['
+        for i, item in enumerate(items):
+            yield (b"," + item) if i else item
+        yield b'],"next_cursor":' + orjson.dumps(next_cursor) + b"}"
+
+    return StreamingResponse(generate(), media_type="application/json", headers=headers)
+
+# --- HTTP CONDITIONAL CACHING ---
+# ETag diturunkan dari counter versi koleksi (naik tiap write), jadi If-None-Match
+# bisa dijawab 304 tanpa menyentuh DB. Kalau Redis mati, ETag tidak dikirim.
+PUBLIC_CACHE_CONTROL = "public, max-age=0, s-maxage=5, stale-while-revalidate=30"
+PRIVATE_CACHE_CONTROL = "private, no-cache"
+
+async def collection_version():
+    version = l1.get("version")
+    if version is not None:
+        return version
+    version = await reads.version()
+    if version is not None:
+        l1.set("version", version)
+    return version
+
+def etag_for(version, *parts) -> str:
+    if version is None:
+        return None
+    digest = hashlib.blake2b(":".join(map(str, parts)).encode(), digest_size=8).hexdigest()
+    return f'"{version}-{digest}"'
+
+async def make_etag(*parts) -> str:
+    return etag_for(await collection_version(), *parts)
+
+# Body di L1 disimpan bersama versi koleksi saat dibuat, dan ETag-nya diturunkan dari versi itu.
+# Invalidasi "page:*" dari worker lain bisa datang belakangan dari kenaikan versi di Redis; kalau
+# ETag pakai versi live, body lama ikut dapat validator baru dan client kejebak 304 di body basi.
+async def l1_versioned(key: str):
+    """(versi, isi) dari L1, atau (versi live, None) kalau belum ada."""
+    entry = l1.get(key)
+    if entry is not None:
+        return entry
+    return await collection_version(), None
+
+def http_cache_headers(request: Request, etag: str) -> dict:
+    private = request.headers.get("authorization") is not None
+    headers = {
+        "Cache-Control": PRIVATE_CACHE_CONTROL if private else PUBLIC_CACHE_CONTROL,
+        "Vary": "Authorization",
+    }
+    if etag:
+        headers["ETag"] = etag
+    return headers
+
+def is_not_modified(request: Request, etag: str) -> bool:
+    if not etag:
+        return False
+    if_none_match = request.headers.get("if-none-match", "")
+    return etag in [tag.strip() for tag in if_none_match.split(",")] or if_none_match.strip() == "*"
+
+# Helper: Sinkronkan perubahan ke cache Redis + L1 semua instance. DB tetap sumber
+# kebenaran, jadi kalau Redis error cukup dicatat (index akan dibangun ulang saat expired).
+def sync_cache(hook: str, *args, report_ids: list = ()):
+    if redis_ready():
+        try:
+            getattr(reports_cache, hook)(*args)
+            reports_cache.bump_version()
+        except redis.RedisError as e:
+            redis_breaker.record_failure(e)
+        except Exception as e:
+            print(f"⚠️ Gagal update cache ({hook}): {e}")
+
+    l1_bus.invalidate(["version", "page:*", "search:*"] + [f"report:{i}" for i in report_ids])
 
-# Helper: Upload ke GCS
-def upload_to_gcs(file: UploadFile) -> str:
+# Counter dashboard di Redis + job reconcile berkala (lihat stats.py)
+stats_counters = StatsCounters(
+    cache, SessionLocal,
+    reconcile_interval=float(os.getenv("STATS_RECONCILE_SECONDS", 300)),
+) if cache else None
+
+def sync_stats(hook: str, *args):
+    if stats_counters is None or not redis_breaker.allow():
+        return
     try:
-        storage_client = storage.Client()
-        bucket = storage_client.bucket(BUCKET_NAME)
-        
-        file_extension = file.filename.split(".")[-1]
-        unique_filename = f"{uuid.uuid4()}.{file_extension}"
-        blob = bucket.blob(unique_filename)
+        getattr(stats_counters, hook)(*args)
+    except redis.RedisError as e:
+        redis_breaker.record_failure(e)
+
+# --- ARSIP (lihat archive.py) ---
+# Laporan Selesai / Ditolak yang tidak disentuh ARCHIVE_AFTER_DAYS hari dipindah ke tabel arsip per batch.
+# Counter /stats tidak berubah (laporan cuma pindah tabel), cache cukup membuang laporan yang dipindah.
+# ARCHIVE_INTERVAL_SECONDS=0 mematikan job di proses web (mis. kalau pakai `python manage.py archive-reports`
+# dari Cloud Scheduler, karena instance Cloud Run bisa scale ke nol).
+def forget_archived(rows: list):
+    sync_cache("on_archive", rows, report_ids=[row.id for row in rows])
+
+archiver = ReportArchiver(
+    cache, SessionLocal,
+    after_days=float(os.getenv("ARCHIVE_AFTER_DAYS", 90)),
+    batch_size=int(os.getenv("ARCHIVE_BATCH_SIZE", 500)),
+    interval=float(os.getenv("ARCHIVE_INTERVAL_SECONDS", 3600)),
+    on_archived=forget_archived,
+)
 
-        blob.upload_from_file(file.file, content_type=file.content_type)
-        return blob.public_url
+# --- DETEKSI DUPLIKAT (lihat dedup.py) ---
+# Index MinHash LSH laporan terbuka, dicek sebelum laporan baru disimpan.
+DEDUP_ENABLED = os.getenv("DEDUP_ENABLED", "1") == "1"
+
+duplicate_index = DuplicateIndex(
+    cache, SessionLocal,
+    sync_interval=float(os.getenv("DEDUP_SYNC_SECONDS", 2)),
+) if DEDUP_ENABLED else None
+
+def sync_dedup(hook: str, *args):
+    if duplicate_index is None or (cache is not None and not redis_breaker.allow()):
+        return
+    try:
+        getattr(duplicate_index, hook)(*args)
+    except redis.RedisError as e:
+        redis_breaker.record_failure(e)
     except Exception as e:
-        print(f"❌ GCS Upload Error: {e}")
-        return None
+        print(f"⚠️ Gagal update index duplikat ({hook}): {e}")
 
-# Fungsi Cek Token
-def get_current_user(authorization: str = Header(None)):
+def find_duplicates(db: Session, title: str, description: str, facility: str):
+    """(signature, daftar laporan mirip siap kirim). Index error = anggap tidak ada duplikat."""
+    if duplicate_index is None or (cache is not None and not redis_breaker.allow()):
+        return None, []
+    try:
+        sig, matches = duplicate_index.find(title, description, facility)
+    except redis.RedisError as e:
+        redis_breaker.record_failure(e)
+        return None, []
+    if not matches:
+        return sig, []
+
+    scores = dict(matches)
+    rows = db.query(
+        ReportModel.id, ReportModel.title, ReportModel.facility, ReportModel.status, ReportModel.likes
+    ).filter(ReportModel.id.in_(scores)).all()
+    duplicates = [
+        {"id": r.id, "title": r.title, "facility": r.facility, "status": r.status,
+         "likes": r.likes or 0, "similarity": round(scores[r.id], 2)}
+        for r in rows
+    ]
+    duplicates.sort(key=lambda d: (-d["similarity"], -d["id"]))
+    return sig, duplicates
+
+# --- LIVE UPDATE (SSE, lihat events.py) ---
+# Tiap write kirim delta kecil ke semua dashboard yang terbuka, jadi client tidak perlu reload list.
+SSE_HEARTBEAT_SECONDS = float(os.getenv("SSE_HEARTBEAT_SECONDS", 15))
+
+event_hub = EventHub(cache, redis_breaker)
+
+def publish_event(event_type: str, payload):
+    try:
+        event_hub.publish(event_type, payload)
+    except Exception as e:
+        print(f"⚠️ Gagal publish event {event_type}: {e}")
+
+# --- LIKES WRITE-BEHIND (opsional) ---
+# LIKES_WRITE_BEHIND=1: like dihitung di Redis lalu di-flush ke DB per batch,
+# jadi laporan yang lagi viral tidak bikin antrian row lock di tabel reports.
+LIKES_WRITE_BEHIND = os.getenv("LIKES_WRITE_BEHIND", "0") == "1"
+
+like_flusher = LikeFlusher(
+    cache, SessionLocal,
+    interval=float(os.getenv("LIKES_FLUSH_SECONDS", 5)),
+    on_flushed=lambda ids: sync_cache("forget", ids, report_ids=ids),
+) if cache else None
+
+# --- JALUR BACA (lihat reads.py) ---
+# Default: I/O sync di threadpool. ASYNC_MODE=1: AsyncSession + redis.asyncio di event loop.
+reads = ThreadedReads(cache, reports_cache, stats_counters, redis_breaker, SessionLocal)
+if ASYNC_MODE:
+    async_cache = InstrumentedAsyncRedis(
+        host=redis_host, port=redis_port, db=0,
+        socket_connect_timeout=1, socket_timeout=1, health_check_interval=30
+    ) if redis_host else None
+    reads = AsyncReads(async_cache, reads, AsyncSessionLocal)
+
+# Fungsi Cek Token (async: claim token yang sama di-cache sampai exp, lihat auth.decode_token)
+async def get_current_user(authorization: str = Header(None)):
     if not authorization:
         raise HTTPException(status_code=401, detail="Token tidak ditemukan")
     try:
         token = authorization.replace("Bearer ", "")
-        payload = jwt.decode(token, SECRET_KEY, algorithms=[ALGORITHM])
+        payload = decode_token(token)
         username: str = payload.get("sub")
         role: str = payload.get("role")
         if username is None:
@@ -144,6 +326,34 @@ def get_current_user(authorization: str = Header(None)):
     except JWTError:
         raise HTTPException(status_code=401, detail="Token kadaluarsa")
 
+# List tetap publik: tanpa token / token basi = tamu (tanpa flag liked), bukan 401
+async def get_optional_user(authorization: str = Header(None)):
+    if not authorization:
+        return None
+    try:
+        return await get_current_user(authorization)
+    except HTTPException:
+        return None
+
+# Flag "liked" per item buat user yang login. Satu lookup batch per halaman (lihat reads.liked),
+# item di L1 / Redis tetap bersama semua user, flag cuma ditempel ke salinan bytes-nya.
+async def add_liked(user: dict, items: list) -> list:
+    if user is None or not items:
+        return items
+    ids = [item_id(item) for item in items]
+    liked = await reads.liked(user["username"], ids)
+    return [with_liked(item, report_id in liked) for item, report_id in zip(items, ids)]
+
+async def add_liked_body(user: dict, body: bytes) -> bytes:
+    """Sama, untuk body halaman utuh (hasil search di-cache sebagai satu blob)."""
+    if user is None:
+        return body
+    page = orjson.loads(body)
+    liked = await reads.liked(user["username"], [item["id"] for item in page["items"]])
+    for item in page["items"]:
+        item["liked"] = item["id"] in liked
+    return orjson.dumps(page)
+
 # === ENDPOINTS ===
 
 @app.get("/")
@@ -151,50 +361,72 @@ def root():
     return {"message": "Facility Watch Backend v2 (With GCS)", "status": "Ready"}
 
 @app.get("/stats")
-def get_dashboard_stats(db: Session = Depends(get_db), user: dict = Depends(get_current_user)):
+async def get_dashboard_stats(request: Request, user: dict = Depends(get_current_user)):
     if user['role'] != 'admin':
         raise HTTPException(status_code=403, detail="Hanya admin!")
-    
-    total = db.query(ReportModel).count()
-    pending = db.query(ReportModel).filter(ReportModel.status == 'Pending').count()
-    done = db.query(ReportModel).filter(ReportModel.status == 'Selesai').count()
-    
-    return {"total": total, "pending": pending, "done": done}
 
-@app.get("/reports")
-def get_reports(sort_by: str = "newest", db: Session = Depends(get_db)):
-    t_start = time.time() # Mulai stopwatch internal function
-    cache_key = f"reports:{sort_by}"
-    
-    # Coba ambil dari Redis
-    if cache:
-        try:
-            cached = cache.get(cache_key)
-            if cached:
-                t_end = time.time()
-                durasi = (t_end - t_start) * 1000
-                print(f"🚀 [CACHE HIT] Data diambil dari Redis dalam {durasi:.2f}ms")
-                return json.loads(cached)
-        except redis.ConnectionError:
-            print("⚠️ Redis putus di tengah jalan, lanjut ke DB...")
-
-    # Jika tidak ada di Redis, ambil dari DB (Lama)
-    print("🐌 [CACHE MISS] Query ke Database (SQLAlchemy)...")
-    query = db.query(ReportModel)
-    if sort_by == "likes":
-        reports = query.order_by(ReportModel.likes.desc()).all()
-    else:
-        reports = query.order_by(ReportModel.id.desc()).all()
-    
-    # Simpan ke Redis untuk masa depan (ex=60 detik)
-    if cache:
-        print(f"💾 Menyimpan data ke Redis (Key: {cache_key})...")
-        try:
-            cache.set(cache_key, json.dumps(jsonable_encoder(reports)), ex=60)
-        except Exception as e:
-            print(f"⚠️ Gagal simpan ke Redis: {e}")
-            
-    return reports
+    etag = await make_etag("stats")
+    headers = http_cache_headers(request, etag)
+    if is_not_modified(request, etag):
+        return Response(status_code=304, headers=headers)
+
+    # O(1) dari counter Redis, fallback satu query GROUP BY kalau Redis mati
+    stats = format_stats(await reads.stats())
+    return Response(content=orjson.dumps(stats), media_type="application/json", headers=headers)
+
+# Scrape Prometheus. METRICS_TOKEN diset -> wajib header "Authorization: Bearer <token>"
+# (scraper tidak login sebagai admin, jadi pakai token statis terpisah).
+METRICS_TOKEN = os.getenv("METRICS_TOKEN")
+
+@app.get("/metrics")
+def get_metrics(authorization: str = Header(None)):
+    if METRICS_TOKEN and authorization != f"Bearer {METRICS_TOKEN}":
+        raise HTTPException(status_code=401, detail="Token metrics salah")
+    body, content_type = render_metrics()
+    return Response(content=body, media_type=content_type)
+
+@app.get("/metrics/cache")
+def get_cache_metrics(user: dict = Depends(get_current_user)):
+    if user['role'] != 'admin':
+        raise HTTPException(status_code=403, detail="Hanya admin!")
+    if not reports_cache:
+        return {"enabled": False}
+    return {"enabled": True, **reports_cache.stats.snapshot()}
+
+@app.get("/metrics/pool")
+def get_pool_metrics(user: dict = Depends(get_current_user)):
+    """Isi pool koneksi DB saat ini, buat sizing instance vs budget koneksi."""
+    if user['role'] != 'admin':
+        raise HTTPException(status_code=403, detail="Hanya admin!")
+    return {"sync": pool_status(engine), "async": pool_status(async_engine)}
+
+@app.get("/reports", response_model=ReportPage)
+async def get_reports(
+    request: Request,
+    sort_by: str = "newest",
+    limit: int = Query(DEFAULT_PAGE_SIZE, ge=1, le=MAX_PAGE_SIZE),
+    cursor: str = None,
+    user: dict = Depends(get_optional_user),
+):
+    if sort_by not in CURSOR_FIELDS:
+        sort_by = "newest"
+
+    # L1: halaman yang sudah jadi di memori worker ini
+    l1_key = f"page:{sort_by}:{limit}:{cursor or ''}"
+    version, page = await l1_versioned(l1_key)
+
+    # Client masih pegang versi terbaru? Jawab 304 tanpa body (like user juga menaikkan versi)
+    etag = etag_for(version, "reports", sort_by, limit, cursor, user and user["username"])
+    headers = http_cache_headers(request, etag)
+    if is_not_modified(request, etag):
+        return Response(status_code=304, headers=headers)
+
+    if page is None:
+        # Redis (index ZSET + entry per laporan), fallback satu halaman dari DB
+        page = await reads.page(sort_by, limit, cursor)
+        l1.set(l1_key, (version, page))
+    items, next_cursor = page
+    return stream_page(await add_liked(user, items), next_cursor, headers=headers)
 
 @app.post("/reports")
 def create_report(
@@ -202,13 +434,30 @@ def create_report(
     description: str = Form(...),
     facility: str = Form(...),
     file: UploadFile = File(None),
+    image_object: str = Form(None),
+    force: bool = Form(False),
     db: Session = Depends(get_db), 
     user: dict = Depends(get_current_user)
 ):
+    # Cek duplikat dulu (sebelum upload), client bisa upvote laporan yang sudah ada
+    # atau kirim ulang dengan force=true kalau memang beda masalah.
+    sig, duplicates = find_duplicates(db, title, description, facility)
+    if duplicates and not force:
+        raise HTTPException(status_code=409, detail={
+            "message": "Sepertinya masalah ini sudah dilaporkan",
+            "duplicates": duplicates,
+        })
+
     image_url = None
-    if file:
-        print(f"📸 Uploading image: {file.filename}")
-        image_url = upload_to_gcs(file)
+    try:
+        if image_object:
+            # Sudah di-upload langsung ke bucket lewat /uploads/sign
+            image_url = resolve_uploaded_object(image_object, user['username'])
+        elif file:
+            print(f"📸 Uploading image: {file.filename}")
+            image_url = upload_to_gcs(file)
+    except UploadRejected as e:
+        raise HTTPException(status_code=e.status_code, detail=e.detail)
 
     new_report = ReportModel(
         title=title,
@@ -224,44 +473,277 @@ def create_report(
     db.commit()
     db.refresh(new_report)
     
-    if cache:
-        cache.delete("reports:newest")
-        cache.delete("reports:likes")
+    sync_cache("on_create", new_report)
+    sync_stats("on_create", new_report)
+    sync_dedup("on_create", new_report, sig)
+    publish_event("created", b'{"report":' + encode(new_report) + b"}")
         
     return {"message": "Success", "data": new_report}
 
+@app.post("/reports/duplicates/rebuild")
+def rebuild_duplicate_index(user: dict = Depends(get_current_user)):
+    """Bangun ulang index duplikat dari DB (mis. habis import data / ganti threshold)."""
+    if user['role'] != 'admin':
+        raise HTTPException(status_code=403, detail="Hanya admin!")
+    if duplicate_index is None:
+        return {"enabled": False}
+    return {"enabled": True, "open_reports": duplicate_index.reset()}
+
+@app.post("/uploads/sign")
+def sign_image_upload(body: UploadSignRequest, user: dict = Depends(get_current_user)):
+    """Signed URL buat upload gambar langsung ke GCS (file tidak lewat API)."""
+    try:
+        return sign_upload(body.content_type, body.size, user['username'])
+    except UploadRejected as e:
+        raise HTTPException(status_code=e.status_code, detail=e.detail)
+    except Exception as e:
+        print(f"❌ Gagal bikin signed URL: {e}")
+        raise HTTPException(status_code=503, detail="Upload langsung tidak tersedia")
+
+# --- LOGIN / REGISTER ---
+# bcrypt sengaja mahal (~0.3s), jadi jalan di pool bcrypt sendiri (auth.BcryptPool) dan TANPA memegang
+# koneksi DB: query user dulu, koneksi balik ke pool, baru verify. Login storm tidak menghabiskan
+# threadpool / pool koneksi yang dipakai feed.
+def find_user(username: str):
+    with SessionLocal() as db:
+        return db.query(UserModel).filter(UserModel.username == username).first()
+
+def save_password_hash(user_id: int, password_hash: str):
+    with SessionLocal() as db:
+        db.query(UserModel).filter(UserModel.id == user_id).update({"password_hash": password_hash})
+        db.commit()
+
+def create_user(username: str, password_hash: str):
+    with SessionLocal() as db:
+        db.add(UserModel(username=username, password_hash=password_hash, role="user"))
+        try:
+            db.commit()
+        except IntegrityError: # Balapan dua register dengan username sama
+            raise HTTPException(status_code=400, detail="Username sudah ada!")
+
+async def run_bcrypt(fn, *args):
+    try:
+        return await fn(*args)
+    except AuthBusy:
+        raise HTTPException(status_code=503, detail="Server sedang sibuk, coba lagi", headers={"Retry-After": "2"})
+
 @app.post("/login")
-def login(creds: LoginRequest, db: Session = Depends(get_db)):
-    user = db.query(UserModel).filter(UserModel.username == creds.username).first()
-    if not user or not verify_password(creds.password, user.password_hash):
+async def login(creds: LoginRequest):
+    user = await run_in_threadpool(find_user, creds.username)
+    if not user:
         raise HTTPException(status_code=401, detail="Login Gagal")
-    
+    valid, new_hash = await run_bcrypt(verify_and_update_async, creds.password, user.password_hash)
+    if not valid:
+        raise HTTPException(status_code=401, detail="Login Gagal")
+    if new_hash: # BCRYPT_ROUNDS berubah -> simpan hash dengan cost baru
+        await run_in_threadpool(save_password_hash, user.id, new_hash)
+
     token = create_access_token(data={"sub": user.username, "role": user.role})
     return {"access_token": token, "role": user.role, "username": user.username}
 
 @app.post("/register")
-def register(creds: RegisterRequest, db: Session = Depends(get_db)):
+async def register(creds: RegisterRequest):
     valid_code = os.getenv("REG_CODE", "admin123")
     if creds.secret_code != valid_code: 
         raise HTTPException(status_code=403, detail="Kode akses salah!")
     
-    if db.query(UserModel).filter(UserModel.username == creds.username).first():
+    if await run_in_threadpool(find_user, creds.username):
         raise HTTPException(status_code=400, detail="Username sudah ada!")
     
-    user = UserModel(username=creds.username, password_hash=get_password_hash(creds.password), role="user")
-    db.add(user)
-    db.commit()
+    password_hash = await run_bcrypt(hash_password_async, creds.password)
+    await run_in_threadpool(create_user, creds.username, password_hash)
     return {"message": "Registrasi Berhasil"}
 
-@app.get("/reports/{report_id}")
-def get_detail(report_id: int, db: Session = Depends(get_db)):
-    report = db.query(ReportModel).filter(ReportModel.id == report_id).first()
-    if not report: raise HTTPException(status_code=404)
-    return report
-
-@app.get("/my-reports")
-def get_my(db: Session = Depends(get_db), user: dict = Depends(get_current_user)):
-    return db.query(ReportModel).filter(ReportModel.username == user['username']).order_by(ReportModel.id.desc()).all()
+# --- AKSI MASSAL ADMIN ---
+# Satu statement set-based + satu commit + satu invalidasi cache, berapa pun jumlah laporannya.
+# Didaftarkan sebelum /reports/{report_id} (sama seperti /reports/search).
+@app.patch("/reports/bulk")
+def bulk_update_reports(body: BulkUpdate, db: Session = Depends(get_db), user: dict = Depends(get_current_user)):
+    if user['role'] != 'admin':
+        raise HTTPException(status_code=403, detail="Hanya admin yang boleh update!")
+    values = body.model_dump(exclude_none=True, exclude={"ids"})
+    if not values:
+        raise HTTPException(status_code=400, detail="Tidak ada perubahan")
+
+    ids = list(dict.fromkeys(body.ids))
+    old, rows = bulk_update(db, ids, values)
+    updated = [row.id for row in rows]
+
+    sync_cache("on_bulk_update", rows, report_ids=updated)
+    sync_stats("on_bulk", [old[i] for i in updated], [(r.status, r.priority, r.facility) for r in rows])
+    sync_dedup("forget", [r.id for r in rows if r.status not in OPEN_STATUSES])
+    sync_dedup("reopen", [r.id for r in rows if r.status in OPEN_STATUSES and old[r.id][0] not in OPEN_STATUSES])
+    publish_event("updated", {"reports": [{"id": r.id, "status": r.status, "priority": r.priority} for r in rows]})
+    return {"message": f"{len(updated)} laporan diupdate", "updated": updated, "missing": [i for i in ids if i not in old]}
+
+@app.delete("/reports/bulk")
+def bulk_delete_reports(body: BulkDelete, db: Session = Depends(get_db), user: dict = Depends(get_current_user)):
+    if user['role'] != 'admin':
+        raise HTTPException(status_code=403)
+    ids = list(dict.fromkeys(body.ids))
+    old = bulk_delete(db, ids)
+    deleted = list(old)
+
+    sync_cache("on_bulk_delete", deleted, report_ids=deleted)
+    sync_stats("on_bulk", list(old.values()))
+    sync_dedup("forget", deleted)
+    publish_event("deleted", {"ids": deleted})
+    return {"message": f"{len(deleted)} laporan dihapus", "deleted": deleted, "missing": [i for i in ids if i not in old]}
+
+@app.get("/reports/stream")
+async def stream_reports(
+    request: Request,
+    last_event_id: str = Header(None),
+    since: str = Query(None, description="Sama dengan Last-Event-ID, buat koneksi pertama EventSource"),
+):
+    """Server-Sent Events: delta laporan (created / updated / likes / deleted) dari semua instance."""
+    resume_from = last_event_id or since
+    resume = parse_id(resume_from)
+    if resume_from and resume is None:
+        raise HTTPException(status_code=400, detail="Last-Event-ID tidak valid")
+    subscriber = event_hub.subscribe() # Subscribe dulu baru replay, biar tidak ada celah
+
+    async def generate():
+        try:
+            yield b"retry: 3000\n\n"
+            last = resume
+            if last is not None:
+                frames, reset = await run_in_threadpool(event_hub.replay, last)
+                if reset:
+                    yield b"event: reset\ndata: {}\n\n"
+                for event_id, frame in frames:
+                    last = parse_id(event_id)
+                    yield frame
+
+            while not subscriber.dropped:
+                try:
+                    event_id, frame = await asyncio.wait_for(subscriber.queue.get(), SSE_HEARTBEAT_SECONDS)
+                except asyncio.TimeoutError:
+                    if await request.is_disconnected():
+                        break
+                    yield b": ping\n\n" # Jaga koneksi tetap hidup di proxy / load balancer
+                    continue
+                event_key = parse_id(event_id)
+                if last is not None and event_key <= last:
+                    continue # Sudah terkirim waktu replay
+                last = event_key
+                yield frame
+        finally:
+            event_hub.unsubscribe(subscriber)
+
+    headers = {"Cache-Control": "no-cache", "X-Accel-Buffering": "no"}
+    return StreamingResponse(generate(), media_type="text/event-stream", headers=headers)
+
+# Harus didaftarkan sebelum /reports/{report_id}, kalau tidak "search" dianggap id
+@app.get("/reports/search", response_model=ReportPage)
+async def search_reports(
+    request: Request,
+    q: str = Query(..., min_length=2, max_length=100),
+    limit: int = Query(DEFAULT_PAGE_SIZE, ge=1, le=MAX_PAGE_SIZE),
+    cursor: str = None,
+    user: dict = Depends(get_optional_user),
+):
+    """Cari di judul, fasilitas & deskripsi, urut relevansi (tahan typo lewat trigram)."""
+    if not words(q):
+        raise HTTPException(status_code=400, detail="Kata kunci tidak valid")
+
+    l1_key = f"search:{query_digest(q, limit, cursor)}"
+    version, body = await l1_versioned(l1_key)
+    etag = etag_for(version, "search", q, limit, cursor, user and user["username"])
+    headers = http_cache_headers(request, etag)
+    if is_not_modified(request, etag):
+        return Response(status_code=304, headers=headers)
+
+    if body is None:
+        body = await reads.search(q, limit, cursor, version=version)
+        l1.set(l1_key, (version, body))
+    return Response(content=await add_liked_body(user, body), media_type="application/json", headers=headers)
+
+# --- EXPORT (lihat export.py) ---
+# Satu export memegang satu koneksi DB selama file dikirim, jadi dibatasi per worker biar pool
+# tetap cukup buat request biasa. Slot diambil di dalam generator: kalau klien putus sebelum body
+# mulai dikirim, tidak ada slot yang nyangkut.
+EXPORT_MAX_CONCURRENT = int(os.getenv("EXPORT_MAX_CONCURRENT", 2))
+export_slots = asyncio.Semaphore(EXPORT_MAX_CONCURRENT)
+
+@app.get("/reports/export")
+async def export_reports(
+    fmt: str = Query("csv", alias="format", pattern="^(csv|ndjson)$"),
+    report_status: str = Query(None, alias="status", pattern="^(Pending|Proses|Selesai|Ditolak)$"),
+    facility: str = Query(None, max_length=100),
+    date_from: datetime.date = None,
+    date_to: datetime.date = None,
+    include_archived: bool = False,
+    gzip: bool = False,
+    user: dict = Depends(get_current_user),
+):
+    """Unduh laporan (buat rekap semester), di-stream dari cursor server-side tanpa lewat cache."""
+    if user['role'] != 'admin':
+        raise HTTPException(status_code=403, detail="Hanya admin!")
+    if date_from and date_to and date_from > date_to:
+        raise HTTPException(status_code=400, detail="date_from harus sebelum date_to")
+    if export_slots.locked():
+        raise HTTPException(status_code=503, detail="Export lain sedang berjalan, coba lagi sebentar", headers={"Retry-After": "10"})
+    stmt = export_stmt(report_status, facility, date_from, date_to, include_archived)
+
+    async def generate(): # Satu hop threadpool per batch (BATCH_ROWS baris), event loop tetap bebas
+        async with export_slots:
+            chunks = export_chunks(SessionLocal, fmt, stmt)
+            body = gzip_chunks(chunks) if gzip else chunks
+            try:
+                while (chunk := await run_in_threadpool(next, body, None)) is not None:
+                    yield chunk
+            finally: # Klien putus di tengah: tutup cursor + session sekarang, jangan tunggu GC
+                body.close()
+                chunks.close()
+
+    filename = f"laporan-{datetime.date.today():%Y%m%d}.{fmt}" + (".gz" if gzip else "")
+    headers = {"Content-Disposition": f'attachment; filename="{filename}"', "Cache-Control": "no-store"}
+    media_type = "application/gzip" if gzip else MEDIA_TYPES[fmt]
+    return StreamingResponse(generate(), media_type=media_type, headers=headers)
+
+# Laporan lama yang sudah diarsip (feed, search & /my-reports cuma berisi data panas).
+# Detail /reports/{id} tetap bisa membuka laporan arsip, jadi link lama tidak mati.
+@app.get("/reports/archive", response_model=ReportPage)
+async def get_archived_reports(
+    request: Request,
+    limit: int = Query(DEFAULT_PAGE_SIZE, ge=1, le=MAX_PAGE_SIZE),
+    cursor: str = None,
+    facility: str = Query(None, max_length=100),
+    username: str = Query(None, max_length=50),
+):
+    etag = await make_etag("archive", limit, cursor, facility, username)
+    headers = http_cache_headers(request, etag)
+    if is_not_modified(request, etag):
+        return Response(status_code=304, headers=headers)
+
+    items, next_cursor = await reads.archive_page(limit, cursor, facility, username)
+    return stream_page(items, next_cursor, headers=headers)
+
+@app.get("/reports/{report_id}", response_model=ReportDetail)
+async def get_detail(report_id: int, request: Request):
+    l1_key = f"report:{report_id}"
+    version, encoded = await l1_versioned(l1_key)
+    etag = etag_for(version, "report", report_id)
+    headers = http_cache_headers(request, etag)
+    if is_not_modified(request, etag):
+        return Response(status_code=304, headers=headers)
+
+    if encoded is None:
+        encoded = await reads.detail(report_id)
+        if not encoded: raise HTTPException(status_code=404)
+        l1.set(l1_key, (version, encoded))
+    return Response(content=encoded, media_type="application/json", headers=headers)
+
+@app.get("/my-reports", response_model=ReportPage)
+async def get_my(
+    limit: int = Query(DEFAULT_PAGE_SIZE, ge=1, le=MAX_PAGE_SIZE),
+    cursor: str = None,
+    user: dict = Depends(get_current_user)
+):
+    # Cache per user (lihat ReportCache.get_my_page), cuma dibuang kalau user ini bikin laporan
+    items, next_cursor = await reads.my_page(user['username'], limit, cursor)
+    return stream_page(await add_liked(user, items), next_cursor)
 
 @app.post("/reports/{report_id}/upvote")
 def upvote_report(
@@ -269,28 +751,27 @@ def upvote_report(
     db: Session = Depends(get_db),
     user: dict = Depends(get_current_user)
 ):
-    report = db.query(ReportModel).filter(ReportModel.id == report_id).first()
-    if not report:
+    write_behind = LIKES_WRITE_BEHIND and like_flusher is not None and redis_ready()
+    try:
+        likes = record_like(db, report_id, user['username'], increment=not write_behind)
+    except ReportNotFound:
         raise HTTPException(status_code=404, detail="Laporan hilang ditelan bumi")
-    
-    existing_like = db.query(ReportLike).filter(
-        ReportLike.user_username == user['username'],
-        ReportLike.report_id == report_id
-    ).first()
-
-    if existing_like:
+    except AlreadyLiked:
         raise HTTPException(status_code=400, detail="Anda sudah vote laporan ini!")
 
-    new_like = ReportLike(user_username=user['username'], report_id=report_id)
-    db.add(new_like)
-    report.likes += 1
-    db.commit()
+    if write_behind:
+        try:
+            likes += like_flusher.add(report_id)
+        except redis.RedisError as e:
+            # Redis putus setelah like tercatat: counter langsung ditulis ke DB
+            redis_breaker.record_failure(e)
+            apply_like_deltas(db, {report_id: 1})
+            likes += 1
     
-    if cache: 
-        cache.delete("reports:newest")
-        cache.delete("reports:likes")
+    sync_cache("on_upvote", report_id, user['username'], report_ids=[report_id])
+    publish_event("likes", {"id": report_id, "likes": likes})
         
-    return {"message": "Upvoted!", "likes": report.likes}
+    return {"message": "Upvoted!", "likes": likes}
 
 @app.put("/reports/{report_id}")
 def update_report(
@@ -306,6 +787,7 @@ def update_report(
     if not report:
         raise HTTPException(status_code=404, detail="Laporan tidak ditemukan")
     
+    old = snapshot(report)
     report.status = update_data.status
     report.priority = update_data.priority
     report.admin_note = update_data.admin_note
@@ -313,9 +795,10 @@ def update_report(
     db.commit()
     db.refresh(report)
     
-    if cache: 
-        cache.delete("reports:newest")
-        cache.delete("reports:likes")
+    sync_cache("on_update", report, report_ids=[report_id])
+    sync_stats("on_update", old, report)
+    sync_dedup("on_update", report)
+    publish_event("updated", {"reports": [{"id": report.id, "status": report.status, "priority": report.priority}]})
         
     return {"message": "Laporan berhasil diupdate", "data": report}
 
@@ -323,7 +806,12 @@ def update_report(
 def delete_report(report_id: int, db: Session = Depends(get_db), user: dict = Depends(get_current_user)):
     if user['role'] != 'admin': raise HTTPException(status_code=403)
     report = db.query(ReportModel).filter(ReportModel.id == report_id).first()
+    if not report: raise HTTPException(status_code=404)
+    old = snapshot(report)
     db.delete(report)
     db.commit()
-    if cache: cache.delete("reports:newest")
+    sync_cache("on_delete", report_id, report_ids=[report_id])
+    sync_stats("on_delete", old)
+    sync_dedup("on_delete", report_id)
+    publish_event("deleted", {"ids": [report_id]})
     return {"message": "Deleted"}
\ No newline at end of file
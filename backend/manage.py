@@ -0,0 +1,82 @@
+"""Perintah sekali jalan di luar proses web. Dulu admin dibuat saat import main.py,
+jadi tiap cold start bayar query (dan kadang bcrypt) sebelum request pertama.
+
+    python manage.py create-admin      # dipanggil entrypoint.sh setelah alembic upgrade
+    python manage.py archive-reports   # pindah laporan lama ke arsip (cron / Cloud Scheduler)
+"""
+import os
+import sys
+from sqlalchemy import text
+
+from database import SessionLocal
+from models import UserModel
+from auth import get_password_hash
+
+def create_default_admin():
+    db = SessionLocal()
+    target_username = os.getenv("ADMIN_USER", "admin")
+    target_password = os.getenv("ADMIN_PASS", "admin123") 
+    
+    try:
+        try:
+            db.execute(text("SELECT 1 FROM users LIMIT 1")) 
+        except Exception:
+            print("⏳ Tabel 'users' belum ada. Skip bikin admin. Jalankan 'alembic upgrade head' dulu!")
+            return
+
+        user = db.query(UserModel).filter(UserModel.username == target_username).first()
+        if not user:
+            print(f"👤 Creating super admin: {target_username}...")
+            hashed_pw = get_password_hash(target_password)
+            admin_user = UserModel(
+                username=target_username,
+                password_hash=hashed_pw,
+                role="admin"
+            )
+            db.add(admin_user)
+            db.commit()
+            print("✅ Admin created!")
+        else:
+            print("✅ Admin exists.")
+            
+    except Exception as e:
+        print(f"⚠️ Error creating admin: {e}")
+    finally:
+        db.close()
+
+def archive_reports():
+    """Satu putaran job arsip (lihat archive.py), config env sama dengan job di proses web."""
+    import redis
+    from archive import ReportArchiver
+    from report_cache import ReportCache
+
+    redis_host = os.getenv("REDIS_HOST", "localhost")
+    client = redis.Redis(host=redis_host, port=int(os.getenv("REDIS_PORT", 6379)), socket_timeout=5) if redis_host else None
+    reports_cache = ReportCache(client, SessionLocal) if client else None
+
+    def forget(rows):
+        # Cache di Redis dibuang per batch, L1 tiap worker basi paling lama L1_TTL_SECONDS
+        if reports_cache is not None:
+            try:
+                reports_cache.on_archive(rows)
+                reports_cache.bump_version()
+            except redis.RedisError as e:
+                print(f"⚠️ Gagal buang cache (entry akan expired sendiri): {e}")
+
+    archiver = ReportArchiver(
+        client, SessionLocal,
+        after_days=float(os.getenv("ARCHIVE_AFTER_DAYS", 90)),
+        batch_size=int(os.getenv("ARCHIVE_BATCH_SIZE", 500)),
+        on_archived=forget,
+    )
+    print(f"🗄️ {archiver.run_once()} laporan dipindah ke arsip")
+
+COMMANDS = {
+    "create-admin": create_default_admin,
+    "archive-reports": archive_reports,
+}
+
+if __name__ == "__main__":
+    if len(sys.argv) != 2 or sys.argv[1] not in COMMANDS:
+        sys.exit(f"Usage: python manage.py {{{'|'.join(COMMANDS)}}}")
+    COMMANDS[sys.argv[1]]()
@@ -0,0 +1,260 @@
+import os
+import re
+import time
+import contextvars
+import redis
+import redis.client
+import redis.asyncio
+import redis.asyncio.client
+from prometheus_client import (
+    CollectorRegistry, Counter, Gauge, Histogram, generate_latest, CONTENT_TYPE_LATEST, multiprocess,
+)
+from sqlalchemy import event
+
+# --- PROMETHEUS ---
+# Satu worker: registry default di memori. Banyak worker (uvicorn --workers / gunicorn):
+# set PROMETHEUS_MULTIPROC_DIR ke folder kosong, tiap worker nulis file mmap sendiri
+# dan /metrics menggabungkan semuanya (entrypoint.sh mengosongkan folder ini saat start).
+MULTIPROC_DIR = os.getenv("PROMETHEUS_MULTIPROC_DIR")
+
+# Bucket latensi (detik): request API, query SQL / Redis biasanya jauh di bawah 10ms
+LATENCY_BUCKETS = (0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0)
+FAST_BUCKETS = (0.0001, 0.00025, 0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.5)
+COUNT_BUCKETS = (0, 1, 2, 3, 5, 8, 13, 21, 50)
+
+HTTP_LATENCY = Histogram(
+    "http_request_duration_seconds", "Latensi request per route template",
+    ["method", "route", "status"], buckets=LATENCY_BUCKETS,
+)
+DB_QUERIES_PER_REQUEST = Histogram(
+    "db_queries_per_request", "Jumlah query SQL per request", ["route"], buckets=COUNT_BUCKETS,
+)
+DB_TIME_PER_REQUEST = Histogram(
+    "db_time_per_request_seconds", "Total waktu SQL per request", ["route"], buckets=LATENCY_BUCKETS,
+)
+DB_QUERY_LATENCY = Histogram(
+    "db_query_duration_seconds", "Latensi per statement SQL", ["engine", "op"], buckets=FAST_BUCKETS,
+)
+REDIS_LATENCY = Histogram(
+    "redis_command_duration_seconds", "Latensi command Redis per keluarga key",
+    ["command", "family"], buckets=FAST_BUCKETS,
+)
+REDIS_LOOKUPS = Counter(
+    "redis_lookups_total", "Hasil GET / MGET / HGETALL per keluarga key", ["family", "result"],
+)
+REDIS_ERRORS = Counter("redis_errors_total", "Command Redis yang error", ["command", "family"])
+INDEX_FALLBACK = Counter(
+    "index_fallback_total",
+    "Halaman feed yang diambil langsung dari DB, bukan index Redis (redis_off / warming / redis_error)",
+    ["reason"],
+)
+CACHE_LOOKUPS = Counter(
+    "cache_lookups_total",
+    "Hit / miss cache: halaman list dari index Redis (page), /my-reports per user (my_page), claim token (token)",
+    ["cache", "result"],
+)
+GCS_LATENCY = Histogram(
+    "gcs_operation_duration_seconds", "Latensi operasi GCS", ["op"], buckets=LATENCY_BUCKETS,
+)
+POOL_WAIT = Histogram(
+    "db_pool_checkout_wait_seconds", "Waktu tunggu checkout koneksi dari pool", ["engine"], buckets=FAST_BUCKETS,
+)
+POOL_TIMEOUTS = Counter("db_pool_timeouts_total", "Checkout yang timeout (pool habis)", ["engine"])
+POOL_CHECKED_OUT = Gauge(
+    "db_pool_checked_out", "Koneksi yang sedang dipakai", ["engine"], multiprocess_mode="livesum",
+)
+BCRYPT_QUEUE_DEPTH = Gauge(
+    "bcrypt_queue_depth", "Hash / verify password yang menunggu thread bcrypt", multiprocess_mode="livesum",
+)
+BCRYPT_WAIT = Histogram("bcrypt_queue_wait_seconds", "Waktu antre sebelum bcrypt jalan", buckets=LATENCY_BUCKETS)
+BCRYPT_DURATION = Histogram("bcrypt_duration_seconds", "Lama satu hash / verify bcrypt", ["op"], buckets=LATENCY_BUCKETS)
+BCRYPT_REJECTED = Counter("bcrypt_rejected_total", "Login / register ditolak (503) karena antrean bcrypt penuh")
+REPORTS_ARCHIVED = Counter("reports_archived_total", "Laporan yang dipindah ke tabel arsip (lihat archive.py)")
+
+# Route tanpa histogram latensi: SSE durasinya = lama koneksi, /metrics tidak perlu mengukur diri sendiri
+UNTIMED_ROUTES = {"/reports/stream", "/metrics"}
+
+# --- SQL PER REQUEST ---
+# Middleware menaruh [jumlah, detik] di contextvar; hook SQLAlchemy menambahkannya.
+# Endpoint sync jalan di threadpool, tapi context-nya ikut tersalin (objek list-nya sama).
+_request_sql = contextvars.ContextVar("request_sql", default=None)
+
+def _statement_op(statement: str) -> str:
+    return statement.lstrip().split(None, 1)[0].upper() if statement.strip() else "OTHER"
+
+def instrument_engine(engine, name: str):
+    """Pasang hook before/after_cursor_execute ke engine sync (atau sync_engine milik engine async),
+    plus gauge koneksi yang sedang dipakai dari event checkout / checkin pool."""
+    if engine is None:
+        return
+    target = getattr(engine, "sync_engine", engine)
+    checked_out = POOL_CHECKED_OUT.labels(name)
+
+    @event.listens_for(target.pool, "checkout")
+    def _checkout(dbapi_conn, record, proxy):
+        checked_out.inc()
+
+    @event.listens_for(target.pool, "checkin")
+    def _checkin(dbapi_conn, record):
+        checked_out.dec()
+
+    @event.listens_for(target, "before_cursor_execute")
+    def _before(conn, cursor, statement, parameters, context, executemany):
+        context._query_start = time.perf_counter()
+
+    @event.listens_for(target, "after_cursor_execute")
+    def _after(conn, cursor, statement, parameters, context, executemany):
+        elapsed = time.perf_counter() - context._query_start
+        DB_QUERY_LATENCY.labels(name, _statement_op(statement)).observe(elapsed)
+        totals = _request_sql.get()
+        if totals is not None:
+            totals[0] += 1
+            totals[1] += elapsed
+
+# --- HTTP ---
+class MetricsMiddleware:
+    """Middleware ASGI murni (lebih ringan dari @app.middleware): latensi per route template,
+    query SQL per request, plus header X-Process-Time (waktu sampai header dikirim)."""
+
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            return await self.app(scope, receive, send)
+
+        start = time.perf_counter()
+        totals = [0, 0.0]
+        token = _request_sql.set(totals)
+        status = [500]
+
+        async def send_wrapper(message):
+            if message["type"] == "http.response.start":
+                status[0] = message["status"]
+                elapsed_ms = (time.perf_counter() - start) * 1000
+                message.setdefault("headers", []).append((b"x-process-time", f"{elapsed_ms:.2f}".encode()))
+            await send(message)
+
+        try:
+            await self.app(scope, receive, send_wrapper)
+        finally:
+            _request_sql.reset(token)
+            route = scope.get("route")
+            template = getattr(route, "path", "<unmatched>")
+            if template not in UNTIMED_ROUTES:
+                HTTP_LATENCY.labels(scope["method"], template, str(status[0])).observe(time.perf_counter() - start)
+                DB_QUERIES_PER_REQUEST.labels(template).observe(totals[0])
+                DB_TIME_PER_REQUEST.labels(template).observe(totals[1])
+
+# --- REDIS ---
+# Keluarga key = segmen sebelum segmen pertama yang mengandung angka, maks 2 segmen:
+# report:12 -> report, report:full:12 -> report:full, search:37:ab12 -> search, reports:idx:likes -> reports:idx
+_DIGIT = re.compile(r"\d")
+_LOOKUP_COMMANDS = {"GET", "MGET", "HGETALL", "HMGET"}
+
+def key_family(key) -> str:
+    if isinstance(key, bytes):
+        key = key.decode(errors="replace")
+    if not isinstance(key, str):
+        return "-"
+    family = []
+    for segment in key.split(":")[:2]:
+        if _DIGIT.search(segment) and family:
+            break
+        family.append(segment)
+    return ":".join(family)
+
+def _command_key(command: str, args: tuple):
+    if command in ("EVAL", "EVALSHA"): # Lua (lock redis-py): args = script, numkeys, key...
+        return args[2] if len(args) > 2 and int(args[1]) > 0 else None
+    return args[0] if args else None
+
+def _record_redis(command: str, args: tuple, elapsed: float, result):
+    family = key_family(_command_key(command, args))
+    REDIS_LATENCY.labels(command, family).observe(elapsed)
+    if command in _LOOKUP_COMMANDS:
+        if command in ("MGET", "HMGET"):
+            hits = sum(value is not None for value in result)
+            misses = len(result) - hits
+        else:
+            hits, misses = (1, 0) if result else (0, 1)
+        if hits:
+            REDIS_LOOKUPS.labels(family, "hit").inc(hits)
+        if misses:
+            REDIS_LOOKUPS.labels(family, "miss").inc(misses)
+
+def _pipeline_family(command_stack) -> str:
+    if not command_stack:
+        return "-"
+    args = command_stack[0][0]
+    return key_family(_command_key(str(args[0]).upper(), args[1:]))
+
+def _record_error(command: str, args: tuple):
+    REDIS_ERRORS.labels(command, key_family(_command_key(command, args))).inc()
+
+class InstrumentedPipeline(redis.client.Pipeline):
+    """Satu round trip pipeline = satu observasi PIPELINE (keluarga dari command pertama)."""
+
+    def execute(self, raise_on_error: bool = True):
+        family = _pipeline_family(self.command_stack)
+        start = time.perf_counter()
+        try:
+            return super().execute(raise_on_error)
+        except redis.RedisError:
+            REDIS_ERRORS.labels("PIPELINE", family).inc()
+            raise
+        finally:
+            REDIS_LATENCY.labels("PIPELINE", family).observe(time.perf_counter() - start)
+
+class InstrumentedRedis(redis.Redis):
+    """redis.Redis yang mencatat latensi + hit/miss per command."""
+
+    def execute_command(self, *args, **options):
+        command = str(args[0]).upper()
+        start = time.perf_counter()
+        try:
+            result = super().execute_command(*args, **options)
+        except redis.RedisError:
+            _record_error(command, args[1:])
+            raise
+        _record_redis(command, args[1:], time.perf_counter() - start, result)
+        return result
+
+    def pipeline(self, transaction=True, shard_hint=None):
+        return InstrumentedPipeline(self.connection_pool, self.response_callbacks, transaction, shard_hint)
+
+class InstrumentedAsyncPipeline(redis.asyncio.client.Pipeline):
+    async def execute(self, raise_on_error: bool = True):
+        family = _pipeline_family(self.command_stack)
+        start = time.perf_counter()
+        try:
+            return await super().execute(raise_on_error)
+        except redis.RedisError:
+            REDIS_ERRORS.labels("PIPELINE", family).inc()
+            raise
+        finally:
+            REDIS_LATENCY.labels("PIPELINE", family).observe(time.perf_counter() - start)
+
+class InstrumentedAsyncRedis(redis.asyncio.Redis):
+    async def execute_command(self, *args, **options):
+        command = str(args[0]).upper()
+        start = time.perf_counter()
+        try:
+            result = await super().execute_command(*args, **options)
+        except redis.RedisError:
+            _record_error(command, args[1:])
+            raise
+        _record_redis(command, args[1:], time.perf_counter() - start, result)
+        return result
+
+    def pipeline(self, transaction=True, shard_hint=None):
+        return InstrumentedAsyncPipeline(self.connection_pool, self.response_callbacks, transaction, shard_hint)
+
+# --- EXPOSITION ---
+def render_metrics() -> tuple:
+    """(body, content-type) format teks Prometheus."""
+    if MULTIPROC_DIR:
+        registry = CollectorRegistry()
+        multiprocess.MultiProcessCollector(registry)
+        return generate_latest(registry), CONTENT_TYPE_LATEST
+    return generate_latest(), CONTENT_TYPE_LATEST
@@ -1,4 +1,4 @@
-from sqlalchemy import Column, Integer, String, Text, DateTime, func, ForeignKey
+from sqlalchemy import Column, Integer, String, Text, DateTime, func, ForeignKey, Index
 from sqlalchemy.orm import relationship
 from database import Base
 
@@ -8,11 +8,13 @@ class ReportLike(Base):
     user_username = Column(String(50), ForeignKey("users.username"), primary_key=True) # Pakai Username sebagai FK
     report_id = Column(Integer, ForeignKey("reports.id"), primary_key=True)
 
-# Update di models.py
-class ReportModel(Base):
-    __tablename__ = "reports"
-    id = Column(Integer, primary_key=True, index=True)
-    
+    __table_args__ = (
+        # PK diawali user_username, jadi lookup by report_id butuh index sendiri
+        Index("ix_report_likes_report_id", "report_id"),
+    )
+
+# Kolom laporan, dipakai bersama tabel utama (panas) dan tabel arsip (dingin)
+class ReportFields:
     # --- Info Dasar ---
     title = Column(String(100))
     description = Column(String(500))
@@ -35,6 +37,45 @@ class ReportModel(Base):
     admin_note = Column(Text, nullable=True) # <--- BARU (Alasan tolak / Catatan teknisi)
     proof_image_url = Column(String(500), nullable=True) # <--- BARU (Foto sesudah diperbaiki)
 
+# Update di models.py
+class ReportModel(ReportFields, Base):
+    __tablename__ = "reports"
+    id = Column(Integer, primary_key=True, index=True)
+
+    # --- Index sesuai pola query (cek pakai check_query_plans.py) ---
+    __table_args__ = (
+        Index("ix_reports_likes_id", "likes", "id"),       # ORDER BY likes DESC, id DESC (feed terpopuler)
+        Index("ix_reports_username_id", "username", "id"), # WHERE username = ? ORDER BY id DESC (/my-reports)
+        Index("ix_reports_status", "status"),              # WHERE status = ? ORDER BY id (kandidat arsip)
+        # GROUP BY status, priority, facility (/stats tanpa Redis + reconcile): cukup baca index
+        Index("ix_reports_status_priority_facility", "status", "priority", "facility"),
+        # SQLite: id tidak boleh dipakai ulang, laporan yang diarsip tetap pegang id-nya di
+        # reports_archive (Postgres SERIAL memang tidak pernah mengulang)
+        {"sqlite_autoincrement": True},
+    )
+
+# --- ARSIP (lihat archive.py) ---
+# Laporan Selesai / Ditolak yang sudah lama dipindah ke sini (id tetap sama), jadi tabel + index +
+# cache jalur panas cuma berisi laporan yang masih relevan.
+class ReportArchive(ReportFields, Base):
+    __tablename__ = "reports_archive"
+    id = Column(Integer, primary_key=True, autoincrement=False) # id asli dari tabel reports
+    archived_at = Column(DateTime(timezone=True), server_default=func.now())
+
+    __table_args__ = (
+        Index("ix_reports_archive_username_id", "username", "id"), # /reports/archive?username=
+        Index("ix_reports_archive_status_priority_facility", "status", "priority", "facility"), # /stats
+    )
+
+class ReportLikeArchive(Base):
+    __tablename__ = "report_likes_archive"
+    user_username = Column(String(50), ForeignKey("users.username"), primary_key=True)
+    report_id = Column(Integer, ForeignKey("reports_archive.id"), primary_key=True)
+
+    __table_args__ = (
+        Index("ix_report_likes_archive_report_id", "report_id"),
+    )
+
 class UserModel(Base):
     __tablename__ = "users"
     id = Column(Integer, primary_key=True, index=True)
@@ -0,0 +1,33 @@
+import base64
+import json
+from fastapi import HTTPException
+
+# Batas ukuran halaman untuk endpoint list
+DEFAULT_PAGE_SIZE = 20
+MAX_PAGE_SIZE = 100
+
+# Field yang jadi kunci keyset untuk tiap mode sort
+CURSOR_FIELDS = {
+    "newest": ("id",),
+    "likes": ("likes", "id"),
+    "search": ("rank", "id"), # rank = skor relevansi x 1e6 (int), lihat search.py
+}
+
+def encode_cursor(sort_by: str, row: dict) -> str:
+    """Bikin cursor opaque dari baris terakhir halaman."""
+    payload = {"s": sort_by, "k": [row[f] or 0 for f in CURSOR_FIELDS[sort_by]]}
+    raw = json.dumps(payload, separators=(",", ":")).encode()
+    return base64.urlsafe_b64encode(raw).decode().rstrip("=")
+
+def decode_cursor(sort_by: str, cursor: str) -> list:
+    """Balikin nilai keyset dari cursor. Cursor rusak / beda mode sort -> 400."""
+    try:
+        raw = base64.urlsafe_b64decode(cursor + "=" * (-len(cursor) % 4))
+        payload = json.loads(raw)
+        keys = [int(v) for v in payload["k"]]
+    except Exception:
+        raise HTTPException(status_code=400, detail="Cursor tidak valid")
+
+    if payload.get("s") != sort_by or len(keys) != len(CURSOR_FIELDS[sort_by]):
+        raise HTTPException(status_code=400, detail="Cursor tidak cocok dengan mode sort")
+    return keys
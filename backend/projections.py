@@ -0,0 +1,39 @@
+import orjson
+
+from models import ReportModel, ReportArchive
+from schemas import ReportListItem, ReportDetail
+from images import variant_urls
+
+# Field response yang dihitung dari kolom lain (bukan kolom tabel)
+DERIVED_FIELDS = {
+    "image_variants": lambda obj: variant_urls(obj.image_url),
+}
+
+def _columns(schema, model=ReportModel) -> tuple:
+    return tuple(getattr(model, name) for name in schema.model_fields if name not in DERIVED_FIELDS)
+
+# Kolom yang di-SELECT untuk tiap bentuk response (tanpa hydrate object ORM)
+LIST_COLUMNS = _columns(ReportListItem)
+DETAIL_COLUMNS = _columns(ReportDetail)
+# Bentuk response yang sama dari tabel arsip (nama kolom sama, jadi encode() tidak perlu tahu bedanya)
+ARCHIVE_LIST_COLUMNS = _columns(ReportListItem, ReportArchive)
+ARCHIVE_DETAIL_COLUMNS = _columns(ReportDetail, ReportArchive)
+
+def encode(obj, schema=ReportListItem) -> bytes:
+    """Serialize Row hasil query kolom (atau object ORM) langsung ke bytes JSON."""
+    return orjson.dumps({
+        name: DERIVED_FIELDS[name](obj) if name in DERIVED_FIELDS else getattr(obj, name)
+        for name in schema.model_fields
+    })
+
+# --- FLAG PER USER ---
+# Item di cache dipakai bersama semua user, flag "liked" ditempel ke bytes-nya per request.
+# encode() selalu menaruh "id" paling depan (field pertama ReportListItem).
+ID_PREFIX = b'{"id":'
+
+def item_id(item: bytes) -> int:
+    """id dari bytes hasil encode(), tanpa decode seluruh JSON."""
+    return int(item[len(ID_PREFIX):item.index(b",", len(ID_PREFIX))])
+
+def with_liked(item: bytes, liked: bool) -> bytes:
+    return item[:-1] + (b',"liked":true}' if liked else b',"liked":false}')
@@ -0,0 +1,459 @@
+import orjson
+import redis
+from sqlalchemy import select, or_, and_
+from starlette.concurrency import run_in_threadpool
+
+from models import ReportModel, ReportArchive
+from projections import LIST_COLUMNS, encode
+from schemas import ReportDetail
+from pagination import decode_cursor, encode_cursor
+from report_cache import (
+    REPORT_KEY, DETAIL_KEY, IDX_META, VERSION_KEY, REPORT_TTL, MY_VERSION_KEY, MY_PAGE_KEY, MY_PAGE_TTL,
+    index_range, score_to_likes,
+)
+from likes import USER_LIKES_KEY, USER_LIKES_LOADED, user_likes_stmt, liked_stmt, remember_likes
+from stats import STATS_KEY, aggregate_stmt, aggregate_from_db, counts_from_rows, parse_counters
+from metrics import CACHE_LOOKUPS, INDEX_FALLBACK
+from search import SEARCH_KEY, SEARCH_TTL, search_stmt, exact_probe, query_digest
+from archive import detail_stmt, archive_list_stmt
+
+# Jalur baca panas (feed, detail, stats, my-reports, search) dalam dua mode, endpoint cukup `await reads.xxx()`:
+#   ThreadedReads -> SQLAlchemy + redis-py sync, tiap panggilan dilempar ke threadpool (default)
+#   AsyncReads    -> AsyncSession + redis.asyncio langsung di event loop (ASYNC_MODE=1)
+# Rebuild index, reconcile stats & arsip (jarang) tetap dikerjakan versi sync di threadpool.
+
+class CacheWarming(Exception):
+    """Index Redis belum siap (sedang dibangun worker lain)."""
+
+# --- KEYSET PAGINATION (statement yang sama untuk Session & AsyncSession) ---
+def keyset_select(stmt, sort_by: str, limit: int, cursor: str = None, model=ReportModel):
+    """Tambah filter cursor + urutan, ambil limit + 1 baris buat deteksi halaman berikutnya.
+    model=ReportArchive untuk halaman arsip (kolomnya sama)."""
+    if sort_by == "likes":
+        if cursor:
+            last_likes, last_id = decode_cursor(sort_by, cursor)
+            stmt = stmt.where(or_(
+                model.likes < last_likes,
+                and_(model.likes == last_likes, model.id < last_id),
+            ))
+        stmt = stmt.order_by(model.likes.desc(), model.id.desc())
+    else:
+        if cursor:
+            (last_id,) = decode_cursor(sort_by, cursor)
+            stmt = stmt.where(model.id < last_id)
+        stmt = stmt.order_by(model.id.desc())
+    return stmt.limit(limit + 1)
+
+def page_from_rows(rows: list, sort_by: str, limit: int):
+    items = [encode(r) for r in rows[:limit]]
+    next_cursor = encode_cursor(sort_by, rows[limit - 1]._mapping) if len(rows) > limit else None
+    return items, next_cursor
+
+def page_body(items: list, next_cursor: str) -> bytes:
+    """Body JSON satu halaman utuh (buat disimpan di cache apa adanya)."""
+    return b'{"items":[' + b",".join(items) + b'],"next_cursor":' + orjson.dumps(next_cursor) + b"}"
+
+def index_cursor(rows: list, sort_by: str, limit: int):
+    """Cursor halaman berikutnya dari hasil ZSET (id, score)."""
+    if len(rows) <= limit:
+        return None
+    last_id, last_score = rows[limit - 1]
+    return encode_cursor(sort_by, {"id": last_id, "likes": score_to_likes(last_score)})
+
+def feed_stmt():
+    return select(*LIST_COLUMNS)
+
+def my_reports_stmt(username: str):
+    return select(*LIST_COLUMNS).where(ReportModel.username == username)
+
+# Dulu print per request, sekarang counter Prometheus (lihat metrics.py)
+def log_hit():
+    CACHE_LOOKUPS.labels("page", "hit").inc()
+
+def log_miss(reason: str):
+    """reason: redis_off (Redis mati / breaker terbuka), warming (index dibangun worker lain), redis_error."""
+    CACHE_LOOKUPS.labels("page", "miss").inc()
+    INDEX_FALLBACK.labels(reason).inc()
+
+def my_page_ids(rows: list, limit: int, next_cursor: str) -> bytes:
+    """Isi cache halaman /my-reports: cuma urutan id + cursor (lihat ReportCache.get_my_page)."""
+    return orjson.dumps([[row.id for row in rows[:limit]], next_cursor])
+
+def liked_from_flags(ids: list, flags: list):
+    """Hasil SMISMEMBER [penanda, *ids] -> set id yang di-like, None kalau set user belum dimuat."""
+    if not flags[0]:
+        return None
+    return {report_id for report_id, flag in zip(ids, flags[1:]) if flag}
+
+class ThreadedReads:
+    """Mode default: I/O blocking, dijalankan di threadpool biar event loop tetap bebas."""
+
+    def __init__(self, client, reports_cache, stats_counters, breaker, session_factory):
+        self.client = client
+        self.reports_cache = reports_cache
+        self.stats_counters = stats_counters
+        self.breaker = breaker
+        self.session_factory = session_factory
+
+    def ready(self) -> bool:
+        return self.reports_cache is not None and self.breaker.allow()
+
+    async def version(self):
+        return await run_in_threadpool(self._version)
+
+    async def page(self, sort_by: str, limit: int, cursor: str = None):
+        return await run_in_threadpool(self._page, sort_by, limit, cursor)
+
+    async def my_page(self, username: str, limit: int, cursor: str = None):
+        return await run_in_threadpool(self._my_page, username, limit, cursor)
+
+    async def detail(self, report_id: int):
+        return await run_in_threadpool(self._detail, report_id)
+
+    async def liked(self, username: str, ids: list) -> set:
+        return await run_in_threadpool(self._liked, username, ids)
+
+    async def stats(self) -> dict:
+        return await run_in_threadpool(self._stats)
+
+    async def search(self, q: str, limit: int, cursor: str = None, version: int = None) -> bytes:
+        return await run_in_threadpool(self._search, q, limit, cursor, version)
+
+    async def archive_page(self, limit: int, cursor: str = None, facility: str = None, username: str = None):
+        return await run_in_threadpool(self._archive_page, limit, cursor, facility, username)
+
+    # --- IMPLEMENTASI SYNC (juga dipakai AsyncReads untuk jalur yang jarang) ---
+    def _version(self):
+        if not self.ready():
+            return None
+        try:
+            return int(self.client.get(VERSION_KEY) or 0)
+        except redis.RedisError as e:
+            self.breaker.record_failure(e)
+            return None
+
+    def _ensure_index(self) -> bool:
+        with self.session_factory() as db:
+            return self.reports_cache.ensure_index(db)
+
+    def _page(self, sort_by: str, limit: int, cursor: str = None):
+        # Coba ambil dari Redis: ZSET buat urutan, lalu bulk fetch entry per laporan
+        reason = "redis_off"
+        if self.ready():
+            try:
+                with self.session_factory() as db:
+                    if not self.reports_cache.ensure_index(db):
+                        raise CacheWarming()
+                    cursor_keys = decode_cursor(sort_by, cursor) if cursor else None
+                    rows = self.reports_cache.page_ids(sort_by, limit, cursor_keys)
+                    items = self.reports_cache.get_many([report_id for report_id, _ in rows[:limit]], db)
+                log_hit()
+                return items, index_cursor(rows, sort_by, limit)
+            except CacheWarming:
+                reason = "warming"
+            except redis.RedisError as e:
+                self.breaker.record_failure(e)
+                reason = "redis_error"
+
+        # Jika Redis tidak tersedia, ambil satu halaman langsung dari DB
+        log_miss(reason)
+        with self.session_factory() as db:
+            rows = db.execute(keyset_select(feed_stmt(), sort_by, limit, cursor)).all()
+        return page_from_rows(rows, sort_by, limit)
+
+    def _my_page(self, username: str, limit: int, cursor: str = None):
+        # Urutan id per user di Redis (versi per user), isi laporan dari entry bersama
+        key = None
+        if self.ready():
+            try:
+                with self.session_factory() as db:
+                    key = self.reports_cache.my_page_key(username, limit, cursor)
+                    page = self.reports_cache.get_my_page(key, db)
+                if page is not None:
+                    CACHE_LOOKUPS.labels("my_page", "hit").inc()
+                    return page
+            except redis.RedisError as e:
+                self.breaker.record_failure(e)
+                key = None
+
+        CACHE_LOOKUPS.labels("my_page", "miss").inc()
+        with self.session_factory() as db:
+            rows = db.execute(keyset_select(my_reports_stmt(username), "newest", limit, cursor)).all()
+        items, next_cursor = page_from_rows(rows, "newest", limit)
+        if key and self.ready():
+            try:
+                self.client.set(key, my_page_ids(rows, limit, next_cursor), ex=MY_PAGE_TTL)
+            except redis.RedisError as e:
+                self.breaker.record_failure(e)
+        return items, next_cursor
+
+    def _liked(self, username: str, ids: list) -> set:
+        """Id mana saja dari satu halaman yang sudah di-like user: satu SMISMEMBER ke set per user,
+        fallback satu query IN (...) ke report_likes. Tidak pernah query per baris."""
+        if not ids:
+            return set()
+        if self.ready():
+            key = USER_LIKES_KEY.format(username)
+            try:
+                liked = liked_from_flags(ids, self.client.smismember(key, [USER_LIKES_LOADED, *ids]))
+                if liked is not None:
+                    return liked
+                # Set belum ada / expired: muat semua like user ini sekali, halaman berikutnya cukup Redis
+                with self.session_factory() as db:
+                    report_ids = db.execute(user_likes_stmt(username)).scalars().all()
+                pipe = self.client.pipeline(transaction=False)
+                remember_likes(pipe, username, report_ids, loaded=True)
+                pipe.execute()
+                return set(report_ids).intersection(ids)
+            except redis.RedisError as e:
+                self.breaker.record_failure(e)
+
+        with self.session_factory() as db:
+            return set(db.execute(liked_stmt(username, ids)).scalars())
+
+    def _detail(self, report_id: int):
+        """JSON detail (bytes), None kalau laporan tidak ada."""
+        with self.session_factory() as db:
+            if self.ready():
+                try:
+                    return self.reports_cache.get_detail(report_id, db)
+                except redis.RedisError as e:
+                    self.breaker.record_failure(e)
+            row = db.execute(detail_stmt(report_id)).first()
+        return encode(row, ReportDetail) if row else None
+
+    def _stats(self) -> dict:
+        # O(1) dari counter Redis, fallback satu query GROUP BY kalau Redis mati
+        with self.session_factory() as db:
+            if self.stats_counters and self.breaker.allow():
+                try:
+                    return self.stats_counters.get(db)
+                except redis.RedisError as e:
+                    self.breaker.record_failure(e)
+            return aggregate_from_db(db)
+
+    def _search(self, q: str, limit: int, cursor: str = None, version: int = None) -> bytes:
+        """Body JSON halaman hasil cari. Di-cache per query + versi koleksi (write = key baru)."""
+        key = SEARCH_KEY.format(version, query_digest(q, limit, cursor)) if version is not None else None
+        if key and self.ready():
+            try:
+                cached = self.client.get(key)
+                if cached:
+                    return cached
+            except redis.RedisError as e:
+                self.breaker.record_failure(e)
+
+        with self.session_factory() as db:
+            dialect = db.get_bind().dialect.name
+            # Tidak ada yang cocok persis -> mode typo (trigram)
+            fuzzy = db.execute(*exact_probe(dialect, q)).first() is None
+            rows = db.execute(*search_stmt(dialect, q, limit, cursor, fuzzy)).all()
+        body = page_body(*page_from_rows(rows, "search", limit))
+
+        if key and self.ready():
+            try:
+                self.client.set(key, body, ex=SEARCH_TTL)
+            except redis.RedisError as e:
+                self.breaker.record_failure(e)
+        return body
+
+    def _archive_page(self, limit: int, cursor: str = None, facility: str = None, username: str = None):
+        """Halaman laporan arsip (terbaru dulu). Data dingin jarang dibaca, langsung ke DB tanpa cache."""
+        stmt = keyset_select(archive_list_stmt(facility, username), "newest", limit, cursor, ReportArchive)
+        with self.session_factory() as db:
+            rows = db.execute(stmt).all()
+        return page_from_rows(rows, "newest", limit)
+
+class AsyncReads:
+    """ASYNC_MODE=1: AsyncSession + redis.asyncio, tanpa threadpool di jalur yang sering."""
+
+    def __init__(self, client, threaded: ThreadedReads, session_factory):
+        self.client = client
+        self.threaded = threaded
+        self.session_factory = session_factory
+
+    @property
+    def reports_cache(self):
+        return self.threaded.reports_cache
+
+    @property
+    def breaker(self):
+        return self.threaded.breaker
+
+    def ready(self) -> bool:
+        return self.client is not None and self.threaded.ready()
+
+    async def version(self):
+        if not self.ready():
+            return None
+        try:
+            return int(await self.client.get(VERSION_KEY) or 0)
+        except redis.RedisError as e:
+            self.breaker.record_failure(e)
+            return None
+
+    async def _ensure_index(self) -> bool:
+        state = self.reports_cache.index_state(await self.client.get(IDX_META))
+        if state == "cold":
+            # Rebuild single-flight pakai lock redis-py, jarang terjadi -> threadpool saja
+            return await run_in_threadpool(self.threaded._ensure_index)
+        return self.reports_cache.serve_index(state)
+
+    async def _page_ids(self, sort_by: str, limit: int, cursor_keys: list = None):
+        key, max_score = index_range(sort_by, cursor_keys)
+        if max_score is None:
+            rows = await self.client.zrevrange(key, 0, limit, withscores=True)
+        else:
+            rows = await self.client.zrevrangebyscore(key, f"({max_score}", "-inf", start=0, num=limit + 1, withscores=True)
+        return [(int(member), score) for member, score in rows]
+
+    async def _get_many(self, ids: list) -> list:
+        """Sama dengan ReportCache.get_many: satu MGET, yang hilang diambil dari DB sekaligus."""
+        if not ids:
+            return []
+        cached = await self.client.mget([REPORT_KEY.format(i) for i in ids])
+        found = {i: c for i, c in zip(ids, cached) if c}
+
+        missing = [i for i in ids if i not in found]
+        self.reports_cache.stats.incr("hit", len(found))
+        if missing:
+            self.reports_cache.stats.incr("miss", len(missing))
+            async with self.session_factory() as db:
+                rows = (await db.execute(feed_stmt().where(ReportModel.id.in_(missing)))).all()
+            pipe = self.client.pipeline(transaction=False)
+            for row in rows:
+                found[row.id] = encode(row)
+                pipe.set(REPORT_KEY.format(row.id), found[row.id], ex=REPORT_TTL)
+            await pipe.execute()
+
+        return [found[i] for i in ids if i in found]
+
+    async def page(self, sort_by: str, limit: int, cursor: str = None):
+        reason = "redis_off"
+        if self.ready():
+            try:
+                if not await self._ensure_index():
+                    raise CacheWarming()
+                cursor_keys = decode_cursor(sort_by, cursor) if cursor else None
+                rows = await self._page_ids(sort_by, limit, cursor_keys)
+                items = await self._get_many([report_id for report_id, _ in rows[:limit]])
+                log_hit()
+                return items, index_cursor(rows, sort_by, limit)
+            except CacheWarming:
+                reason = "warming"
+            except redis.RedisError as e:
+                self.breaker.record_failure(e)
+                reason = "redis_error"
+
+        log_miss(reason)
+        async with self.session_factory() as db:
+            rows = (await db.execute(keyset_select(feed_stmt(), sort_by, limit, cursor))).all()
+        return page_from_rows(rows, sort_by, limit)
+
+    async def my_page(self, username: str, limit: int, cursor: str = None):
+        key = None
+        if self.ready():
+            try:
+                version = int(await self.client.get(MY_VERSION_KEY.format(username)) or 0)
+                key = MY_PAGE_KEY.format(username, version, limit, cursor or "")
+                cached = await self.client.get(key)
+                if cached:
+                    ids, next_cursor = orjson.loads(cached)
+                    CACHE_LOOKUPS.labels("my_page", "hit").inc()
+                    return await self._get_many(ids), next_cursor
+            except redis.RedisError as e:
+                self.breaker.record_failure(e)
+                key = None
+
+        CACHE_LOOKUPS.labels("my_page", "miss").inc()
+        async with self.session_factory() as db:
+            rows = (await db.execute(keyset_select(my_reports_stmt(username), "newest", limit, cursor))).all()
+        items, next_cursor = page_from_rows(rows, "newest", limit)
+        if key and self.ready():
+            try:
+                await self.client.set(key, my_page_ids(rows, limit, next_cursor), ex=MY_PAGE_TTL)
+            except redis.RedisError as e:
+                self.breaker.record_failure(e)
+        return items, next_cursor
+
+    async def liked(self, username: str, ids: list) -> set:
+        if not ids:
+            return set()
+        if self.ready():
+            try:
+                flags = await self.client.smismember(USER_LIKES_KEY.format(username), [USER_LIKES_LOADED, *ids])
+                liked = liked_from_flags(ids, flags)
+                if liked is not None:
+                    return liked
+                # Set per user belum dimuat (jarang): versi sync yang sekalian mengisi Redis
+                return await run_in_threadpool(self.threaded._liked, username, ids)
+            except redis.RedisError as e:
+                self.breaker.record_failure(e)
+
+        async with self.session_factory() as db:
+            return set((await db.execute(liked_stmt(username, ids))).scalars())
+
+    async def detail(self, report_id: int):
+        if self.ready():
+            key = DETAIL_KEY.format(report_id)
+            try:
+                cached = await self.client.get(key)
+                if cached:
+                    self.reports_cache.stats.incr("hit")
+                    return cached
+                self.reports_cache.stats.incr("miss")
+            except redis.RedisError as e:
+                self.breaker.record_failure(e)
+
+        async with self.session_factory() as db:
+            row = (await db.execute(detail_stmt(report_id))).first()
+        if row is None:
+            return None
+        encoded = encode(row, ReportDetail)
+        if self.ready():
+            try:
+                await self.client.set(DETAIL_KEY.format(report_id), encoded, ex=REPORT_TTL)
+            except redis.RedisError as e:
+                self.breaker.record_failure(e)
+        return encoded
+
+    async def stats(self) -> dict:
+        stats_counters = self.threaded.stats_counters
+        if stats_counters and self.client is not None and self.breaker.allow():
+            try:
+                counts = parse_counters(await self.client.hgetall(STATS_KEY))
+                if counts is not None:
+                    return counts
+                # Hash belum di-seed: reconcile (GROUP BY + tulis hash) sekali lewat versi sync
+                return await run_in_threadpool(self.threaded._stats)
+            except redis.RedisError as e:
+                self.breaker.record_failure(e)
+
+        async with self.session_factory() as db:
+            return counts_from_rows((await db.execute(aggregate_stmt())).all())
+
+    async def archive_page(self, limit: int, cursor: str = None, facility: str = None, username: str = None):
+        return await run_in_threadpool(self.threaded._archive_page, limit, cursor, facility, username)
+
+    async def search(self, q: str, limit: int, cursor: str = None, version: int = None) -> bytes:
+        key = SEARCH_KEY.format(version, query_digest(q, limit, cursor)) if version is not None else None
+        if key and self.ready():
+            try:
+                cached = await self.client.get(key)
+                if cached:
+                    return cached
+            except redis.RedisError as e:
+                self.breaker.record_failure(e)
+
+        async with self.session_factory() as db:
+            dialect = db.bind.dialect.name
+            fuzzy = (await db.execute(*exact_probe(dialect, q))).first() is None
+            rows = (await db.execute(*search_stmt(dialect, q, limit, cursor, fuzzy))).all()
+        body = page_body(*page_from_rows(rows, "search", limit))
+
+        if key and self.ready():
+            try:
+                await self.client.set(key, body, ex=SEARCH_TTL)
+            except redis.RedisError as e:
+                self.breaker.record_failure(e)
+        return body
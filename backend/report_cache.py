@@ -0,0 +1,394 @@
+import json
+import math
+import random
+import threading
+import time
+import uuid
+from redis.exceptions import LockError, WatchError
+from sqlalchemy.orm import Session
+
+from models import ReportModel
+from projections import LIST_COLUMNS, encode
+from schemas import ReportDetail
+from likes import PENDING_KEY, FLUSHING_KEY, remember_likes
+from archive import detail_stmt
+
+# --- KEY LAYOUT ---
+# report:{id}          -> JSON versi list satu laporan (TTL, diisi ulang lazy dari DB)
+# report:full:{id}     -> JSON versi detail (description, admin_note, dll)
+# reports:idx:newest   -> ZSET, score = id
+# reports:idx:likes    -> ZSET, score = likes * LIKES_SHIFT + id (tie-break by id)
+# reports:idx:meta     -> {"exp": soft expiry, "delta": lama rebuild}, kalau hilang = cold
+# reports:idx:dirty    -> SET id yang index-nya diubah write (jurnal, diputar ulang saat rebuild)
+# reports:idx:*:build:{token} -> ZSET sementara selama rebuild, di-RENAME ke key live di akhir
+# lock:reports:idx     -> lock single-flight, cuma satu worker yang boleh rebuild
+# reports:version      -> counter versi koleksi, naik tiap write (dasar ETag)
+# my:version:{user}    -> counter versi /my-reports per user, naik cuma kalau user itu bikin laporan
+# my:page:{user}:{v}:{limit}:{cursor} -> JSON [[id...], next_cursor], isi laporan tetap dari report:{id}
+REPORT_KEY = "report:{}"
+DETAIL_KEY = "report:full:{}"
+IDX_NEWEST = "reports:idx:newest"
+IDX_LIKES = "reports:idx:likes"
+IDX_META = "reports:idx:meta"
+IDX_DIRTY = "reports:idx:dirty"
+IDX_BUILD = "{}:build:{}"
+IDX_LOCK = "lock:reports:idx"
+VERSION_KEY = "reports:version"
+MY_VERSION_KEY = "my:version:{}"
+MY_PAGE_KEY = "my:page:{}:{}:{}:{}"
+
+REPORT_TTL = 3600     # Detik, entry per laporan
+INDEX_TTL = 600       # Detik, soft TTL index. Lewat dari ini index dianggap stale (tetap disajikan)
+MY_PAGE_TTL = 300     # Detik, halaman id /my-reports (juga batas basi kalau counter versi ke-evict)
+LOCK_TIMEOUT = 30     # Detik, lock otomatis lepas kalau worker yang rebuild mati
+XFETCH_BETA = 1.0     # Agresivitas refresh dini (probabilistic early expiration)
+LIKES_SHIFT = 2 ** 32 # likes di bit atas, id di bit bawah (masih presisi di double)
+SWAP_ATTEMPTS = 20    # Putaran replay jurnal + swap sebelum rebuild menyerah (write terlalu deras)
+
+def likes_score(likes: int, report_id: int) -> int:
+    return (likes or 0) * LIKES_SHIFT + report_id
+
+def score_to_likes(score: float) -> int:
+    return int(score) // LIKES_SHIFT
+
+def index_range(sort_by: str, cursor_keys: list = None):
+    """(ZSET, score maksimum eksklusif) untuk halaman setelah cursor."""
+    if sort_by == "likes":
+        return IDX_LIKES, likes_score(*cursor_keys) if cursor_keys else None
+    return IDX_NEWEST, cursor_keys[0] if cursor_keys else None
+
+class CacheStats:
+    """Counter hit / miss / stale / rebuild per proses (thread-safe)."""
+
+    FIELDS = ("hit", "miss", "stale", "rebuild")
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._counts = dict.fromkeys(self.FIELDS, 0)
+
+    def incr(self, field: str, amount: int = 1):
+        with self._lock:
+            self._counts[field] += amount
+
+    def snapshot(self) -> dict:
+        with self._lock:
+            return dict(self._counts)
+
+class ReportCache:
+    """Cache per laporan + sorted set untuk urutan newest / likes."""
+
+    def __init__(self, client, session_factory):
+        self.client = client
+        self.session_factory = session_factory
+        self.stats = CacheStats()
+        self._refreshing = threading.Lock() # Maks satu refresh background per proses
+
+    # --- INDEX ---
+    def ensure_index(self, db: Session) -> bool:
+        """Pastikan index bisa dipakai.
+
+        False kalau index belum ada dan worker lain sedang membangunnya,
+        caller sebaiknya query satu halaman langsung ke DB.
+        """
+        state = self.index_state(self.client.get(IDX_META))
+        if state == "cold":
+            # Cold: tidak ada yang bisa disajikan, yang dapat lock rebuild inline
+            if self._rebuild_single_flight(db):
+                return True
+            self.stats.incr("miss")
+            return False
+        return self.serve_index(state)
+
+    def index_state(self, meta) -> str:
+        """cold / stale / early / fresh dari isi IDX_META (tanpa I/O, dipakai mode async juga)."""
+        if meta is None:
+            return "cold"
+        meta = json.loads(meta)
+        now = time.time()
+        if now >= meta["exp"]:
+            return "stale"
+        # XFetch: refresh lebih awal dengan peluang yang naik mendekati expiry
+        if now - meta["delta"] * XFETCH_BETA * math.log(1.0 - random.random()) >= meta["exp"]:
+            return "early"
+        return "fresh"
+
+    def serve_index(self, state: str) -> bool:
+        """Index lama tetap disajikan, rebuild (kalau perlu) jalan di background."""
+        if state == "stale":
+            self.stats.incr("stale")
+            self._refresh_in_background()
+            return True
+        if state == "early":
+            self._refresh_in_background()
+        self.stats.incr("hit")
+        return True
+
+    def _rebuild_single_flight(self, db: Session) -> bool:
+        lock = self.client.lock(IDX_LOCK, timeout=LOCK_TIMEOUT, blocking=False)
+        if not lock.acquire():
+            return False
+        try:
+            self.rebuild_index(db)
+            self.stats.incr("rebuild")
+            return True
+        finally:
+            try:
+                lock.release()
+            except LockError:
+                pass # Lock sudah expired duluan, tidak masalah
+
+    def _refresh_in_background(self):
+        # Lock Redis cuma mencegah rebuild dobel antar proses. Tanpa guard ini satu jendela
+        # stale bikin ratusan thread (tiap request satu), masing-masing buka session + coba lock.
+        if not self._refreshing.acquire(blocking=False):
+            return
+
+        def run():
+            db = None
+            try:
+                db = self.session_factory()
+                self._rebuild_single_flight(db)
+            except Exception as e:
+                print(f"⚠️ Gagal refresh index di background: {e}")
+            finally:
+                if db is not None:
+                    db.close()
+                self._refreshing.release()
+
+        try:
+            threading.Thread(target=run, name="index-refresh", daemon=True).start()
+        except Exception:
+            self._refreshing.release()
+            raise
+
+    def rebuild_index(self, db: Session):
+        """Bangun ulang kedua ZSET dari DB (cuma kolom id & likes, tanpa isi laporan).
+
+        Dibangun di key sementara lalu di-RENAME ke key live. Write yang masuk selama build (on_create,
+        on_upvote, delete) tercatat di IDX_DIRTY; id-nya dibaca ulang dari DB dan diterapkan ke key
+        sementara sebelum swap. Swap di-WATCH ke jurnal, jadi write yang menyelip bikin replay diulang.
+        """
+        t_start = time.time()
+        token = uuid.uuid4().hex
+        tmp_newest, tmp_likes = IDX_BUILD.format(IDX_NEWEST, token), IDX_BUILD.format(IDX_LIKES, token)
+        self.client.delete(IDX_DIRTY) # Jurnal dimulai sebelum SELECT, write sesudahnya pasti tercatat
+        rows = db.query(ReportModel.id, ReportModel.likes).all()
+        pending = self._pending_likes()
+        pipe = self.client.pipeline(transaction=False)
+        for start in range(0, len(rows), 1000):
+            chunk = rows[start:start + 1000]
+            pipe.zadd(tmp_newest, {r.id: r.id for r in chunk})
+            pipe.zadd(tmp_likes, {r.id: likes_score((r.likes or 0) + pending.get(r.id, 0), r.id) for r in chunk})
+        for key in (tmp_newest, tmp_likes): # Sisa rebuild yang mati di tengah jalan hilang sendiri
+            pipe.expire(key, LOCK_TIMEOUT * 2)
+        pipe.execute()
+
+        try:
+            for attempt in range(SWAP_ATTEMPTS):
+                self._replay_dirty(db, tmp_newest, tmp_likes)
+                try:
+                    self._swap(tmp_newest, tmp_likes, time.time() - t_start)
+                    break
+                except WatchError:
+                    if attempt == SWAP_ATTEMPTS - 1:
+                        raise
+        finally:
+            self.client.delete(tmp_newest, tmp_likes)
+        print(f"🧱 Index laporan dibangun ulang ({len(rows)} baris)")
+
+    def _replay_dirty(self, db: Session, tmp_newest: str, tmp_likes: str):
+        """Terapkan state terbaru (dari DB) id di jurnal ke key sementara, lalu kosongkan jurnalnya."""
+        pipe = self.client.pipeline(transaction=True)
+        pipe.smembers(IDX_DIRTY)
+        pipe.delete(IDX_DIRTY)
+        ids = [int(i) for i in pipe.execute()[0]]
+        if not ids:
+            return
+        db.rollback() # Akhiri snapshot baca lama (SQLite WAL), biar commit terbaru kelihatan
+        likes = dict(db.query(ReportModel.id, ReportModel.likes).filter(ReportModel.id.in_(ids)).all())
+        pipe = self.client.pipeline(transaction=False)
+        for key in (PENDING_KEY, FLUSHING_KEY):
+            pipe.hmget(key, ids)
+        pending = [sum(int(v or 0) for v in values) for values in zip(*pipe.execute())]
+        pipe = self.client.pipeline(transaction=False)
+        for report_id, extra in zip(ids, pending):
+            if report_id in likes:
+                pipe.zadd(tmp_newest, {report_id: report_id})
+                pipe.zadd(tmp_likes, {report_id: likes_score((likes[report_id] or 0) + extra, report_id)})
+            else: # Dihapus / diarsip selama build
+                pipe.zrem(tmp_newest, report_id)
+                pipe.zrem(tmp_likes, report_id)
+        pipe.execute()
+
+    def _swap(self, tmp_newest: str, tmp_likes: str, delta: float):
+        """RENAME key sementara ke key live, cuma kalau jurnal masih kosong (WatchError kalau tidak)."""
+        with self.client.pipeline(transaction=True) as pipe:
+            pipe.watch(IDX_DIRTY)
+            if pipe.scard(IDX_DIRTY):
+                raise WatchError("write baru masuk selama build")
+            empty = not pipe.exists(tmp_newest)
+            pipe.multi()
+            if empty: # Tabel kosong: ZSET kosong tidak pernah ada di Redis
+                pipe.delete(IDX_NEWEST, IDX_LIKES)
+            else:
+                pipe.rename(tmp_newest, IDX_NEWEST)
+                pipe.rename(tmp_likes, IDX_LIKES)
+                pipe.persist(IDX_NEWEST) # RENAME ikut membawa TTL key sementara
+                pipe.persist(IDX_LIKES)
+            pipe.set(IDX_META, json.dumps({"exp": time.time() + INDEX_TTL, "delta": delta}))
+            pipe.execute()
+
+    def _pending_likes(self) -> dict:
+        """Like write-behind yang belum masuk DB, supaya index tidak mundur saat rebuild."""
+        pending = {}
+        for key in (PENDING_KEY, FLUSHING_KEY):
+            for report_id, delta in self.client.hgetall(key).items():
+                pending[int(report_id)] = pending.get(int(report_id), 0) + int(delta)
+        return pending
+
+    def page_ids(self, sort_by: str, limit: int, cursor_keys: list = None):
+        """Ambil limit + 1 pasangan (id, score) setelah posisi cursor."""
+        key, max_score = index_range(sort_by, cursor_keys)
+        if max_score is None:
+            rows = self.client.zrevrange(key, 0, limit, withscores=True)
+        else:
+            rows = self.client.zrevrangebyscore(key, f"({max_score}", "-inf", start=0, num=limit + 1, withscores=True)
+        return [(int(member), score) for member, score in rows]
+
+    # --- ENTRY PER LAPORAN ---
+    def get_many(self, ids: list, db: Session) -> list:
+        """Bulk fetch JSON laporan (satu MGET), yang hilang diambil dari DB dalam satu query.
+
+        Hasilnya bytes mentah dari Redis, langsung ditempel ke body response tanpa decode.
+        """
+        if not ids:
+            return []
+        cached = self.client.mget([REPORT_KEY.format(i) for i in ids])
+        found = {i: c for i, c in zip(ids, cached) if c}
+
+        missing = [i for i in ids if i not in found]
+        self.stats.incr("hit", len(found))
+        if missing:
+            self.stats.incr("miss", len(missing))
+            rows = db.query(*LIST_COLUMNS).filter(ReportModel.id.in_(missing)).all()
+            pipe = self.client.pipeline(transaction=False)
+            for row in rows:
+                found[row.id] = self._store(pipe, row)
+            pipe.execute()
+
+        # Laporan yang sudah dihapus tapi masih nyangkut di index di-skip
+        return [found[i] for i in ids if i in found]
+
+    # --- /MY-REPORTS PER USER ---
+    # Yang di-cache cuma urutan id per user, jadi status / likes tetap segar dari entry bersama dan
+    # write user lain tidak membuang cache ini. Laporan yang dihapus admin otomatis di-skip get_many.
+    def my_page_key(self, username: str, limit: int, cursor: str = None) -> str:
+        version = int(self.client.get(MY_VERSION_KEY.format(username)) or 0)
+        return MY_PAGE_KEY.format(username, version, limit, cursor or "")
+
+    def get_my_page(self, key: str, db: Session):
+        """(items, next_cursor) dari cache, None kalau belum ada."""
+        cached = self.client.get(key)
+        if not cached:
+            return None
+        ids, next_cursor = json.loads(cached)
+        return self.get_many(ids, db), next_cursor
+
+    def get_detail(self, report_id: int, db: Session):
+        """JSON detail satu laporan (bytes), None kalau laporan tidak ada."""
+        key = DETAIL_KEY.format(report_id)
+        cached = self.client.get(key)
+        if cached:
+            self.stats.incr("hit")
+            return cached
+
+        self.stats.incr("miss")
+        row = db.execute(detail_stmt(report_id)).first() # Laporan yang sudah diarsip juga dilayani
+        if row is None:
+            return None
+        encoded = encode(row, ReportDetail)
+        self.client.set(key, encoded, ex=REPORT_TTL)
+        return encoded
+
+    def _store(self, pipe, report) -> bytes:
+        encoded = encode(report)
+        pipe.set(REPORT_KEY.format(report.id), encoded, ex=REPORT_TTL)
+        return encoded
+
+    # --- WRITE HOOKS (update in place, bukan buang semua) ---
+    def bump_version(self) -> int:
+        return self.client.incr(VERSION_KEY)
+
+    def _mark_dirty(self, pipe, report_ids: list):
+        """Catat id yang index-nya berubah ke jurnal rebuild (lihat rebuild_index). Pipeline harus
+        transaction=True biar perubahan index + jurnal atomik terhadap swap."""
+        pipe.sadd(IDX_DIRTY, *report_ids)
+        pipe.expire(IDX_DIRTY, INDEX_TTL)
+
+    def on_create(self, report: ReportModel):
+        pipe = self.client.pipeline(transaction=True)
+        self._store(pipe, report)
+        pipe.zadd(IDX_NEWEST, {report.id: report.id})
+        pipe.zadd(IDX_LIKES, {report.id: likes_score(report.likes, report.id)})
+        self._mark_dirty(pipe, [report.id])
+        pipe.incr(MY_VERSION_KEY.format(report.username))
+        pipe.execute()
+
+    def on_upvote(self, report_id: int, username: str = None, delta: int = 1):
+        pipe = self.client.pipeline(transaction=True)
+        pipe.zincrby(IDX_LIKES, delta * LIKES_SHIFT, report_id)
+        self._mark_dirty(pipe, [report_id])
+        pipe.delete(REPORT_KEY.format(report_id), DETAIL_KEY.format(report_id))
+        if username:
+            remember_likes(pipe, username, [report_id])
+        pipe.execute()
+
+    def forget(self, report_ids: list):
+        """Buang entry laporan (misal setelah likes write-behind di-flush ke DB)."""
+        if report_ids:
+            keys = [key.format(i) for i in report_ids for key in (REPORT_KEY, DETAIL_KEY)]
+            self.client.delete(*keys)
+
+    def on_update(self, report: ReportModel):
+        pipe = self.client.pipeline(transaction=False)
+        self._store(pipe, report)
+        pipe.delete(DETAIL_KEY.format(report.id))
+        pipe.execute()
+
+    def on_bulk_update(self, rows: list):
+        """Banyak laporan diubah sekaligus (rows = LIST_COLUMNS hasil RETURNING), satu pipeline."""
+        pipe = self.client.pipeline(transaction=False)
+        for row in rows:
+            self._store(pipe, row)
+        if rows:
+            pipe.delete(*[DETAIL_KEY.format(row.id) for row in rows])
+        pipe.execute()
+
+    def on_bulk_delete(self, report_ids: list):
+        if not report_ids:
+            return
+        pipe = self.client.pipeline(transaction=True)
+        pipe.zrem(IDX_NEWEST, *report_ids)
+        pipe.zrem(IDX_LIKES, *report_ids)
+        self._mark_dirty(pipe, report_ids)
+        pipe.delete(*[key.format(i) for i in report_ids for key in (REPORT_KEY, DETAIL_KEY)])
+        pipe.execute()
+
+    def on_archive(self, rows: list):
+        """Laporan dipindah ke arsip (rows = (id, username)): keluar dari index + halaman /my-reports
+        pemiliknya. Entry detail ikut dibuang, nanti diisi ulang dari arsip kalau dibuka."""
+        if not rows:
+            return
+        self.on_bulk_delete([row.id for row in rows])
+        pipe = self.client.pipeline(transaction=False)
+        for username in {row.username for row in rows}:
+            pipe.incr(MY_VERSION_KEY.format(username))
+        pipe.execute()
+
+    def on_delete(self, report_id: int):
+        pipe = self.client.pipeline(transaction=True)
+        pipe.zrem(IDX_NEWEST, report_id)
+        pipe.zrem(IDX_LIKES, report_id)
+        self._mark_dirty(pipe, [report_id])
+        pipe.delete(REPORT_KEY.format(report_id), DETAIL_KEY.format(report_id))
+        pipe.execute()
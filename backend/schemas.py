@@ -1,4 +1,6 @@
 from pydantic import BaseModel, Field
+from datetime import datetime
+from typing import Dict, List, Optional
 class ReportCreate(BaseModel):
     title: str = Field(..., min_length=5, max_length=100)
     facility: str = Field(..., min_length=3, max_length=50)
@@ -19,4 +21,52 @@ class RegisterRequest(BaseModel):
 class ReportUpdate(BaseModel):
     status: str = Field(..., pattern="^(Pending|Proses|Selesai|Ditolak)$") # Validasi status
     priority: str = Field("Medium", pattern="^(Low|Medium|High|Critical)$")
-    admin_note: str = Field(None, max_length=500)
\ No newline at end of file
+    admin_note: str = Field(None, max_length=500)
+
+# Schema aksi massal admin (multi-select di tabel admin).
+# Batas ID biar IN list wajar dan transaksinya tidak kelamaan pegang lock.
+MAX_BULK_IDS = 500
+
+class BulkUpdate(BaseModel):
+    ids: List[int] = Field(..., min_length=1, max_length=MAX_BULK_IDS)
+    # Yang tidak diisi tidak diubah
+    status: Optional[str] = Field(None, pattern="^(Pending|Proses|Selesai|Ditolak)$")
+    priority: Optional[str] = Field(None, pattern="^(Low|Medium|High|Critical)$")
+    admin_note: Optional[str] = Field(None, max_length=500)
+
+class BulkDelete(BaseModel):
+    ids: List[int] = Field(..., min_length=1, max_length=MAX_BULK_IDS)
+
+# Schema minta signed URL upload gambar (file-nya sendiri tidak lewat API)
+class UploadSignRequest(BaseModel):
+    content_type: str = Field(..., max_length=100)
+    size: int = Field(..., gt=0)
+
+# Schema Response: versi ramping buat list (tanpa description / admin_note / proof_image_url)
+class ReportListItem(BaseModel):
+    id: int
+    title: Optional[str] = None
+    facility: Optional[str] = None
+    image_url: Optional[str] = None
+    status: Optional[str] = None
+    priority: Optional[str] = None
+    created_at: Optional[datetime] = None
+    updated_at: Optional[datetime] = None
+    username: Optional[str] = None
+    likes: Optional[int] = 0
+    # {"webp": {"300": url, "800": url, ...}, "jpeg": {...}} hasil Cloud Function resize_image
+    image_variants: Optional[Dict[str, Dict[str, str]]] = None
+
+# Schema Response: versi lengkap buat halaman detail
+class ReportDetail(ReportListItem):
+    description: Optional[str] = None
+    admin_note: Optional[str] = None
+    proof_image_url: Optional[str] = None
+
+# Item list + flag "sudah saya like" (cuma ada kalau request bawa token valid)
+class ReportFeedItem(ReportListItem):
+    liked: Optional[bool] = None
+
+class ReportPage(BaseModel):
+    items: List[ReportFeedItem]
+    next_cursor: Optional[str] = None
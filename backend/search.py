@@ -0,0 +1,93 @@
+import os
+import re
+import hashlib
+from sqlalchemy import BigInteger, Integer, bindparam, text
+
+from pagination import decode_cursor
+from projections import LIST_COLUMNS
+
+# --- SKEMA PENCARIAN (dibuat migrasi 8c3d2f1a6b7e, sengaja tidak ada di models.py) ---
+# Postgres: reports.search_vector (tsvector GENERATED, GIN) + reports.search_text (pg_trgm GIN)
+# SQLite  : reports_fts (FTS5 per kata, bm25) + reports_fts_tri (FTS5 trigram), disinkron trigger
+SEARCH_KEY = "search:{}:{}" # versi koleksi + digest query -> body halaman JSON
+SEARCH_TTL = 60
+RANK_SCALE = 1_000_000      # Skor float dibulatkan ke int biar bisa jadi kunci keyset
+
+# Yang diranking cuma N kandidat terbaru yang cocok, jadi kata yang ada di separuh tabel
+# ("ac", "rusak") tidak bikin query menghitung skor ratusan ribu baris.
+SEARCH_CANDIDATES = int(os.getenv("SEARCH_CANDIDATES", 1000))
+
+WORD = re.compile(r"\w+", re.UNICODE)
+
+def words(q: str) -> list:
+    return [w.lower() for w in WORD.findall(q)][:10]
+
+def trigrams(q: str) -> list:
+    grams = []
+    for word in words(q):
+        grams += [word[i:i + 3] for i in range(len(word) - 2)]
+    return list(dict.fromkeys(grams))[:30]
+
+def query_digest(q: str, limit: int, cursor: str = None) -> str:
+    raw = f"{' '.join(words(q))}|{limit}|{cursor or ''}"
+    return hashlib.blake2b(raw.encode(), digest_size=12).hexdigest()
+
+# --- MODE 1: KATA PERSIS (semua kata harus ada, prefix match) ---
+def exact_probe(dialect: str, q: str):
+    """Query murah (LIMIT 1): ada yang cocok persis? Kalau tidak, pakai mode typo."""
+    if dialect == "postgresql":
+        return text("SELECT 1 FROM reports WHERE search_vector @@ websearch_to_tsquery('simple', :q) LIMIT 1"), {"q": q}
+    return text("SELECT 1 FROM reports_fts WHERE reports_fts MATCH :match LIMIT 1"), {"match": _fts_match(q)}
+
+def _fts_match(q: str) -> str:
+    # Prefix match cuma untuk kata >= 3 huruf ("e*" bakal melebar ke semua kata berawalan e)
+    return " ".join(f'"{w}"*' if len(w) >= 3 else f'"{w}"' for w in words(q))
+
+def _hits(dialect: str, q: str, fuzzy: bool):
+    """CTE `hits(id, score)` + param-nya. Skor makin besar makin relevan."""
+    if dialect == "postgresql":
+        if fuzzy:
+            # Typo: kemiripan trigram terhadap judul + fasilitas (GIN gin_trgm_ops)
+            return ("SELECT id, word_similarity(:q, search_text) AS score FROM reports "
+                    "WHERE :q <% search_text ORDER BY id DESC LIMIT :cap"), {"q": q}
+        # Bobot tsvector: judul (A) > fasilitas (B) > deskripsi (C)
+        return ("SELECT id, ts_rank_cd(search_vector, websearch_to_tsquery('simple', :q)) AS score "
+                "FROM reports WHERE search_vector @@ websearch_to_tsquery('simple', :q) "
+                "ORDER BY id DESC LIMIT :cap"), {"q": q}
+
+    if fuzzy:
+        # Typo: OR semua trigram query, yang paling banyak trigram cocok (bm25) menang
+        grams = " OR ".join(f'"{g}"' for g in trigrams(q)) or '""'
+        return ("SELECT rowid AS id, -bm25(reports_fts_tri, 2.0, 1.0) AS score FROM reports_fts_tri "
+                "WHERE reports_fts_tri MATCH :grams ORDER BY rank LIMIT :cap"), {"grams": grams}
+    # bm25 negatif = makin kecil makin cocok. Bobot kolom: title, description, facility
+    return ("SELECT rowid AS id, -bm25(reports_fts, 10.0, 1.0, 5.0) AS score FROM reports_fts "
+            "WHERE reports_fts MATCH :match ORDER BY rowid DESC LIMIT :cap"), {"match": _fts_match(q)}
+
+def search_stmt(dialect: str, q: str, limit: int, cursor: str = None, fuzzy: bool = False):
+    """(statement, params) satu halaman hasil, urut relevansi lalu id. Kolom = LIST_COLUMNS + rank."""
+    hits, params = _hits(dialect, q, fuzzy)
+    params.update({"cap": SEARCH_CANDIDATES, "n": limit + 1})
+
+    keyset, keyset_params = "", []
+    if cursor:
+        params["last_rank"], params["last_id"] = decode_cursor("search", cursor)
+        keyset = "WHERE rank < :last_rank OR (rank = :last_rank AND id < :last_id)"
+        keyset_params = [bindparam("last_rank", type_=BigInteger), bindparam("last_id", type_=Integer)]
+
+    int_type = "bigint" if dialect == "postgresql" else "INTEGER"
+    columns = ", ".join(f"reports.{c.key}" for c in LIST_COLUMNS)
+    sql = f"""
+        WITH hits AS ({hits})
+        SELECT * FROM (
+            SELECT {columns}, CAST(round(hits.score * {RANK_SCALE}) AS {int_type}) AS rank
+            FROM hits JOIN reports ON reports.id = hits.id
+        ) ranked
+        {keyset}
+        ORDER BY rank DESC, id DESC
+        LIMIT :n
+    """
+    # Tipe hasil dideklarasikan biar baris lewat konversi yang sama dengan select() (SQLite
+    # mengembalikan DATETIME sebagai string, tanpa ini created_at keluar "2026-10-18 17:59:22")
+    stmt = text(sql).bindparams(bindparam("cap", type_=Integer), bindparam("n", type_=Integer), *keyset_params)
+    return stmt.columns(**{c.key: c.type for c in LIST_COLUMNS}, rank=BigInteger), params
@@ -0,0 +1,153 @@
+import threading
+from sqlalchemy import func, select, union_all
+from sqlalchemy.orm import Session
+from redis.exceptions import LockError
+
+from models import ReportModel, ReportArchive
+
+# --- KEY LAYOUT ---
+# stats:reports -> HASH total, status:<x>, priority:<x>, facility:<x>, plus penanda "seeded"
+# Kalau "seeded" belum ada, isi hash dianggap tidak lengkap dan diisi ulang dari DB.
+STATS_KEY = "stats:reports"
+SEEDED_FIELD = "seeded"
+RECONCILE_LOCK = "lock:stats:reconcile"
+GROUPS = ("status", "priority", "facility")
+
+def _fields(status, priority, facility) -> list:
+    values = (status, priority, facility)
+    return [f"{group}:{value or '-'}" for group, value in zip(GROUPS, values)]
+
+def snapshot(report: ReportModel) -> tuple:
+    """(status, priority, facility) sebelum laporan diubah / dihapus."""
+    return (report.status, report.priority, report.facility)
+
+def aggregate_stmt():
+    """Satu query GROUP BY untuk semua breakdown sekaligus. Laporan yang sudah diarsip tetap dihitung
+    (memindah ke arsip tidak mengubah counter, jadi reconcile juga harus melihat kedua tabel)."""
+    rows = union_all(*(
+        select(model.status, model.priority, model.facility) for model in (ReportModel, ReportArchive)
+    )).subquery()
+    columns = (rows.c.status, rows.c.priority, rows.c.facility)
+    return select(*columns, func.count()).group_by(*columns)
+
+def aggregate_from_db(db: Session) -> dict:
+    return counts_from_rows(db.execute(aggregate_stmt()).all())
+
+def counts_from_rows(rows) -> dict:
+    counts = {"total": 0}
+    for status, priority, facility, n in rows:
+        counts["total"] += n
+        for field in _fields(status, priority, facility):
+            counts[field] = counts.get(field, 0) + n
+    return counts
+
+def format_stats(counts: dict) -> dict:
+    result = {group: {} for group in GROUPS}
+    for field, n in counts.items():
+        group, _, value = field.partition(":")
+        if group in result and n:
+            result[group][value] = n
+    return {
+        "total": counts.get("total", 0),
+        "pending": result["status"].get("Pending", 0),
+        "done": result["status"].get("Selesai", 0),
+        "by_status": result["status"],
+        "by_priority": result["priority"],
+        "by_facility": result["facility"],
+    }
+
+def parse_counters(raw: dict):
+    """Isi HGETALL stats:reports -> dict, None kalau hash belum pernah di-seed."""
+    if not raw.get(SEEDED_FIELD.encode()):
+        return None
+    return {k.decode(): int(v) for k, v in raw.items() if k.decode() != SEEDED_FIELD}
+
+class StatsCounters:
+    """Counter dashboard di Redis, di-update tiap write jadi /stats tidak pernah scan tabel."""
+
+    def __init__(self, client, session_factory, reconcile_interval: float = 300.0):
+        self.client = client
+        self.session_factory = session_factory
+        self.reconcile_interval = reconcile_interval
+        self._stop = threading.Event()
+        self._thread = None
+
+    def get(self, db: Session) -> dict:
+        counts = parse_counters(self.client.hgetall(STATS_KEY))
+        return counts if counts is not None else self.reconcile(db)
+
+    def reconcile(self, db: Session) -> dict:
+        """Hitung ulang dari DB lalu timpa hash-nya (koreksi drift)."""
+        counts = aggregate_from_db(db)
+        pipe = self.client.pipeline(transaction=True)
+        pipe.delete(STATS_KEY)
+        pipe.hset(STATS_KEY, mapping={**counts, SEEDED_FIELD: 1})
+        pipe.execute()
+        return counts
+
+    # --- WRITE HOOKS ---
+    def _apply(self, fields: list, delta: int):
+        pipe = self.client.pipeline(transaction=False)
+        pipe.hincrby(STATS_KEY, "total", delta)
+        for field in fields:
+            pipe.hincrby(STATS_KEY, field, delta)
+        pipe.execute()
+
+    def on_create(self, report: ReportModel):
+        self._apply(_fields(*snapshot(report)), 1)
+
+    def on_delete(self, old: tuple):
+        self._apply(_fields(*old), -1)
+
+    def on_update(self, old: tuple, report: ReportModel):
+        old_fields, new_fields = _fields(*old), _fields(*snapshot(report))
+        pipe = self.client.pipeline(transaction=False)
+        for before, after in zip(old_fields, new_fields):
+            if before != after:
+                pipe.hincrby(STATS_KEY, before, -1)
+                pipe.hincrby(STATS_KEY, after, 1)
+        pipe.execute()
+
+    def on_bulk(self, old: list, new: list = ()):
+        """Banyak laporan sekaligus: selisih bersih dihitung dulu, lalu satu pipeline.
+
+        Bulk update = old + new (total saling hapus), bulk delete = old saja.
+        """
+        deltas = {}
+        for snapshots, sign in ((old, -1), (new, 1)):
+            for snap in snapshots:
+                for field in ["total"] + _fields(*snap):
+                    deltas[field] = deltas.get(field, 0) + sign
+        pipe = self.client.pipeline(transaction=False)
+        for field, delta in deltas.items():
+            if delta:
+                pipe.hincrby(STATS_KEY, field, delta)
+        pipe.execute()
+
+    # --- RECONCILIATION JOB ---
+    def start(self):
+        if self._thread is None:
+            self._thread = threading.Thread(target=self._run, name="stats-reconcile", daemon=True)
+            self._thread.start()
+
+    def stop(self):
+        self._stop.set()
+
+    def _run(self):
+        while not self._stop.wait(self.reconcile_interval):
+            lock = self.client.lock(RECONCILE_LOCK, timeout=60, blocking=False)
+            try:
+                if not lock.acquire():
+                    continue # Instance lain sedang reconcile
+                db = self.session_factory()
+                try:
+                    self.reconcile(db)
+                finally:
+                    db.close()
+            except Exception as e:
+                print(f"⚠️ Gagal reconcile stats: {e}")
+            finally:
+                try:
+                    lock.release()
+                except LockError:
+                    pass
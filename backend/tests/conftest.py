@@ -0,0 +1,18 @@
+"""Setup bersama test backend. DB SQLite sementara, Redis palsu (fakeredis), tanpa GCS.
+
+    pip install pytest fakeredis httpx   # cuma buat test, tidak masuk requirements.txt
+    cd backend && python -m pytest -q
+
+Env harus diset sebelum modul aplikasi di-import (config / database membacanya saat import).
+ASYNC_MODE=1 supaya engine async ikut dibuat; mode yang dipakai tiap test diatur lewat fixture.
+"""
+import os
+import sys
+import tempfile
+
+WORK_DIR = tempfile.mkdtemp(prefix="facility-test-")
+os.chdir(WORK_DIR) # database.py pakai sqlite:///./local_test.db
+os.environ["ASYNC_MODE"] = "1"
+os.environ["REDIS_HOST"] = "" # Client Redis dipasang manual per test (fakeredis / tanpa Redis)
+os.environ["DEDUP_ENABLED"] = "0"
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), ".."))
@@ -0,0 +1,51 @@
+"""Resume SSE (Last-Event-ID / ?since=): ID rusak tidak boleh sampai ke Redis atau membuka breaker."""
+import fakeredis
+import pytest
+from fastapi.testclient import TestClient
+from redis.exceptions import ResponseError
+
+import main
+from events import EVENTS_KEY, EventHub, parse_id
+from l1_cache import RedisBreaker
+
+MALFORMED = ["+5", " 5", "5_0", "5-", "-5", "5-+1", "٥", "5\n", "1" * 21, str(2 ** 64)]
+
+@pytest.fixture
+def hub(monkeypatch):
+    breaker = RedisBreaker(cooldown=5)
+    hub = EventHub(fakeredis.FakeRedis(), breaker)
+    monkeypatch.setattr(main, "event_hub", hub)
+    return hub
+
+@pytest.mark.parametrize("raw", MALFORMED)
+def test_parse_id_rejects_malformed(raw):
+    assert parse_id(raw) is None
+
+def test_parse_id_valid():
+    assert parse_id("1700000000000-3") == (1700000000000, 3)
+    assert parse_id(b"42") == (42, 0)
+    assert parse_id(str(2 ** 64 - 1)) == (2 ** 64 - 1, 0)
+
+@pytest.mark.parametrize("raw", MALFORMED)
+def test_stream_rejects_malformed_id(hub, raw):
+    client = TestClient(main.app)
+    if raw.isascii(): # Header HTTP cuma boleh ASCII
+        assert client.get("/reports/stream", headers={"Last-Event-ID": raw}).status_code == 400
+    assert client.get("/reports/stream", params={"since": raw}).status_code == 400
+    assert hub.breaker.allow()
+
+def test_replay_after_id(hub):
+    for i in range(3):
+        hub.publish("likes", {"id": i, "likes": i})
+    ids = [event_id.decode() for event_id, _ in hub.client.xrange(EVENTS_KEY)]
+    frames, reset = hub.replay(parse_id(ids[0]))
+    assert [event_id for event_id, _ in frames] == ids[1:]
+    assert not reset and hub.breaker.allow()
+
+def test_replay_rejected_by_redis_keeps_breaker_closed(hub, monkeypatch):
+    hub.publish("likes", {"id": 1, "likes": 1})
+    def rejected(*args, **kwargs):
+        raise ResponseError("Invalid stream ID specified as stream command argument")
+    monkeypatch.setattr(hub.client, "xrange", rejected)
+    assert hub.replay((1, 0)) == ([], True) # Client disuruh load ulang, bukan diam-diam kehilangan event
+    assert hub.breaker.allow()
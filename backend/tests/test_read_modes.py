@@ -0,0 +1,215 @@
+"""Jalur baca (reads.py) di dua mode harus menghasilkan response yang sama persis:
+ThreadedReads (ASYNC_MODE=0) dan AsyncReads (ASYNC_MODE=1), masing-masing dengan Redis (fakeredis)
+dan tanpa Redis (fallback DB). Feed, detail, /my-reports, /stats dan search lewat endpoint asli.
+"""
+import glob
+import importlib.util
+import os
+
+import fakeredis
+import pytest
+from alembic.migration import MigrationContext
+from alembic.operations import Operations
+from fastapi.testclient import TestClient
+from sqlalchemy import text
+
+import database
+import main
+from auth import create_access_token
+from l1_cache import RedisBreaker
+from metrics import INDEX_FALLBACK
+from models import ReportLike, ReportModel, UserModel
+from reads import AsyncReads, ThreadedReads
+from report_cache import ReportCache
+from stats import StatsCounters, aggregate_from_db, format_stats
+
+MODES = [("sync", True), ("async", True), ("sync", False), ("async", False)]
+USERS = ("1111101", "1111102")
+
+def bearer(username: str, role: str = "user") -> dict:
+    return {"Authorization": f"Bearer {create_access_token({'sub': username, 'role': role})}"}
+
+ADMIN = bearer("admin", "admin")
+
+def apply_migration(revision: str):
+    """Jalankan upgrade() satu migrasi (tabel search FTS sengaja tidak ada di models.py)."""
+    path = glob.glob(os.path.join(os.path.dirname(__file__), "..", "alembic", "versions", f"{revision}_*.py"))[0]
+    spec = importlib.util.spec_from_file_location(revision, path)
+    migration = importlib.util.module_from_spec(spec)
+    spec.loader.exec_module(migration)
+    with database.engine.begin() as conn, Operations.context(MigrationContext.configure(conn)):
+        migration.upgrade()
+
+@pytest.fixture(scope="module", autouse=True)
+def schema():
+    database.Base.metadata.create_all(database.engine)
+    apply_migration("8c3d2f1a6b7e")
+    yield
+    database.Base.metadata.drop_all(database.engine)
+
+def use_mode(monkeypatch, mode: str, with_redis: bool):
+    """Pasang jalur baca + cache seperti main.py di mode itu (Redis baru per panggilan)."""
+    server = fakeredis.FakeServer()
+    client = fakeredis.FakeRedis(server=server) if with_redis else None
+    breaker = RedisBreaker(cooldown=5)
+    reports_cache = ReportCache(client, database.SessionLocal) if client else None
+    stats_counters = StatsCounters(client, database.SessionLocal) if client else None
+    reads = ThreadedReads(client, reports_cache, stats_counters, breaker, database.SessionLocal)
+    if mode == "async":
+        async_client = fakeredis.FakeAsyncRedis(server=server) if with_redis else None
+        reads = AsyncReads(async_client, reads, database.AsyncSessionLocal)
+
+    monkeypatch.setattr(main, "cache", client)
+    monkeypatch.setattr(main, "redis_breaker", breaker)
+    monkeypatch.setattr(main, "reports_cache", reports_cache)
+    monkeypatch.setattr(main, "stats_counters", stats_counters)
+    monkeypatch.setattr(main, "reads", reads)
+    monkeypatch.setattr(main.l1_bus, "client", client)
+    monkeypatch.setattr(main.l1, "ttl", 0) # L1 mati, biar yang teruji memang reads.py
+    main.l1.clear()
+
+@pytest.fixture
+def seeded():
+    """Tabel dikosongkan (id mulai dari 1), user pemilik laporan dibuat ulang."""
+    with database.SessionLocal() as db:
+        for table in (ReportLike, ReportModel, UserModel):
+            db.query(table).delete()
+        db.execute(text("DELETE FROM sqlite_sequence")) # reports pakai AUTOINCREMENT
+        db.add_all(UserModel(username=name, password_hash="-", role="user") for name in USERS + ("admin",))
+        db.commit()
+
+@pytest.fixture(params=MODES, ids=[f"{m}-{'redis' if r else 'noredis'}" for m, r in MODES])
+def client(request, monkeypatch, seeded):
+    """25 laporan (20 milik user pertama), beberapa like, update status & hapus, semua lewat endpoint."""
+    use_mode(monkeypatch, *request.param)
+    client = TestClient(main.app)
+    for i in range(25):
+        owner = USERS[0] if i % 5 else USERS[1]
+        response = client.post("/reports", headers=bearer(owner), data={
+            "title": f"Laporan {i}", "description": f"deskripsi {i}", "facility": f"Gedung {i % 3}",
+        })
+        assert response.status_code == 200, response.text
+    for report_id, username in ((3, USERS[0]), (3, USERS[1]), (7, USERS[1]), (12, USERS[0])):
+        assert client.post(f"/reports/{report_id}/upvote", headers=bearer(username)).status_code == 200
+    for report_id, status, priority in ((4, "Selesai", "High"), (6, "Proses", "Critical")):
+        update = {"status": status, "priority": priority, "admin_note": "ok"}
+        assert client.put(f"/reports/{report_id}", headers=ADMIN, json=update).status_code == 200
+    assert client.delete("/reports/9", headers=ADMIN).status_code == 200
+    return client
+
+def all_pages(client, path: str, headers: dict = None, **params) -> list:
+    items, cursor = [], None
+    while True:
+        query = {"limit": 7, **params, **({"cursor": cursor} if cursor else {})}
+        response = client.get(path, params=query, headers=headers or {})
+        assert response.status_code == 200, response.text
+        page = response.json()
+        items += page["items"]
+        cursor = page["next_cursor"]
+        if not cursor:
+            return items
+
+def test_feed_newest(client):
+    ids = [item["id"] for item in all_pages(client, "/reports")]
+    assert ids == [i for i in range(25, 0, -1) if i != 9]
+
+def test_feed_fallback_counted(monkeypatch, seeded):
+    """Halaman yang jatuh ke DB tercatat di index_fallback_total per alasan (bukan print per request)."""
+    count = lambda reason: INDEX_FALLBACK.labels(reason)._value.get()
+    use_mode(monkeypatch, "sync", False)
+    before = count("redis_off")
+    assert TestClient(main.app).get("/reports").status_code == 200
+    assert count("redis_off") == before + 1
+
+    use_mode(monkeypatch, "sync", True)
+    monkeypatch.setattr(main.reports_cache, "ensure_index", lambda db: False) # Worker lain pegang lock rebuild
+    before = count("warming")
+    assert TestClient(main.app).get("/reports").status_code == 200
+    assert count("warming") == before + 1
+
+def test_feed_likes_order(client):
+    items = all_pages(client, "/reports", sort_by="likes")
+    assert [(item["id"], item["likes"]) for item in items[:3]] == [(3, 2), (12, 1), (7, 1)]
+    assert len(items) == 24
+
+def test_feed_liked_flags(client):
+    items = all_pages(client, "/reports", headers=bearer(USERS[1]))
+    assert {item["id"] for item in items if item["liked"]} == {3, 7}
+    assert all("liked" not in item or item["liked"] is None for item in all_pages(client, "/reports"))
+
+def test_detail(client):
+    report = client.get("/reports/4").json()
+    assert (report["status"], report["priority"], report["admin_note"]) == ("Selesai", "High", "ok")
+    assert client.get("/reports/3").json()["likes"] == 2
+    assert client.get("/reports/9").status_code == 404
+
+def test_my_reports(client):
+    items = all_pages(client, "/my-reports", headers=bearer(USERS[1]))
+    assert [item["id"] for item in items] == [21, 16, 11, 6, 1]
+    assert [item["liked"] for item in items] == [False] * 5
+    mine = [item["id"] for item in all_pages(client, "/my-reports", headers=bearer(USERS[0]))]
+    assert len(mine) == 19 and 9 not in mine and mine == sorted(mine, reverse=True)
+
+def test_stats(client):
+    stats = client.get("/stats", headers=ADMIN).json()
+    with database.SessionLocal() as db:
+        assert stats == format_stats(aggregate_from_db(db))
+    assert (stats["total"], stats["done"], stats["pending"]) == (24, 1, 22)
+    assert stats["by_status"] == {"Pending": 22, "Selesai": 1, "Proses": 1}
+
+def test_search(client):
+    """Hasil search bentuknya sama persis dengan item feed (datetime ISO, bukan string mentah SQLite)."""
+    feed = {item["id"]: item for item in all_pages(client, "/reports")}
+    found = all_pages(client, "/reports/search", q="laporan") # 24 hasil, 4 halaman -> keyset cursor kepakai
+    assert sorted(item["id"] for item in found) == sorted(feed)
+    assert all(item == feed[item["id"]] for item in found)
+    assert "T" in found[0]["created_at"]
+    assert [item["id"] for item in all_pages(client, "/reports/search", q="laporan 12")] == [13] # Judul mulai dari "Laporan 0"
+
+def test_l1_etag_matches_cached_body(monkeypatch, seeded):
+    """Invalidasi L1 dari worker lain telat datang: body lama tetap dengan ETag lamanya, bukan versi baru."""
+    use_mode(monkeypatch, "sync", True)
+    monkeypatch.setattr(main.l1, "ttl", 60)
+    client = TestClient(main.app)
+    client.post("/reports", headers=bearer(USERS[0]), data={"title": "a", "description": "d", "facility": "F"})
+    for path in ("/reports", "/reports/1"):
+        first = client.get(path)
+        main.reports_cache.bump_version()   # Write di worker lain: versi Redis naik...
+        main.l1.invalidate(["version"])     # ...versi L1 sudah kedaluwarsa, "page:*" / "report:*" belum sampai
+        stale = client.get(path)
+        assert stale.content == first.content and stale.headers["etag"] == first.headers["etag"]
+        assert client.get(path, headers={"If-None-Match": first.headers["etag"]}).status_code == 304
+
+        main.l1.invalidate(["page:*", "report:*"])
+        fresh = client.get(path)
+        assert fresh.headers["etag"] != first.headers["etag"]
+        assert client.get(path, headers={"If-None-Match": fresh.headers["etag"]}).status_code == 304
+
+def test_modes_agree(monkeypatch, seeded):
+    """Data sama, keempat mode harus mengembalikan body yang identik."""
+    use_mode(monkeypatch, "sync", False)
+    writer = TestClient(main.app)
+    for i in range(12):
+        writer.post("/reports", headers=bearer(USERS[i % 2]), data={"title": f"t{i}", "description": "d", "facility": "F"})
+    writer.post("/reports/5/upvote", headers=bearer(USERS[0]))
+    writer.put("/reports/2", headers=ADMIN, json={"status": "Ditolak", "priority": "Low", "admin_note": "x"})
+
+    def snapshot():
+        client = TestClient(main.app)
+        return {
+            "newest": all_pages(client, "/reports", headers=bearer(USERS[0])),
+            "likes": all_pages(client, "/reports", sort_by="likes"),
+            "detail": [client.get(f"/reports/{i}").json() for i in (1, 2, 5, 99)],
+            "mine": all_pages(client, "/my-reports", headers=bearer(USERS[1])),
+            "stats": client.get("/stats", headers=ADMIN).json(),
+            "search": all_pages(client, "/reports/search", q="t1"),
+        }
+
+    results = {}
+    for mode, with_redis in MODES:
+        use_mode(monkeypatch, mode, with_redis)
+        results[(mode, with_redis)] = [snapshot(), snapshot()] # Kedua: dari cache yang baru terisi
+    expected = results[("sync", False)][0]
+    for key, snapshots in results.items():
+        for snap in snapshots:
+            assert snap == expected, key
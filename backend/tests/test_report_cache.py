@@ -0,0 +1,34 @@
+"""Refresh index di background: satu jendela stale tidak boleh jadi badai thread dalam satu proses."""
+import threading
+import time
+
+import fakeredis
+
+import database
+from report_cache import ReportCache
+
+def test_one_background_refresh_per_process(monkeypatch):
+    cache = ReportCache(fakeredis.FakeRedis(), database.SessionLocal)
+    calls, release = [], threading.Event()
+
+    def slow_rebuild(db):
+        calls.append(threading.current_thread().name)
+        release.wait(5)
+        return True
+
+    monkeypatch.setattr(cache, "_rebuild_single_flight", slow_rebuild)
+    for _ in range(200):
+        assert cache.serve_index("stale")
+        assert cache.serve_index("early")
+    time.sleep(0.05)
+    assert len(calls) == 1
+    assert cache.stats.snapshot()["stale"] == 200 # Request tetap dilayani dari index lama
+
+    release.set()
+    for _ in range(100): # Refresh berikutnya boleh jalan lagi setelah yang pertama selesai
+        if not cache._refreshing.locked():
+            break
+        time.sleep(0.01)
+    cache.serve_index("stale")
+    time.sleep(0.05)
+    assert len(calls) == 2
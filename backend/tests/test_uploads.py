@@ -0,0 +1,67 @@
+"""Upload langsung ke bucket: object hasil /uploads/sign cuma bisa dipakai user yang memintanya."""
+import io
+
+import pytest
+
+import uploads
+from uploads import UploadRejected, resolve_uploaded_object, sign_upload
+
+class FakeBlob:
+    def __init__(self, bucket, name):
+        self.bucket, self.name = bucket, name
+        self.content_type = self.size = None
+        self.public_url = f"https://storage.googleapis.com/test/{name}"
+
+    def upload_from_file(self, file, content_type=None):
+        self.content_type, self.size = content_type, len(file.read())
+        self.bucket.objects[self.name] = self
+
+    def generate_signed_url(self, **kwargs):
+        return f"{self.public_url}?X-Goog-Signature=fake"
+
+    def delete(self):
+        self.bucket.objects.pop(self.name, None)
+
+class FakeBucket:
+    def __init__(self):
+        self.objects = {}
+
+    def blob(self, name):
+        return FakeBlob(self, name)
+
+    def get_blob(self, name):
+        return self.objects.get(name)
+
+@pytest.fixture
+def bucket(monkeypatch):
+    bucket = FakeBucket()
+    monkeypatch.setattr(uploads, "get_bucket", lambda: bucket)
+    monkeypatch.setattr(uploads, "_signing_kwargs", dict)
+    return bucket
+
+def upload_signed(bucket, username: str) -> str:
+    """Sign lalu isi object-nya, seperti yang dilakukan browser."""
+    object_name = sign_upload("image/png", 100, username)["object_name"]
+    bucket.blob(object_name).upload_from_file(io.BytesIO(b"x" * 100), content_type="image/png")
+    return object_name
+
+def test_owner_can_attach(bucket):
+    object_name = upload_signed(bucket, "1111101")
+    assert resolve_uploaded_object(object_name, "1111101").endswith(object_name)
+    assert "1111101" not in object_name # URL gambar publik, username tidak ikut bocor
+
+def test_other_user_cannot_attach(bucket):
+    object_name = upload_signed(bucket, "1111101")
+    with pytest.raises(UploadRejected) as rejected:
+        resolve_uploaded_object(object_name, "1111102")
+    assert rejected.value.status_code == 403
+    assert object_name in bucket.objects # Object milik orang lain tidak ikut dihapus
+
+@pytest.mark.parametrize("object_name", [
+    None, "", "../x.png", "0123456789abcdef/not-a-uuid.png",
+    "3f0c1a52-8d7e-4b1a-9c2e-5f6a7b8c9d0e.png", # Format lama tanpa owner
+])
+def test_malformed_reference(bucket, object_name):
+    with pytest.raises(UploadRejected) as rejected:
+        resolve_uploaded_object(object_name, "1111101")
+    assert rejected.value.status_code == 400
@@ -0,0 +1,157 @@
+import os
+import re
+import glob
+import hmac
+import uuid
+import hashlib
+import datetime
+import threading
+
+from auth import SECRET_KEY
+from metrics import GCS_LATENCY
+
+# --- GCS CONFIGURATION (Untuk Upload User) ---
+BUCKET_NAME = os.getenv("GCS_BUCKET_NAME", "freports-evidence-001")
+MAX_UPLOAD_BYTES = int(float(os.getenv("MAX_UPLOAD_MB", 5)) * 1024 * 1024)
+SIGNED_URL_MINUTES = int(os.getenv("SIGNED_URL_MINUTES", 15))
+
+# content-type -> ekstensi object di bucket
+ALLOWED_CONTENT_TYPES = {
+    "image/jpeg": "jpg",
+    "image/png": "png",
+    "image/webp": "webp",
+}
+
+# Nama object yang boleh dirujuk laporan: persis yang dibuat sign_upload(), <owner>/<uuid>.<ext>.
+# owner = HMAC username (bukan username mentah, URL gambar publik), jadi object hasil upload user
+# lain tidak bisa ditempel ke laporan sendiri.
+OBJECT_NAME = re.compile(
+    r"^(?P<owner>[0-9a-f]{16})/[0-9a-f]{8}-[0-9a-f]{4}-[0-9a-f]{4}-[0-9a-f]{4}-[0-9a-f]{12}\.(jpg|png|webp)$"
+)
+
+class UploadRejected(Exception):
+    """File tidak lolos batas ukuran / tipe. status_code dipakai langsung di HTTPException."""
+
+    def __init__(self, detail: str, status_code: int = 400):
+        super().__init__(detail)
+        self.detail = detail
+        self.status_code = status_code
+
+_client = None
+_client_lock = threading.Lock()
+
+def _load_local_credentials():
+    cred_files = glob.glob("cred/*.json") # Local testing only!
+    if cred_files:
+        os.environ["GOOGLE_APPLICATION_CREDENTIALS"] = cred_files[0]
+        print(f"🔑 Local Credentials Loaded: {cred_files[0]}")
+    else:
+        print("⚠️ No local credentials found. Assuming Cloud Run mode.")
+
+def get_storage_client():
+    """Satu storage.Client per proses (connection pool + token-nya dipakai ulang).
+
+    Library GCS baru di-import di sini (upload pertama), bukan saat start: import-nya ~200ms
+    dan request baca tidak butuh sama sekali.
+    """
+    global _client
+    if _client is None:
+        with _client_lock:
+            if _client is None:
+                from google.cloud import storage
+                _load_local_credentials()
+                _client = storage.Client()
+    return _client
+
+def get_bucket():
+    return get_storage_client().bucket(BUCKET_NAME)
+
+def owner_tag(username: str) -> str:
+    return hmac.new(SECRET_KEY.encode(), f"upload:{username}".encode(), hashlib.sha256).hexdigest()[:16]
+
+def check_limits(content_type: str, size: int) -> str:
+    """Validasi tipe + ukuran, balikin ekstensi object."""
+    extension = ALLOWED_CONTENT_TYPES.get(content_type)
+    if extension is None:
+        raise UploadRejected(f"Tipe file tidak didukung: {content_type}", 415)
+    if size is None or size <= 0:
+        raise UploadRejected("Ukuran file tidak valid")
+    if size > MAX_UPLOAD_BYTES:
+        raise UploadRejected(f"File terlalu besar (maks {MAX_UPLOAD_BYTES // (1024 * 1024)}MB)", 413)
+    return extension
+
+def _signing_kwargs() -> dict:
+    """Di Cloud Run tidak ada private key: tanda tangan lewat IAM signBlob pakai access token.
+
+    Service account-nya butuh role Service Account Token Creator atas dirinya sendiri.
+    """
+    from google.oauth2 import service_account
+    from google.auth.transport.requests import Request as AuthRequest
+
+    credentials = get_storage_client()._credentials
+    if isinstance(credentials, service_account.Credentials):
+        return {} # Key file lokal, bisa sign sendiri
+    if not credentials.valid:
+        credentials.refresh(AuthRequest())
+    return {
+        "service_account_email": credentials.service_account_email,
+        "access_token": credentials.token,
+    }
+
+def sign_upload(content_type: str, size: int, username: str) -> dict:
+    """Bikin V4 signed URL untuk memulai resumable upload langsung dari browser.
+
+    Header di "headers" ikut ditandatangani, jadi browser wajib mengirim persis sama:
+    tipe file dan rentang ukuran dikunci di sisi GCS, bukan di API.
+    """
+    extension = check_limits(content_type, size)
+    object_name = f"{owner_tag(username)}/{uuid.uuid4()}.{extension}"
+    headers = {
+        "Content-Type": content_type,
+        "x-goog-resumable": "start",
+        "x-goog-content-length-range": f"0,{MAX_UPLOAD_BYTES}",
+    }
+    with GCS_LATENCY.labels("sign").time():
+        url = get_bucket().blob(object_name).generate_signed_url(
+            version="v4",
+            expiration=datetime.timedelta(minutes=SIGNED_URL_MINUTES),
+            method="POST",
+            content_type=content_type,
+            headers=headers,
+            **_signing_kwargs(),
+        )
+    return {"object_name": object_name, "upload_url": url, "headers": headers}
+
+def resolve_uploaded_object(object_name: str, username: str) -> str:
+    """Cek object hasil upload langsung milik user ini (cuma metadata, tidak download). Balikin public URL."""
+    match = OBJECT_NAME.match(object_name or "")
+    if match is None:
+        raise UploadRejected("Referensi gambar tidak valid")
+    if not hmac.compare_digest(match["owner"], owner_tag(username)):
+        raise UploadRejected("Gambar ini bukan hasil upload kamu", 403)
+    with GCS_LATENCY.labels("stat").time():
+        blob = get_bucket().get_blob(object_name)
+    if blob is None:
+        raise UploadRejected("Gambar belum ter-upload")
+    try:
+        check_limits(blob.content_type, blob.size)
+    except UploadRejected:
+        blob.delete() # Lolos dari signed header (mis. diubah manual), buang saja
+        raise
+    return blob.public_url
+
+def upload_to_gcs(file) -> str:
+    """Jalur lama (multipart lewat API). Batas dicek dari header dulu sebelum stream ke GCS."""
+    size = file.size
+    if size is None: # Starlette lama tidak mengisi .size, ukur dari spool-nya
+        size = file.file.seek(0, os.SEEK_END)
+        file.file.seek(0)
+    extension = check_limits(file.content_type, size)
+    try:
+        blob = get_bucket().blob(f"{uuid.uuid4()}.{extension}")
+        with GCS_LATENCY.labels("upload").time():
+            blob.upload_from_file(file.file, content_type=file.content_type, size=size)
+        return blob.public_url
+    except Exception as e:
+        print(f"❌ GCS Upload Error: {e}")
+        return None
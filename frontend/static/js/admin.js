@@ -10,72 +10,187 @@ if (!authToken || authRole !== "admin") {
 
 // === INIT ===
 document.addEventListener('DOMContentLoaded', () => {
+    loadStats();
     loadAdminData();
     setupModalListeners();
+    startAdminLiveUpdates();
 });
 
+// === 0. DASHBOARD STATS ===
+async function loadStats() {
+    try {
+        const res = await cachedFetch(`${CONFIG.API_URL}/stats`, {
+            headers: { 'Authorization': `Bearer ${authToken}` }
+        });
+        if (!res.ok) return;
+        const stats = await res.json();
+
+        document.getElementById('stat-total').innerText = stats.total;
+        document.getElementById('stat-pending').innerText = stats.pending;
+        document.getElementById('stat-proses').innerText = stats.by_status.Proses || 0;
+        document.getElementById('stat-done').innerText = stats.done;
+
+        const badges = (group) => Object.entries(group)
+            .map(([name, n]) => `<span class="badge bg-light text-secondary border me-1">${name}: ${n}</span>`)
+            .join('');
+        document.getElementById('stat-breakdown').innerHTML =
+            `<i class="fas fa-map-marker-alt me-1"></i>${badges(stats.by_facility)}` +
+            `<span class="ms-3"><i class="fas fa-bolt me-1"></i>${badges(stats.by_priority)}</span>`;
+    } catch (error) {
+        console.error(error);
+    }
+}
+
 // === 1. LOAD DATA ===
-async function loadAdminData(sortBy = 'newest') {
+let adminSortBy = 'newest';
+let adminNextCursor = null;
+
+async function fetchAdminPage(cursor) {
+    const params = new URLSearchParams({ sort_by: adminSortBy, limit: 50 });
+    if (cursor) params.set('cursor', cursor);
+
+    const res = await cachedFetch(`${CONFIG.API_URL}/reports?${params}`, {
+        headers: { 'Authorization': `Bearer ${authToken}` }
+    });
+    if (res.status === 401) {
+        forceLogout("Sesi tidak valid di server. Silakan login ulang.");
+        return null;
+    }
+    return res.json();
+}
+
+async function loadAdminData(sortBy = adminSortBy) {
     const tbody = document.getElementById('tableBody');
+    adminSortBy = sortBy;
+    adminNextCursor = null;
 
     try {
-        const res = await fetch(`${CONFIG.API_URL}/reports?sort_by=${sortBy}`, {
-            headers: { 'Authorization': `Bearer ${authToken}` }
-        });
-        if (res.status === 401) {
-            forceLogout("Sesi tidak valid di server. Silakan login ulang.");
-            return;
-        }
-        const data = await res.json();
+        const data = await fetchAdminPage(null);
+        if (!data) return;
 
-        if (data.length === 0) {
-            tbody.innerHTML = `<tr><td colspan="7" class="text-center py-5 text-muted">Hening. Tidak ada laporan, seperti kuburan.</td></tr>`;
+        if (data.items.length === 0) {
+            tbody.innerHTML = `<tr><td colspan="8" class="text-center py-5 text-muted">Hening. Tidak ada laporan, seperti kuburan.</td></tr>`;
+            updateLoadMoreButton();
             return;
         }
 
-        tbody.innerHTML = data.map(r => {
-            // Helper untuk urusan visual dan keamanan string
-            const thumbUrl = typeof getThumbnailURL === 'function' ? getThumbnailURL(r.image_url) : r.image_url;
-            const safeTitle = r.title.replace(/'/g, "\\'");
-
-            return `
-            <tr>
-                <td class="px-4 fw-bold text-secondary">#${r.id}</td>
-                <td>
-                    <div class="fw-bold text-dark text-truncate" style="max-width: 200px;">${r.title}</div>
-                    <small class="text-muted"><i class="fas fa-map-marker-alt me-1"></i>${r.facility}</small>
-                    <div class="small text-primary fst-italic mt-1">${r.admin_note || '-'}</div>
-                </td>
-                <td class="text-center">
-                    ${r.image_url ? `
-                        <img src="${thumbUrl}" 
-                             class="rounded border shadow-sm"
-                             style="width: 50px; height: 50px; object-fit: cover; cursor: pointer;"
-                             onclick="showImagePreview('${r.image_url}', '${safeTitle}')"
-                             onerror="this.onerror=null; this.src='${r.image_url}'">
-                    ` : '<span class="text-muted small">-</span>'}
-                </td>
-                <td>${getPriorityBadge(r.priority)}</td>
-                <td>${getStatusBadge(r.status)}</td>
-                <td><i class="fas fa-thumbs-up text-primary"></i> ${r.likes || 0}</td>
-                <td class="text-end px-4">
-                    <button class="btn btn-sm btn-light border me-1" onclick="openEditModal(${r.id}, '${r.status}', '${r.priority}', '${r.admin_note || ''}')">
-                        <i class="fas fa-edit text-primary"></i>
-                    </button>
-                    <button class="btn btn-sm btn-light border" onclick="deleteReport(${r.id})">
-                        <i class="fas fa-trash text-danger"></i>
-                    </button>
-                </td>
-            </tr>
-            `;
-        }).join("");
+        tbody.innerHTML = renderAdminRows(data.items);
+        adminNextCursor = data.next_cursor;
+        updateLoadMoreButton();
 
     } catch (error) {
         console.error(error);
-        tbody.innerHTML = `<tr><td colspan="7" class="text-center text-danger">Gagal memuat data. Sistem pun lelah.</td></tr>`;
+        tbody.innerHTML = `<tr><td colspan="8" class="text-center text-danger">Gagal memuat data. Sistem pun lelah.</td></tr>`;
     }
 }
 
+async function loadMoreAdminData() {
+    if (!adminNextCursor) return;
+    try {
+        const data = await fetchAdminPage(adminNextCursor);
+        if (!data) return;
+
+        document.getElementById('tableBody').insertAdjacentHTML('beforeend', renderAdminRows(data.items));
+        adminNextCursor = data.next_cursor;
+        updateLoadMoreButton();
+    } catch (error) {
+        console.error(error);
+        alert("Gagal memuat halaman berikutnya.");
+    }
+}
+
+function updateLoadMoreButton() {
+    const btn = document.getElementById('btn-load-more');
+    if (btn) btn.classList.toggle('d-none', !adminNextCursor);
+}
+
+function renderAdminRows(data) {
+    return data.map(r => {
+        // Helper untuk urusan visual dan keamanan string
+        const thumbUrl = typeof getThumbnailURL === 'function' ? getThumbnailURL(r.image_url, r.image_variants) : r.image_url;
+        const safeTitle = r.title.replace(/'/g, "\\'");
+
+        return `
+        <tr id="admin-row-${r.id}">
+            <td class="ps-4">
+                <input type="checkbox" class="form-check-input row-select" value="${r.id}"
+                       ${selectedIds.has(r.id) ? 'checked' : ''} onchange="toggleSelect(${r.id}, this.checked)">
+            </td>
+            <td class="fw-bold text-secondary">#${r.id}</td>
+            <td>
+                <div class="fw-bold text-dark text-truncate" style="max-width: 200px;">${r.title}</div>
+                <small class="text-muted"><i class="fas fa-map-marker-alt me-1"></i>${r.facility}</small>
+            </td>
+            <td class="text-center">
+                ${r.image_url ? `
+                    <img src="${thumbUrl}" 
+                         class="rounded border shadow-sm"
+                         style="width: 50px; height: 50px; object-fit: cover; cursor: pointer;"
+                         onclick="showImagePreview('${r.image_url}', '${safeTitle}')"
+                         onerror="this.onerror=null; this.src='${r.image_url}'">
+                ` : '<span class="text-muted small">-</span>'}
+            </td>
+            <td id="admin-priority-${r.id}">${getPriorityBadge(r.priority)}</td>
+            <td id="admin-status-${r.id}">${getStatusBadge(r.status)}</td>
+            <td><i class="fas fa-thumbs-up text-primary"></i> <span id="admin-likes-${r.id}">${r.likes || 0}</span></td>
+            <td class="text-end px-4">
+                <button class="btn btn-sm btn-light border me-1" onclick="openEditModal(${r.id}, '${r.status}', '${r.priority}')">
+                    <i class="fas fa-edit text-primary"></i>
+                </button>
+                <button class="btn btn-sm btn-light border" onclick="deleteReport(${r.id})">
+                    <i class="fas fa-trash text-danger"></i>
+                </button>
+            </td>
+        </tr>
+        `;
+    }).join("");
+}
+
+// === 1b. LIVE UPDATE ===
+// Perubahan dari admin / user lain ditempel ke baris yang tampil; kartu statistik di-refresh
+// paling sering sekali per 2 detik biar burst event tidak jadi burst request.
+let statsRefreshTimer = null;
+
+function scheduleStatsRefresh() {
+    if (statsRefreshTimer) return;
+    statsRefreshTimer = setTimeout(() => {
+        statsRefreshTimer = null;
+        loadStats();
+    }, 2000);
+}
+
+function startAdminLiveUpdates() {
+    openReportStream({
+        created: () => scheduleStatsRefresh(),
+        likes: ({ id, likes }) => {
+            const cell = document.getElementById(`admin-likes-${id}`);
+            if (cell) cell.innerText = likes;
+        },
+        updated: ({ reports }) => {
+            reports.forEach(r => {
+                const status = document.getElementById(`admin-status-${r.id}`);
+                const priority = document.getElementById(`admin-priority-${r.id}`);
+                if (status) status.innerHTML = getStatusBadge(r.status);
+                if (priority) priority.innerHTML = getPriorityBadge(r.priority);
+            });
+            scheduleStatsRefresh();
+        },
+        deleted: ({ ids }) => {
+            ids.forEach(id => {
+                const row = document.getElementById(`admin-row-${id}`);
+                if (row) row.remove();
+                selectedIds.delete(id);
+            });
+            updateBulkBar();
+            scheduleStatsRefresh();
+        },
+        reset: () => {
+            loadAdminData();
+            loadStats();
+        },
+    });
+}
+
 // === 2. HELPER BADGES ===
 function getStatusBadge(status) {
     const s = status || 'Pending';
@@ -99,16 +214,27 @@ function getPriorityBadge(prio) {
 let editModalInstance = null;
 let imageModalInstance = null;
 
-function openEditModal(id, status, priority, note) {
+async function openEditModal(id, status, priority) {
     document.getElementById('edit-id').value = id;
     document.getElementById('edit-status').value = status;
     document.getElementById('edit-priority').value = priority || 'Medium';
-    document.getElementById('edit-note').value = note;
+    document.getElementById('edit-note').value = '';
     document.getElementById('modal-id').innerText = id;
 
     const modalEl = document.getElementById('editModal');
     editModalInstance = new bootstrap.Modal(modalEl);
     editModalInstance.show();
+
+    // List cuma bawa kolom ringkas, catatan admin diambil dari endpoint detail
+    try {
+        const res = await cachedFetch(`${CONFIG.API_URL}/reports/${id}`);
+        if (res.ok) {
+            const detail = await res.json();
+            document.getElementById('edit-note').value = detail.admin_note || '';
+        }
+    } catch (error) {
+        console.error(error);
+    }
 }
 
 function showImagePreview(url, title) {
@@ -151,6 +277,7 @@ function setupModalListeners() {
                     alert("Data diperbarui. Seolah itu mengubah segalanya.");
                     editModalInstance.hide();
                     loadAdminData();
+                    loadStats();
                 } else {
                     const err = await res.json();
                     alert("Gagal: " + (err.detail || 'Kesalahan sistem'));
@@ -171,7 +298,102 @@ async function deleteReport(id) {
             method: 'DELETE',
             headers: { 'Authorization': `Bearer ${authToken}` }
         });
-        if (res.ok) loadAdminData();
+        if (res.ok) {
+            loadAdminData();
+            loadStats();
+        }
+    } catch (e) { alert("Error koneksi"); }
+}
+
+// === 5. AKSI MASSAL (multi-select) ===
+// Satu request PATCH / DELETE /reports/bulk untuk semua yang dicentang.
+const selectedIds = new Set();
+
+function toggleSelect(id, checked) {
+    if (checked) selectedIds.add(id);
+    else selectedIds.delete(id);
+    updateBulkBar();
+}
+
+function toggleSelectAll(checked) {
+    document.querySelectorAll('.row-select').forEach(box => {
+        box.checked = checked;
+        toggleSelect(parseInt(box.value), checked);
+    });
+}
+
+function clearSelection() {
+    selectedIds.clear();
+    document.querySelectorAll('.row-select').forEach(box => box.checked = false);
+    document.getElementById('select-all').checked = false;
+    updateBulkBar();
+}
+
+function updateBulkBar() {
+    document.getElementById('bulk-count').innerText = selectedIds.size;
+    document.getElementById('bulk-bar').classList.toggle('d-none', selectedIds.size === 0);
+}
+
+async function sendBulk(method, payload) {
+    const res = await fetch(`${CONFIG.API_URL}/reports/bulk`, {
+        method: method,
+        headers: {
+            'Content-Type': 'application/json',
+            'Authorization': `Bearer ${authToken}`
+        },
+        body: JSON.stringify({ ids: [...selectedIds], ...payload })
+    });
+    const data = await res.json();
+    if (!res.ok) {
+        alert("Gagal: " + (typeof data.detail === 'string' ? data.detail : 'Kesalahan sistem'));
+        return;
+    }
+    alert(data.message + (data.missing.length ? ` (${data.missing.length} sudah tidak ada)` : ''));
+    clearSelection();
+    loadAdminData();
+    loadStats();
+}
+
+async function applyBulkUpdate() {
+    const payload = {};
+    const status = document.getElementById('bulk-status').value;
+    const priority = document.getElementById('bulk-priority').value;
+    const note = document.getElementById('bulk-note').value;
+    if (status) payload.status = status;
+    if (priority) payload.priority = priority;
+    if (note) payload.admin_note = note;
+    if (Object.keys(payload).length === 0) {
+        alert("Pilih status, prioritas, atau isi catatan dulu.");
+        return;
+    }
+    try {
+        await sendBulk('PATCH', payload);
+    } catch (e) { alert("Error koneksi"); }
+}
+
+async function bulkDelete() {
+    if (!confirm(`⚠️ Hapus permanen ${selectedIds.size} laporan sekaligus?`)) return;
+    try {
+        await sendBulk('DELETE', {});
+    } catch (e) { alert("Error koneksi"); }
+}
+
+// === 6. EXPORT (CSV, di-stream server) ===
+async function exportReports() {
+    try {
+        const res = await fetch(`${CONFIG.API_URL}/reports/export?format=csv`, {
+            headers: { 'Authorization': `Bearer ${authToken}` }
+        });
+        if (!res.ok) {
+            alert(res.status === 503 ? "Export lain sedang berjalan, coba lagi sebentar." : "Gagal export");
+            return;
+        }
+        const name = (res.headers.get('Content-Disposition') || '').match(/filename="?([^"]+)"?/);
+        const link = document.createElement('a');
+        link.href = URL.createObjectURL(await res.blob());
+        link.download = name ? name[1] : 'laporan.csv';
+        link.click();
+        URL.revokeObjectURL(link.href);
     } catch (e) { alert("Error koneksi"); }
 }
 
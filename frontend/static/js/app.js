@@ -2,6 +2,10 @@
 const token = localStorage.getItem('token');
 const username = localStorage.getItem('username');
 let currentTab = 'all';
+let nextCursor = null;   // Cursor halaman berikutnya dari backend
+let isLoadingMore = false;
+let reportStream = null; // Koneksi SSE, null = tidak didukung / tidak dipakai di halaman ini
+const PAGE_SIZE = 20;
 const EXPIRE_MINUTES = 30;
 
 function isTokenValid() {
@@ -59,6 +63,8 @@ document.addEventListener('DOMContentLoaded', () => {
     initNavbar();
     loadReports();
     setupEventListeners();
+    setupInfiniteScroll();
+    startLiveUpdates();
 });
 
 // === 1. UI HANDLERS ===
@@ -102,30 +108,43 @@ function getBadge(status) {
 }
 
 // === 2. DATA FETCHING ===
+function buildFeedRequest(cursor) {
+    let endpoint = '/reports';
+    let headers = {};
+
+    // Token ikut dikirim biar tiap laporan bawa flag "liked" dari server
+    if (token && isTokenValid()) headers = { 'Authorization': `Bearer ${token}` };
+    if (currentTab === 'mine') {
+        endpoint = '/my-reports';
+        headers = { 'Authorization': `Bearer ${token}` };
+    }
+
+    const params = new URLSearchParams({ limit: PAGE_SIZE });
+    if (cursor) params.set('cursor', cursor);
+    return { url: `${CONFIG.API_URL}${endpoint}?${params}`, headers: headers };
+}
+
 async function loadReports() {
     const container = document.getElementById("reports");
     container.innerHTML = `<div class="col-12 text-center mt-5"><div class="spinner-border text-primary"></div><p class="mt-2 text-muted">Mengambil data terbaru...</p></div>`;
+    nextCursor = null;
 
     try {
-        let endpoint = '/reports';
-        let headers = {};
-
-        if (currentTab === 'mine') {
-            if (!token) { alert("Sesi habis, login ulang yuk!"); logout(); return; }
-            endpoint = '/my-reports';
-            headers = { 'Authorization': `Bearer ${token}` };
-        }
+        if (currentTab === 'mine' && !token) { alert("Sesi habis, login ulang yuk!"); logout(); return; }
 
-        const res = await fetch(`${CONFIG.API_URL}${endpoint}`, { headers: headers });
+        const req = buildFeedRequest(null);
+        const res = await cachedFetch(req.url, { headers: req.headers });
         const data = await res.json();
 
         if (!res.ok) throw new Error("Gagal load data");
-        if (data.length === 0) {
+        if (data.items.length === 0) {
             container.innerHTML = `<div class="col-12 text-center text-muted py-5"><i class="fas fa-box-open fa-3x mb-3"></i><p>Belum ada laporan.</p></div>`;
             return;
         }
 
-        renderReports(data, container);
+        container.innerHTML = '';
+        renderReports(data.items, container);
+        nextCursor = data.next_cursor;
 
     } catch (error) {
         console.error(error);
@@ -133,9 +152,40 @@ async function loadReports() {
     }
 }
 
-function renderReports(data, container) {
-    container.innerHTML = data.map(r => {
-        const isLiked = localStorage.getItem(`liked_${r.id}`);
+// Ambil halaman berikutnya pakai cursor (dipanggil waktu user scroll ke bawah)
+async function loadMoreReports() {
+    if (!nextCursor || isLoadingMore) return;
+    isLoadingMore = true;
+
+    try {
+        const req = buildFeedRequest(nextCursor);
+        const res = await cachedFetch(req.url, { headers: req.headers });
+        if (!res.ok) throw new Error("Gagal load halaman berikutnya");
+
+        const data = await res.json();
+        renderReports(data.items, document.getElementById("reports"));
+        nextCursor = data.next_cursor;
+    } catch (error) {
+        console.error(error);
+    } finally {
+        isLoadingMore = false;
+    }
+}
+
+function setupInfiniteScroll() {
+    const sentinel = document.getElementById('feed-sentinel');
+    if (!sentinel) return;
+
+    const observer = new IntersectionObserver((entries) => {
+        if (entries[0].isIntersecting) loadMoreReports();
+    }, { rootMargin: '400px' });
+    observer.observe(sentinel);
+}
+
+function renderReports(data, container, position = 'beforeend') {
+    container.insertAdjacentHTML(position, data.map(r => {
+        // Flag dari server kalau login, localStorage cuma cadangan (tamu / data lama)
+        const isLiked = r.liked ?? localStorage.getItem(`liked_${r.id}`);
         const btnClass = isLiked ? 'btn-primary text-white' : 'btn-light text-primary';
         const disabledAttr = isLiked ? 'disabled' : '';
 
@@ -143,14 +193,16 @@ function renderReports(data, container) {
         let imageHTML = '';
         if (r.image_url) {
             // Panggil fungsi dari config.js
-            const thumbUrl = getThumbnailURL(r.image_url);
+            const thumbUrl = getThumbnailURL(r.image_url, r.image_variants);
             imageHTML = `
                 <div class="ratio ratio-16x9 mb-3 rounded overflow-hidden bg-light">
                     <img src="${thumbUrl}" 
+                         srcset="${getSrcset(r.image_variants)}"
+                         sizes="(max-width: 768px) 100vw, 33vw"
                          class="object-fit-cover" 
                          alt="Bukti Laporan"
                          loading="lazy"
-                         onerror="this.onerror=null; this.src='${r.image_url}'"> 
+                         onerror="this.onerror=null; this.removeAttribute('srcset'); this.src='${r.image_url}'"> 
                 </div>
             `;
             // Penjelasan 'onerror': Kalau thumbnail belum jadi (masih diproses cloud function),
@@ -158,11 +210,11 @@ function renderReports(data, container) {
         }
 
         return `
-        <div class="col-md-6 col-lg-4">
+        <div class="col-md-6 col-lg-4" id="report-${r.id}">
             <div class="card h-100 shadow-sm p-3 position-relative border-0">
                 <div class="d-flex justify-content-between mb-2">
                     <span class="badge bg-light text-secondary border"><i class="fas fa-map-marker-alt me-1"></i>${r.facility}</span>
-                    <span class="badge ${getBadge(r.status)} rounded-pill">${r.status}</span>
+                    <span id="status-${r.id}" class="badge ${getBadge(r.status)} rounded-pill">${r.status}</span>
                 </div>
                 
                 ${imageHTML}
@@ -172,8 +224,6 @@ function renderReports(data, container) {
                     <i class="fas fa-user-circle me-1"></i>${r.username || 'Anonim'} &bull; 
                     <span class="ms-1">${new Date(r.created_at).toLocaleDateString('id-ID')}</span>
                 </small>
-
-                <p class="text-secondary small text-truncate-2">${r.description}</p>
                 
                 <div class="mt-auto pt-3 border-top d-flex justify-content-between align-items-center">
                     <button id="btn-like-${r.id}" onclick="upvote(${r.id})" class="btn btn-sm ${btnClass} border" ${disabledAttr}>
@@ -184,7 +234,37 @@ function renderReports(data, container) {
             </div>
         </div>
         `;
-    }).join("");
+    }).join(""));
+}
+
+// === 2b. LIVE UPDATE ===
+// Delta dari server ditempel langsung ke kartu yang sudah tampil, tanpa fetch ulang list.
+function startLiveUpdates() {
+    if (!document.getElementById('reports')) return;
+    reportStream = openReportStream({
+        created: ({ report }) => {
+            if (currentTab === 'mine' && report.username !== username) return;
+            if (document.getElementById(`report-${report.id}`)) return;
+            const container = document.getElementById('reports');
+            if (!container.querySelector('[id^="report-"]')) container.innerHTML = ''; // Buang "Belum ada laporan"
+            renderReports([report], container, 'afterbegin');
+        },
+        likes: ({ id, likes }) => {
+            const likeCount = document.getElementById(`likes-${id}`);
+            if (likeCount) likeCount.innerText = likes;
+        },
+        updated: ({ reports }) => reports.forEach(r => {
+            const badge = document.getElementById(`status-${r.id}`);
+            if (!badge) return;
+            badge.className = `badge ${getBadge(r.status)} rounded-pill`;
+            badge.innerText = r.status;
+        }),
+        deleted: ({ ids }) => ids.forEach(id => {
+            const card = document.getElementById(`report-${id}`);
+            if (card) card.remove();
+        }),
+        reset: () => loadReports(), // Terlalu lama putus, riwayat di server sudah terpotong
+    });
 }
 
 // === 3. ACTIONS (UPVOTE & SUBMIT) ===
@@ -201,14 +281,14 @@ async function upvote(id) {
         return;
     }
 
-    // 3. Cek apakah sudah like
-    if (localStorage.getItem(`liked_${id}`)) return;
-
-    // Optimistic UI Update
+    // 3. Cek apakah sudah like (tombol dari flag server, localStorage kalau kartunya belum tampil)
     const likeCount = document.getElementById(`likes-${id}`);
     const btn = document.getElementById(`btn-like-${id}`);
-    likeCount.innerText = parseInt(likeCount.innerText) + 1;
-    btn.className = 'btn btn-sm btn-primary text-white border disabled';
+    if (btn ? btn.disabled : localStorage.getItem(`liked_${id}`)) return;
+
+    // Optimistic UI Update (kartunya bisa belum tampil, mis. upvote dari saran duplikat)
+    if (likeCount) likeCount.innerText = parseInt(likeCount.innerText) + 1;
+    if (btn) { btn.className = 'btn btn-sm btn-primary text-white border disabled'; btn.disabled = true; }
     localStorage.setItem(`liked_${id}`, "sudah");
 
     try {
@@ -221,6 +301,44 @@ async function upvote(id) {
     }
 }
 
+// Upload gambar langsung ke GCS: minta signed URL, mulai sesi resumable, lalu PUT file-nya.
+// Balikin nama object buat dikirim ke /reports, atau null kalau gagal (fallback multipart).
+async function uploadDirect(file) {
+    try {
+        const signRes = await fetch(`${CONFIG.API_URL}/uploads/sign`, {
+            method: 'POST',
+            headers: { 'Authorization': `Bearer ${token}`, 'Content-Type': 'application/json' },
+            body: JSON.stringify({ content_type: file.type, size: file.size })
+        });
+        if (!signRes.ok) {
+            const err = await signRes.json();
+            // 413 / 415 = file memang ditolak, jangan dicoba lagi lewat multipart
+            if (signRes.status === 413 || signRes.status === 415) {
+                const rejected = new Error(err.detail);
+                rejected.rejected = true;
+                throw rejected;
+            }
+            return null;
+        }
+        const signed = await signRes.json();
+
+        const startRes = await fetch(signed.upload_url, { method: 'POST', headers: signed.headers });
+        const sessionUrl = startRes.headers.get('Location');
+        if (!startRes.ok || !sessionUrl) return null;
+
+        const putRes = await fetch(sessionUrl, {
+            method: 'PUT',
+            headers: { 'Content-Type': file.type },
+            body: file
+        });
+        return putRes.ok ? signed.object_name : null;
+    } catch (e) {
+        if (e.rejected) throw e;
+        console.warn("Upload langsung gagal, pakai jalur lama", e);
+        return null;
+    }
+}
+
 function setupEventListeners() {
     // Buka Modal
 window.checkAuthAndOpenModal = () => {
@@ -272,33 +390,62 @@ window.checkAuthAndOpenModal = () => {
         formData.append('facility', document.getElementById('inputFacility').value);
         formData.append('description', document.getElementById('inputDesc').value);
 
-        // Ambil file (Kalau user gak pilih file, backend tetep terima FormData kok)
-        const fileInput = document.getElementById('inputImage');
-        if (fileInput && fileInput.files[0]) {
-            formData.append('file', fileInput.files[0]);
-        }
-
         try {
+            // Ambil file (Kalau user gak pilih file, backend tetep terima FormData kok)
+            // Coba upload langsung ke bucket dulu, multipart cuma cadangan.
+            const fileInput = document.getElementById('inputImage');
+            if (fileInput && fileInput.files[0]) {
+                const objectName = await uploadDirect(fileInput.files[0]);
+                if (objectName) formData.append('image_object', objectName);
+                else formData.append('file', fileInput.files[0]);
+            }
+
             // Fetch tanpa Content-Type header manual!
             // Browser otomatis set 'multipart/form-data; boundary=...'
-            const res = await fetch(`${CONFIG.API_URL}/reports`, {
+            let res = await fetch(`${CONFIG.API_URL}/reports`, {
                 method: 'POST',
                 headers: { 'Authorization': `Bearer ${token}` },
                 body: formData
             });
 
+            // 409 = mirip laporan yang masih terbuka. Tawarkan dukung laporan itu saja.
+            if (res.status === 409) {
+                const { detail } = await res.json();
+                const top = detail.duplicates[0];
+                const list = detail.duplicates
+                    .map(d => `• #${d.id} ${d.title} (${d.facility}) - ${d.status}, ${d.likes} 👍`)
+                    .join("\n");
+                const support = confirm(
+                    `${detail.message}:\n\n${list}\n\n` +
+                    `OK = dukung laporan #${top.id} saja (upvote)\nBatal = tetap kirim laporan baru`
+                );
+                if (support) {
+                    bootstrap.Modal.getInstance(document.getElementById('addReportModal')).hide();
+                    document.getElementById('reportForm').reset();
+                    await upvote(top.id);
+                    if (!reportStream) loadReports();
+                    return;
+                }
+                formData.append('force', 'true');
+                res = await fetch(`${CONFIG.API_URL}/reports`, {
+                    method: 'POST',
+                    headers: { 'Authorization': `Bearer ${token}` },
+                    body: formData
+                });
+            }
+
             if (res.ok) {
                 alert("Laporan berhasil dikirim!");
                 bootstrap.Modal.getInstance(document.getElementById('addReportModal')).hide();
                 document.getElementById('reportForm').reset();
-                loadReports(); // Refresh Feed
+                if (!reportStream) loadReports(); // Dengan SSE kartunya masuk lewat event "created"
             } else {
                 const err = await res.json();
                 alert("Gagal: " + (err.detail || "Terjadi kesalahan"));
             }
         } catch (error) {
             console.error(error);
-            alert("Error koneksi!");
+            alert(error.rejected ? "Gagal: " + error.message : "Error koneksi!");
         } finally {
             submitBtn.disabled = false;
             submitBtn.innerText = 'Kirim Laporan';
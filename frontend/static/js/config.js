@@ -6,10 +6,64 @@ const CONFIG = {
 };
 
 // --- LOGIKA THUMBNAIL GLOBAL ---
-function getThumbnailURL(originalUrl) {
+// variants = r.image_variants dari API ({"webp": {"300": url, ...}, "jpeg": {...}})
+function getThumbnailURL(originalUrl, variants, width = 300) {
     if (!originalUrl) return 'https://placehold.co/600x400?text=No+Image';
 
+    const sized = variants && (variants.webp || variants.jpeg);
+    if (sized && sized[width]) return sized[width];
+
+    // Laporan lama (sebelum ada varian): thumbnail tunggal hasil function versi lama
     // Logika: Ganti ekstensi file asli menjadi '_thumb.jpg'
     // Regex ini membuang ekstensi lama (.png, .jpeg, dll) dan menggantinya
     return originalUrl.replace(/\.[^/.]+$/, "") + "_thumb.jpg";
-}
\ No newline at end of file
+}
+
+// srcset dari semua lebar varian, biar browser pilih sendiri sesuai layar
+function getSrcset(variants) {
+    const sized = variants && (variants.webp || variants.jpeg);
+    if (!sized) return '';
+    return Object.entries(sized).map(([width, url]) => `${url} ${width}w`).join(', ');
+}
+
+// --- FETCH DENGAN VALIDATOR (ETag) ---
+// Simpan body + ETag terakhir per URL di sessionStorage. Request berikutnya kirim
+// If-None-Match, kalau server jawab 304 body lama dipakai lagi tanpa download ulang.
+async function cachedFetch(url, options = {}) {
+    const owner = localStorage.getItem('username') || 'guest';
+    const storeKey = `etag:${owner}:${url}`;
+    const headers = { ...(options.headers || {}) };
+
+    let stored = null;
+    try { stored = JSON.parse(sessionStorage.getItem(storeKey)); } catch (e) { stored = null; }
+    if (stored) headers['If-None-Match'] = stored.etag;
+
+    const res = await fetch(url, { ...options, headers: headers, cache: 'no-store' });
+
+    if (res.status === 304 && stored) {
+        return new Response(stored.body, { status: 200, headers: { 'Content-Type': 'application/json' } });
+    }
+
+    const etag = res.headers.get('ETag');
+    if (res.ok && etag) {
+        const body = await res.clone().text();
+        try {
+            sessionStorage.setItem(storeKey, JSON.stringify({ etag: etag, body: body }));
+        } catch (e) {
+            sessionStorage.clear(); // Quota penuh, mulai dari nol
+        }
+    }
+    return res;
+}
+
+// --- LIVE UPDATE (SSE) ---
+// handlers = { created: fn, updated: fn, likes: fn, deleted: fn, reset: fn }, tiap fn terima data JSON.
+// EventSource reconnect sendiri dan kirim Last-Event-ID, server me-replay event yang terlewat.
+function openReportStream(handlers) {
+    if (!window.EventSource) return null;
+    const source = new EventSource(`${CONFIG.API_URL}/reports/stream`);
+    Object.entries(handlers).forEach(([type, handler]) => {
+        source.addEventListener(type, (e) => handler(JSON.parse(e.data || '{}')));
+    });
+    return source;
+}
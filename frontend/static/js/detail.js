@@ -12,7 +12,7 @@ document.addEventListener('DOMContentLoaded', async () => {
 
     // 2. Fetch Data
     try {
-        const res = await fetch(`${CONFIG.API_URL}/reports/${id}`);
+        const res = await cachedFetch(`${CONFIG.API_URL}/reports/${id}`);
         if (!res.ok) throw new Error("Gagal mengambil data");
         
         const data = await res.json();
@@ -42,7 +42,10 @@ function renderDetail(data) {
     // Image Handling
     if (data.image_url) {
         const imgContainer = document.getElementById('image-container');
-        document.getElementById('d-image').src = data.image_url;
+        const img = document.getElementById('d-image');
+        // Varian 1600px cukup buat halaman detail, fallback ke asli kalau belum jadi
+        img.onerror = () => { img.onerror = null; img.src = data.image_url; };
+        img.src = getThumbnailURL(data.image_url, data.image_variants, 1600);
         imgContainer.classList.remove('d-none');
     }
 
@@ -137,6 +137,14 @@ resource "google_storage_bucket" "freports_evidence_001" {
   name                        = "freports-evidence-001"
   location                    = "ASIA-SOUTHEAST2"
   uniform_bucket_level_access = true
+
+  # Browser upload langsung pakai signed URL (resumable), jadi butuh CORS
+  cors {
+    origin          = ["*"]
+    method          = ["POST", "PUT"]
+    response_header = ["Content-Type", "Location", "x-goog-resumable"]
+    max_age_seconds = 3600
+  }
 }
 
 # --- NETWORKING & SECURITY ---